@@ -0,0 +1,248 @@
+package dbxfetch;
+
+import java.math.BigDecimal;
+import java.math.RoundingMode;
+import java.nio.charset.StandardCharsets;
+import java.sql.Date;
+import java.sql.ResultSet;
+import java.sql.ResultSetMetaData;
+import java.sql.SQLException;
+import java.sql.Timestamp;
+import java.sql.Types;
+import java.util.Arrays;
+
+/**
+ * Reads a ResultSet into per-column primitive arrays, a chunk of rows at a time, so Python copies
+ * whole columns through JPype's buffer protocol instead of converting one Java object per cell.
+ * Kinds must match common/python/jdbc.py.
+ */
+public final class ColumnarResultSet {
+    public static final int INT = 0;
+    public static final int LONG = 1;
+    public static final int DOUBLE = 2;
+    // Unscaled long; exact for DECIMAL precision <= 18.
+    public static final int DECIMAL = 3;
+    public static final int BOOLEAN = 4;
+    // Days since the epoch.
+    public static final int DATE = 5;
+    // Microseconds since the epoch.
+    public static final int TIMESTAMP = 6;
+    // UTF-8 bytes back to back plus Arrow int32 offsets.
+    public static final int STRING = 7;
+    private static final int INITIAL_STRING_BYTES = 1 << 16;
+
+    private final ResultSet resultSet;
+    private final int columns;
+    private final int[] kinds;
+    private final int[] scales;
+    private final Object[] values;
+    private final boolean[][] nulls;
+    private final boolean[] hasNulls;
+    private final byte[][] stringBuffers;
+    private final int[] stringBytes;
+    private int capacity;
+    private int rows;
+
+    public ColumnarResultSet(ResultSet resultSet) throws SQLException {
+        this.resultSet = resultSet;
+        ResultSetMetaData meta = resultSet.getMetaData();
+        columns = meta.getColumnCount();
+        kinds = new int[columns];
+        scales = new int[columns];
+        values = new Object[columns];
+        nulls = new boolean[columns][];
+        hasNulls = new boolean[columns];
+        stringBuffers = new byte[columns][];
+        stringBytes = new int[columns];
+        for (int i = 0; i < columns; i++) {
+            kinds[i] = kind(meta.getColumnType(i + 1), meta.getPrecision(i + 1));
+            scales[i] = meta.getScale(i + 1);
+        }
+    }
+
+    private static int kind(int type, int precision) {
+        switch (type) {
+            case Types.TINYINT:
+            case Types.SMALLINT:
+            case Types.INTEGER:
+                return INT;
+            case Types.BIGINT:
+                return LONG;
+            case Types.REAL:
+            case Types.FLOAT:
+            case Types.DOUBLE:
+                return DOUBLE;
+            case Types.DECIMAL:
+            case Types.NUMERIC:
+                return precision > 0 && precision <= 18 ? DECIMAL : DOUBLE;
+            case Types.BIT:
+            case Types.BOOLEAN:
+                return BOOLEAN;
+            case Types.DATE:
+                return DATE;
+            case Types.TIMESTAMP:
+                return TIMESTAMP;
+            default:
+                return STRING;
+        }
+    }
+
+    public int[] kinds() {
+        return kinds;
+    }
+
+    public int[] scales() {
+        return scales;
+    }
+
+    private void allocate(int size) {
+        capacity = size;
+        for (int i = 0; i < columns; i++) {
+            switch (kinds[i]) {
+                case INT:
+                case DATE:
+                    values[i] = new int[size];
+                    break;
+                case LONG:
+                case DECIMAL:
+                case TIMESTAMP:
+                    values[i] = new long[size];
+                    break;
+                case DOUBLE:
+                    values[i] = new double[size];
+                    break;
+                case BOOLEAN:
+                    values[i] = new boolean[size];
+                    break;
+                default:
+                    // Offsets into stringBuffers; the byte buffer itself grows as needed and is kept across chunks.
+                    values[i] = new int[size + 1];
+                    if (stringBuffers[i] == null) {
+                        stringBuffers[i] = new byte[INITIAL_STRING_BYTES];
+                    }
+            }
+            nulls[i] = new boolean[size];
+        }
+    }
+
+    /** Reads up to maxRows rows into the column buffers; returns the row count, 0 once exhausted. */
+    public int fetch(int maxRows) throws SQLException {
+        if (maxRows != capacity) {
+            allocate(maxRows);
+        }
+        Arrays.fill(hasNulls, false);
+        Arrays.fill(stringBytes, 0);
+        rows = 0;
+        while (rows < maxRows && resultSet.next()) {
+            for (int i = 0; i < columns; i++) {
+                read(i, i + 1);
+            }
+            rows++;
+        }
+        return rows;
+    }
+
+    private void read(int i, int column) throws SQLException {
+        boolean isNull;
+        switch (kinds[i]) {
+            case INT:
+                ((int[]) values[i])[rows] = resultSet.getInt(column);
+                isNull = resultSet.wasNull();
+                break;
+            case LONG:
+                ((long[]) values[i])[rows] = resultSet.getLong(column);
+                isNull = resultSet.wasNull();
+                break;
+            case DOUBLE:
+                ((double[]) values[i])[rows] = resultSet.getDouble(column);
+                isNull = resultSet.wasNull();
+                break;
+            case DECIMAL: {
+                BigDecimal value = resultSet.getBigDecimal(column);
+                isNull = value == null;
+                // Drivers that store decimals as doubles (SQLite) may hand back extra digits; round to the column scale.
+                ((long[]) values[i])[rows] =
+                        isNull ? 0L : value.setScale(scales[i], RoundingMode.HALF_UP).unscaledValue().longValue();
+                break;
+            }
+            case BOOLEAN:
+                ((boolean[]) values[i])[rows] = resultSet.getBoolean(column);
+                isNull = resultSet.wasNull();
+                break;
+            case DATE: {
+                Date value = resultSet.getDate(column);
+                isNull = value == null;
+                ((int[]) values[i])[rows] = isNull ? 0 : (int) value.toLocalDate().toEpochDay();
+                break;
+            }
+            case TIMESTAMP: {
+                Timestamp value = resultSet.getTimestamp(column);
+                isNull = value == null;
+                ((long[]) values[i])[rows] =
+                        isNull ? 0L : Math.floorDiv(value.getTime(), 1000L) * 1_000_000L + value.getNanos() / 1000;
+                break;
+            }
+            default: {
+                String value = resultSet.getString(column);
+                isNull = value == null;
+                if (!isNull) {
+                    appendString(i, value.getBytes(StandardCharsets.UTF_8));
+                }
+                ((int[]) values[i])[rows + 1] = stringBytes[i];
+            }
+        }
+        nulls[i][rows] = isNull;
+        hasNulls[i] |= isNull;
+    }
+
+    private void appendString(int i, byte[] value) {
+        // Arrow string offsets are int32, so one chunk of one column holds at most 2 GiB of text.
+        int end = Math.addExact(stringBytes[i], value.length);
+        if (end > stringBuffers[i].length) {
+            long grown = Math.max(end, 2L * stringBuffers[i].length);
+            stringBuffers[i] = Arrays.copyOf(stringBuffers[i], (int) Math.min(grown, Integer.MAX_VALUE - 8));
+        }
+        System.arraycopy(value, 0, stringBuffers[i], stringBytes[i], value.length);
+        stringBytes[i] = end;
+    }
+
+    /** Column values for the last fetch, trimmed to its row count; one accessor per buffer type. */
+    public int[] ints(int i) {
+        int[] buffer = (int[]) values[i];
+        return rows == capacity ? buffer : Arrays.copyOf(buffer, rows);
+    }
+
+    public long[] longs(int i) {
+        long[] buffer = (long[]) values[i];
+        return rows == capacity ? buffer : Arrays.copyOf(buffer, rows);
+    }
+
+    public double[] doubles(int i) {
+        double[] buffer = (double[]) values[i];
+        return rows == capacity ? buffer : Arrays.copyOf(buffer, rows);
+    }
+
+    public boolean[] booleans(int i) {
+        boolean[] buffer = (boolean[]) values[i];
+        return rows == capacity ? buffer : Arrays.copyOf(buffer, rows);
+    }
+
+    /** Arrow offsets (rows + 1 entries) into stringData for a string column. */
+    public int[] stringOffsets(int i) {
+        int[] buffer = (int[]) values[i];
+        return rows == capacity ? buffer : Arrays.copyOf(buffer, rows + 1);
+    }
+
+    /** UTF-8 bytes of a string column for the last fetch, trimmed to the bytes written. */
+    public byte[] stringData(int i) {
+        return Arrays.copyOf(stringBuffers[i], stringBytes[i]);
+    }
+
+    /** Null flags for the last fetch, or null when the column had none. */
+    public boolean[] nulls(int i) {
+        if (!hasNulls[i]) {
+            return null;
+        }
+        return rows == capacity ? nulls[i] : Arrays.copyOf(nulls[i], rows);
+    }
+}
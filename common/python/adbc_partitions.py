@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+import pyarrow as pa
+
+POOL_KINDS = ("thread", "process")
+
+# Each pool worker reads partitions over its own connection; ADBC connections aren't shared across threads.
+_worker = threading.local()
+
+
+def connect_databricks_adbc(uri: str) -> Any:
+    from adbc_driver_manager import dbapi
+
+    return dbapi.connect(driver="databricks", db_kwargs={"uri": uri})
+
+
+def init_worker(uri: str, connections: list[Any]) -> None:
+    _worker.connection = connect_databricks_adbc(uri)
+    connections.append(_worker.connection)
+
+
+def read_partition(partition: bytes, as_ipc: bool) -> Any:
+    cursor = _worker.connection.cursor()
+    try:
+        cursor.adbc_read_partition(partition)
+        table = cursor.fetch_arrow_table()
+    finally:
+        cursor.close()
+    if not as_ipc:
+        return table
+    # Process workers hand tables back as an Arrow IPC stream, which the parent reads without copying.
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+class PartitionReader:
+    # Reads ADBC partitions on a thread or process pool whose workers keep their connection across queries.
+    def __init__(self, kind: str, workers: int, uri: str) -> None:
+        self.as_ipc = kind == "process"
+        # Thread workers register their connections here so close() can release them; process
+        # workers get a copy and their connections go away with the process.
+        self.connections: list[Any] = []
+        if self.as_ipc:
+            # spawn, not fork: the parent already has a live driver connection.
+            self.pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(uri, self.connections),
+            )
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(uri, self.connections))
+
+    def submit(self, partition: bytes) -> Future:
+        return self.pool.submit(read_partition, partition, self.as_ipc)
+
+    def table(self, future: Future) -> pa.Table:
+        result = future.result()
+        return pa.ipc.open_stream(result).read_all() if self.as_ipc else result
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+        for connection in self.connections:
+            connection.close()
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import re
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+ITERATION_COLUMNS = [
+    "file",
+    "run_file",
+    "run_date",
+    "client_id",
+    "language",
+    "repeats",
+    "scenario_id",
+    "query",
+    "iteration",
+    "seconds",
+    "shape",
+    "rows",
+    "rows_per_s",
+]
+SUMMARY_COLUMNS = [
+    "client_id",
+    "language",
+    "scenario_id",
+    "shape",
+    "rows",
+    "n",
+    "median_s",
+    "p95_s",
+    "min_s",
+    "max_s",
+    "rows_per_s",
+]
+GROUP_COLUMNS = ["client_id", "language", "scenario_id", "shape", "rows"]
+CI_COLUMNS = GROUP_COLUMNS + ["n", "median_s", "median_ci_low_s", "median_ci_high_s", "confidence"]
+SIZED_SCENARIO = re.compile(r"^(narrow|wide)_(\d+)$")
+RUN_DATE = re.compile(r"\d{8}")
+
+
+def scenario_shape(scenario_id: str) -> str:
+    if scenario_id == "select_1":
+        return "scalar"
+    if scenario_id == "wide_single_row":
+        return "wide"
+    match = SIZED_SCENARIO.match(scenario_id)
+    return match.group(1) if match else "other"
+
+
+def scenario_rows(scenario_id: str) -> int | None:
+    if scenario_id in ("select_1", "wide_single_row"):
+        return 1
+    match = SIZED_SCENARIO.match(scenario_id)
+    return int(match.group(2)) if match else None
+
+
+def normalize_results(results: Any) -> list[Any]:
+    if isinstance(results, dict):
+        return list(results.values())
+    if isinstance(results, list):
+        return results
+    return []
+
+
+def extract_iterations(path: Path, columns: dict[str, list[Any]]) -> None:
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    client = doc.get("client") or {}
+    parameters = doc.get("parameters") or {}
+    run_file = path.name
+    run_date = RUN_DATE.search(run_file)
+    file_values = {
+        "file": str(path),
+        "run_file": run_file,
+        "run_date": run_date.group(0) if run_date else None,
+        "client_id": client.get("id") or path.parent.name,
+        "language": client.get("language"),
+        "repeats": parameters.get("repeats"),
+    }
+
+    for item in normalize_results(doc.get("results")):
+        times = item.get("times") or []
+        if not times:
+            continue
+        scenario = item.get("scenario") or {}
+        scenario_id = scenario.get("id") or "unknown"
+        count = len(times)
+        for key, value in file_values.items():
+            columns[key].extend([value] * count)
+        columns["scenario_id"].extend([scenario_id] * count)
+        columns["query"].extend([scenario.get("query") or ""] * count)
+        columns["iteration"].extend(range(1, count + 1))
+        columns["seconds"].extend(float(value) for value in times)
+        columns["shape"].extend([scenario_shape(scenario_id)] * count)
+        columns["rows"].extend([scenario_rows(scenario_id)] * count)
+
+
+def load_iterations(results_dir: Path) -> dict[str, Any]:
+    json_files = sorted(results_dir.rglob("*.json"))
+    if not json_files:
+        raise RuntimeError(f"No result JSON files found under {results_dir}/<client-id>/.")
+    return load_iteration_files(json_files)
+
+
+def load_iteration_files(json_files: list[Path]) -> dict[str, Any]:
+    columns: dict[str, list[Any]] = {column: [] for column in ITERATION_COLUMNS if column != "rows_per_s"}
+    for path in json_files:
+        extract_iterations(path, columns)
+
+    iterations: dict[str, Any] = dict(columns)
+    iterations["seconds"] = np.asarray(columns["seconds"], dtype=float)
+    iterations["rows"] = np.asarray([np.nan if rows is None else rows for rows in columns["rows"]], dtype=float)
+    iterations["rows_per_s"] = rows_per_second(iterations["rows"], iterations["seconds"])
+    iterations["files"] = len(json_files)
+    return iterations
+
+
+def rows_per_second(rows: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(rows > 0, rows / seconds, np.nan)
+
+
+def sort_codes(values: list[Any]) -> np.ndarray:
+    # Sort codes in C-locale order with missing values last, like dplyr::group_by.
+    present = sorted({value for value in values if value is not None and value == value})
+    lookup = {value: code for code, value in enumerate(present)}
+    return np.asarray([lookup.get(value, len(present)) for value in values], dtype=np.int64)
+
+
+def group_iterations(iterations: dict[str, Any]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rows = [None if math.isnan(value) else value for value in iterations["rows"]]
+    codes = [sort_codes(rows if column == "rows" else iterations[column]) for column in GROUP_COLUMNS]
+    order = np.lexsort([iterations["seconds"]] + codes[::-1])
+    sorted_codes = np.stack([code[order] for code in codes])
+    changed = np.any(sorted_codes[:, 1:] != sorted_codes[:, :-1], axis=0)
+    starts = np.concatenate([[0], np.flatnonzero(changed) + 1])
+    counts = np.diff(np.append(starts, order.size))
+    return order, starts, counts
+
+
+def grouped_quantile(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    # R quantile type 7 over pre-sorted groups.
+    position = (counts - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    weight = position - lower
+    return (1.0 - weight) * values[starts + lower] + weight * values[starts + upper]
+
+
+def summarize(iterations: dict[str, Any]) -> dict[str, Any]:
+    order, starts, counts = group_iterations(iterations)
+    seconds = iterations["seconds"][order]
+    first = order[starts]
+    summary: dict[str, Any] = {column: [iterations[column][index] for index in first] for column in GROUP_COLUMNS}
+    summary["rows"] = iterations["rows"][first]
+    summary["n"] = counts
+    summary["median_s"] = grouped_quantile(seconds, starts, counts, 0.5)
+    summary["p95_s"] = grouped_quantile(seconds, starts, counts, 0.95)
+    summary["min_s"] = seconds[starts]
+    summary["max_s"] = seconds[starts + counts - 1]
+    summary["rows_per_s"] = rows_per_second(summary["rows"], summary["median_s"])
+    summary["sorted_seconds"] = seconds
+    summary["starts"] = starts
+    return summary
+
+
+def bootstrap_medians(
+    sorted_seconds: np.ndarray,
+    starts: np.ndarray,
+    counts: np.ndarray,
+    samples: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    # Resampling n values with replacement is flooring n uniforms onto the sorted values, so the
+    # k-th order statistic of a resample is floor(n * Beta(k, n - k + 1)); the (k + 1)-th follows
+    # as the minimum of the remaining n - k uniforms. This draws every group's medians in O(samples).
+    n = counts[:, None]
+    k = (n + 1) // 2
+    lower_u = rng.beta(k, n - k + 1, size=(counts.size, samples))
+    upper_u = lower_u + (1.0 - lower_u) * rng.beta(1.0, np.maximum(n - k, 1), size=lower_u.shape)
+    lower = starts[:, None] + np.minimum(np.floor(n * lower_u).astype(np.int64), n - 1)
+    upper = starts[:, None] + np.minimum(np.floor(n * upper_u).astype(np.int64), n - 1)
+    even = (counts % 2 == 0)[:, None]
+    return np.where(even, (sorted_seconds[lower] + sorted_seconds[upper]) / 2.0, sorted_seconds[lower])
+
+
+def bootstrap_median_ci(
+    summary: dict[str, Any],
+    samples: int,
+    confidence: float,
+    seed: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    medians = bootstrap_medians(summary["sorted_seconds"], summary["starts"], summary["n"], samples, rng)
+    alpha = (1.0 - confidence) / 2.0
+    low, high = np.quantile(medians, [alpha, 1.0 - alpha], axis=1)
+    return low, high
+
+
+def format_value(value: Any) -> str:
+    if value is None:
+        return "NA"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NA"
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return repr(value)
+    return str(value)
+
+
+def format_column(values: Any) -> list[str]:
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    return [format_value(value) for value in values]
+
+
+def write_csv(path: Path, columns: list[str], table: dict[str, Any]) -> None:
+    formatted = [format_column(table[column]) for column in columns]
+    with path.open("w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows(zip(*formatted))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Aggregate results/<client-id>/*.json into CSV summaries.")
+    parser.add_argument("--results-dir", type=Path, default=Path("results"))
+    parser.add_argument("--out-dir", type=Path, default=None)
+    parser.add_argument("--bootstrap-samples", type=int, default=2000)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    out_dir = args.out_dir or args.results_dir
+
+    iterations = load_iterations(args.results_dir)
+    summary = summarize(iterations)
+    summary["median_ci_low_s"], summary["median_ci_high_s"] = bootstrap_median_ci(
+        summary, args.bootstrap_samples, args.confidence, args.seed
+    )
+    summary["confidence"] = [args.confidence] * summary["n"].size
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_csv(out_dir / "iterations.csv", ITERATION_COLUMNS, iterations)
+    write_csv(out_dir / "summary.csv", SUMMARY_COLUMNS, summary)
+    write_csv(out_dir / "summary_ci.csv", CI_COLUMNS, summary)
+    print(
+        f"Aggregated {iterations['files']} files, {iterations['seconds'].size} iterations, "
+        f"{summary['n'].size} client/scenario groups into {out_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import math
+import sys
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from common.python.aggregate import bootstrap_medians, load_iteration_files, summarize, write_csv
+from common.python.history import DEFAULT_HISTORY_DIR, load_history
+
+COMPARE_COLUMNS = [
+    "client_id",
+    "scenario_id",
+    "n_baseline",
+    "n_candidate",
+    "baseline_median_s",
+    "candidate_median_s",
+    "change",
+    "change_ci_low",
+    "change_ci_high",
+    "p_value",
+    "status",
+]
+EXACT_MANN_WHITNEY_MAX = 25
+
+
+def resolve_json_files(specs: list[str]) -> list[Path]:
+    files: list[Path] = []
+    for spec in specs:
+        path = Path(spec)
+        if path.is_dir():
+            files.extend(sorted(path.rglob("*.json")))
+        elif path.is_file():
+            files.append(path)
+        else:
+            files.extend(Path(match) for match in sorted(glob.glob(spec, recursive=True)))
+    return files
+
+
+def load_run_set(specs: list[str], history_dir: Path) -> dict[str, Any]:
+    # "run=<run-id>" pulls iterations from the history store; anything else is a JSON file, directory or glob.
+    run_ids = [spec.removeprefix("run=") for spec in specs if spec.startswith("run=")]
+    json_files = resolve_json_files([spec for spec in specs if not spec.startswith("run=")])
+    client_ids: list[str] = []
+    scenario_ids: list[str] = []
+    seconds: list[np.ndarray] = []
+
+    if json_files:
+        iterations = load_iteration_files(json_files)
+        client_ids.extend(iterations["client_id"])
+        scenario_ids.extend(iterations["scenario_id"])
+        seconds.append(iterations["seconds"])
+    if run_ids:
+        table = load_history(root=history_dir, run_ids=run_ids, columns=["client_id", "scenario_id", "seconds"])
+        client_ids.extend(table.column("client_id").to_pylist())
+        scenario_ids.extend(table.column("scenario_id").to_pylist())
+        seconds.append(table.column("seconds").to_numpy())
+
+    if not client_ids:
+        raise RuntimeError(f"No iterations found for {' '.join(specs)}")
+    # Group on client and scenario only so JSON and history sources line up.
+    return {
+        "client_id": client_ids,
+        "language": [None] * len(client_ids),
+        "scenario_id": scenario_ids,
+        "shape": [None] * len(client_ids),
+        "rows": np.full(len(client_ids), np.nan),
+        "seconds": np.concatenate(seconds),
+    }
+
+
+def filter_run_set(run_set: dict[str, Any], clients: list[str] | None, scenarios: list[str] | None) -> dict[str, Any]:
+    keep = np.ones(run_set["seconds"].size, dtype=bool)
+    if clients:
+        keep &= np.isin(np.asarray(run_set["client_id"], dtype=object), clients)
+    if scenarios:
+        keep &= np.isin(np.asarray(run_set["scenario_id"], dtype=object), scenarios)
+    indices = np.flatnonzero(keep)
+    if not indices.size:
+        raise RuntimeError("No iterations left after --client/--scenario filters.")
+    return {
+        key: values[indices] if isinstance(values, np.ndarray) else [values[index] for index in indices]
+        for key, values in run_set.items()
+    }
+
+
+def average_ranks(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(values, kind="mergesort")
+    sorted_values = values[order]
+    _, first, tie_counts = np.unique(sorted_values, return_index=True, return_counts=True)
+    average = first + (tie_counts + 1) / 2.0
+    ranks = np.empty(values.size)
+    ranks[order] = np.repeat(average, tie_counts)
+    return ranks, tie_counts
+
+
+def exact_u_upper_tail(m: int, n: int, u: float) -> float:
+    # counts[j, k] = orderings of i candidate and j baseline values whose U statistic is k.
+    counts = np.zeros((n + 1, m * n + 1))
+    counts[:, 0] = 1.0
+    for _ in range(m):
+        previous = counts.copy()
+        counts = np.zeros_like(previous)
+        counts[0, 0] = 1.0
+        for j in range(1, n + 1):
+            counts[j] = counts[j - 1]
+            counts[j, j:] += previous[j, : m * n + 1 - j]
+    distribution = counts[n]
+    return float(distribution[math.ceil(u - 1e-9):].sum() / distribution.sum())
+
+
+def mann_whitney_greater(candidate: np.ndarray, baseline: np.ndarray) -> float:
+    # One-sided p-value for "candidate times are stochastically larger than baseline times".
+    m, n = candidate.size, baseline.size
+    ranks, tie_counts = average_ranks(np.concatenate([candidate, baseline]))
+    u = ranks[:m].sum() - m * (m + 1) / 2.0
+    if tie_counts.max() == 1 and max(m, n) <= EXACT_MANN_WHITNEY_MAX:
+        return exact_u_upper_tail(m, n, u)
+
+    total = m + n
+    tie_term = float((tie_counts**3 - tie_counts).sum()) / (total * (total - 1))
+    sigma = math.sqrt(m * n / 12.0 * ((total + 1) - tie_term))
+    if sigma == 0:
+        return 1.0
+    z = (u - m * n / 2.0 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def compare_run_sets(
+    baseline: dict[str, Any],
+    candidate: dict[str, Any],
+    threshold: float,
+    alpha: float,
+    confidence: float,
+    samples: int,
+    seed: int,
+    min_samples: int,
+) -> dict[str, list[Any]]:
+    base_summary = summarize(baseline)
+    cand_summary = summarize(candidate)
+    base_groups = {
+        (client_id, scenario_id): index
+        for index, (client_id, scenario_id) in enumerate(zip(base_summary["client_id"], base_summary["scenario_id"]))
+    }
+    pairs = [
+        (base_groups[key], index)
+        for index, key in enumerate(zip(cand_summary["client_id"], cand_summary["scenario_id"]))
+        if key in base_groups
+    ]
+    if not pairs:
+        raise RuntimeError("Baseline and candidate share no client/scenario pairs.")
+
+    base_index = np.asarray([pair[0] for pair in pairs])
+    cand_index = np.asarray([pair[1] for pair in pairs])
+    rng = np.random.default_rng(seed)
+    base_medians = bootstrap_medians(
+        base_summary["sorted_seconds"], base_summary["starts"][base_index], base_summary["n"][base_index], samples, rng
+    )
+    cand_medians = bootstrap_medians(
+        cand_summary["sorted_seconds"], cand_summary["starts"][cand_index], cand_summary["n"][cand_index], samples, rng
+    )
+    tail = (1.0 - confidence) / 2.0
+    ci_low, ci_high = np.quantile(cand_medians / base_medians - 1.0, [tail, 1.0 - tail], axis=1)
+
+    report: dict[str, list[Any]] = {column: [] for column in COMPARE_COLUMNS}
+    for position, (base, cand) in enumerate(pairs):
+        base_n, cand_n = int(base_summary["n"][base]), int(cand_summary["n"][cand])
+        base_median = float(base_summary["median_s"][base])
+        cand_median = float(cand_summary["median_s"][cand])
+        change = cand_median / base_median - 1.0
+        base_times = base_summary["sorted_seconds"][base_summary["starts"][base] : base_summary["starts"][base] + base_n]
+        cand_times = cand_summary["sorted_seconds"][cand_summary["starts"][cand] : cand_summary["starts"][cand] + cand_n]
+        if change >= 0:
+            p_value = mann_whitney_greater(cand_times, base_times)
+        else:
+            p_value = mann_whitney_greater(base_times, cand_times)
+
+        if min(base_n, cand_n) < min_samples:
+            status = "insufficient"
+        elif p_value < alpha and change >= threshold and ci_low[position] > 0:
+            status = "regression"
+        elif p_value < alpha and change <= -threshold and ci_high[position] < 0:
+            status = "improvement"
+        else:
+            status = "unchanged"
+
+        for column, value in (
+            ("client_id", cand_summary["client_id"][cand]),
+            ("scenario_id", cand_summary["scenario_id"][cand]),
+            ("n_baseline", base_n),
+            ("n_candidate", cand_n),
+            ("baseline_median_s", base_median),
+            ("candidate_median_s", cand_median),
+            ("change", change),
+            ("change_ci_low", float(ci_low[position])),
+            ("change_ci_high", float(ci_high[position])),
+            ("p_value", p_value),
+            ("status", status),
+        ):
+            report[column].append(value)
+    return report
+
+
+def print_report(report: dict[str, list[Any]]) -> None:
+    header = f"{'client_id':<32} {'scenario_id':<20} {'base_s':>10} {'cand_s':>10} {'change':>8} {'ci':>19} {'p':>7}  status"
+    print(header)
+    for index in range(len(report["client_id"])):
+        ci = f"[{report['change_ci_low'][index]:+.1%}, {report['change_ci_high'][index]:+.1%}]"
+        print(
+            f"{report['client_id'][index]:<32} {report['scenario_id'][index]:<20} "
+            f"{report['baseline_median_s'][index]:>10.4f} {report['candidate_median_s'][index]:>10.4f} "
+            f"{report['change'][index]:>+8.1%} {ci:>19} {report['p_value'][index]:>7.4f}  {report['status'][index]}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare two runs or run sets and flag statistically significant fetch regressions."
+    )
+    parser.add_argument(
+        "--baseline",
+        nargs="+",
+        required=True,
+        help="Result JSON files, directories, globs, or run=<run-id> from the history store.",
+    )
+    parser.add_argument("--candidate", nargs="+", required=True)
+    parser.add_argument("--history-dir", type=Path, default=DEFAULT_HISTORY_DIR)
+    parser.add_argument("--client", action="append", dest="clients")
+    parser.add_argument("--scenario", action="append", dest="scenarios")
+    parser.add_argument("--threshold", type=float, default=0.05, help="Minimum relative median slowdown to flag.")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Mann-Whitney significance level.")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--bootstrap-samples", type=int, default=5000)
+    parser.add_argument("--min-samples", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="Also write the comparison to CSV.")
+    args = parser.parse_args(argv)
+
+    baseline = filter_run_set(load_run_set(args.baseline, args.history_dir), args.clients, args.scenarios)
+    candidate = filter_run_set(load_run_set(args.candidate, args.history_dir), args.clients, args.scenarios)
+    report = compare_run_sets(
+        baseline,
+        candidate,
+        threshold=args.threshold,
+        alpha=args.alpha,
+        confidence=args.confidence,
+        samples=args.bootstrap_samples,
+        seed=args.seed,
+        min_samples=args.min_samples,
+    )
+    print_report(report)
+    if args.out is not None:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        write_csv(args.out, COMPARE_COLUMNS, report)
+
+    regressions = report["status"].count("regression")
+    print(f"{regressions} regression(s) across {len(report['status'])} client/scenario pairs")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Any
+
+INDEX_NAME = "index.json"
+
+
+def normalize_sql(query: str) -> str:
+    return " ".join(query.split()).rstrip(";").strip()
+
+
+def export_cache_key(query: str, options: dict[str, Any], source_version: Any) -> str:
+    # Same SQL, export options and source table version -> same exported files.
+    material = json.dumps(
+        {"sql": normalize_sql(query), "options": options, "source_version": source_version},
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:24]
+
+
+class LocalStore:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return str(self.root / key)
+
+    def read_index(self) -> dict[str, Any]:
+        index_path = self.root / INDEX_NAME
+        return json.loads(index_path.read_text(encoding="utf-8")) if index_path.exists() else {}
+
+    def write_index(self, index: dict[str, Any]) -> None:
+        (self.root / INDEX_NAME).write_text(json.dumps(index, indent=2, sort_keys=True), encoding="utf-8")
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).is_dir()
+
+    def delete(self, key: str) -> None:
+        shutil.rmtree(self.root / key, ignore_errors=True)
+
+
+class VolumeStore:
+    def __init__(self, files_client: Any, root: str) -> None:
+        self.files_client = files_client
+        self.root = root.rstrip("/")
+
+    def path(self, key: str) -> str:
+        return f"{self.root}/{key}"
+
+    def read_index(self) -> dict[str, Any]:
+        from databricks.sdk.errors import NotFound
+
+        try:
+            return json.loads(self.files_client.download(f"{self.root}/{INDEX_NAME}").contents.read())
+        except NotFound:
+            return {}
+
+    def write_index(self, index: dict[str, Any]) -> None:
+        encoded = json.dumps(index, indent=2, sort_keys=True).encode("utf-8")
+        self.files_client.upload(f"{self.root}/{INDEX_NAME}", io.BytesIO(encoded), overwrite=True)
+
+    def exists(self, key: str) -> bool:
+        from databricks.sdk.errors import NotFound
+
+        try:
+            next(iter(self.files_client.list_directory_contents(self.path(key))), None)
+        except NotFound:
+            return False
+        return True
+
+    def delete(self, key: str) -> None:
+        from databricks.sdk.errors import NotFound
+
+        try:
+            for entry in list(self.files_client.list_directory_contents(self.path(key))):
+                self.files_client.delete(str(entry.path))
+            self.files_client.delete_directory(self.path(key))
+        except NotFound:
+            pass
+
+
+class ExportCache:
+    # The index records size and last use per key; eviction drops least recently used entries over max_bytes.
+    def __init__(self, store: LocalStore | VolumeStore, max_bytes: int) -> None:
+        self.store = store
+        self.max_bytes = max_bytes
+        self.index = store.read_index()
+
+    def lookup(self, key: str) -> bool:
+        if key not in self.index:
+            return False
+        if not self.store.exists(key):
+            del self.index[key]
+            self.store.write_index(self.index)
+            return False
+        self.index[key]["last_used_at"] = time.time()
+        self.store.write_index(self.index)
+        return True
+
+    def add(self, key: str, nbytes: int, description: dict[str, Any]) -> None:
+        now = time.time()
+        self.index[key] = {**description, "bytes": nbytes, "created_at": now, "last_used_at": now}
+        self.store.write_index(self.index)
+
+    def evict(self, keep: set[str]) -> list[str]:
+        evicted = []
+        total = sum(entry["bytes"] for entry in self.index.values())
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["last_used_at"]):
+            if total <= self.max_bytes:
+                break
+            if key in keep:
+                continue
+            self.store.delete(key)
+            total -= entry["bytes"]
+            evicted.append(key)
+        for key in evicted:
+            del self.index[key]
+        if evicted:
+            self.store.write_index(self.index)
+        return evicted
+
+    def clear(self) -> None:
+        for key in list(self.index):
+            self.store.delete(key)
+        self.index = {}
+        self.store.write_index(self.index)
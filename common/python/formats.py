@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import argparse
+from typing import Any, Iterator
+
+from common.python.helpers import parse_choice_list, parse_int_list
+
+# Formats a warehouse can write with INSERT OVERWRITE DIRECTORY that pyarrow decodes natively.
+EXPORT_FORMATS = ("parquet", "orc")
+COMPRESSIONS = ("zstd", "snappy", "lz4", "none")
+EXPORT_SWEEP_ARGUMENTS = ("export_format", "compression", "row_group_mb")
+
+
+def add_export_arguments(parser: argparse.ArgumentParser) -> None:
+    if parser.get_default("export_format") is not None:
+        # Already added by another export runner in the same run_cli call.
+        return
+    parser.add_argument(
+        "--export-format",
+        type=parse_choice_list(EXPORT_FORMATS),
+        default=["parquet"],
+        help=f"File formats to sweep ({', '.join(EXPORT_FORMATS)}).",
+    )
+    parser.add_argument(
+        "--compression",
+        type=parse_choice_list(COMPRESSIONS),
+        default=["zstd"],
+        help=f"Codecs to sweep ({', '.join(COMPRESSIONS)}).",
+    )
+    parser.add_argument(
+        "--row-group-mb",
+        type=parse_int_list,
+        default=[None],
+        help="Row group (Parquet) / stripe (ORC) sizes in MiB to sweep; default: writer default.",
+    )
+
+
+def export_suffix(export_format: str, compression: str, row_group_mb: int | None) -> str:
+    # Empty for the default zstd Parquet export, so existing variant ids and staged layouts keep their names.
+    suffix = "" if (export_format, compression) == ("parquet", "zstd") else f"-{export_format}-{compression}"
+    return suffix if row_group_mb is None else f"{suffix}-rg{row_group_mb}"
+
+
+def export_parameters(args: argparse.Namespace) -> dict[str, Any]:
+    return {"export_format": args.export_format, "compression": args.compression, "row_group_mb": args.row_group_mb}
+
+
+def spark_export_options(export_format: str, compression: str, row_group_mb: int | None) -> dict[str, str]:
+    options = {"compression": compression}
+    if row_group_mb is not None:
+        key = "parquet.block.size" if export_format == "parquet" else "orc.stripe.size"
+        options[key] = str(row_group_mb * 1024 * 1024)
+    return options
+
+
+def rows_per_group(table: Any, row_group_mb: int | None) -> int | None:
+    # Like parquet.block.size, the target is in-memory bytes; pyarrow wants rows.
+    if row_group_mb is None or not table.num_rows:
+        return None
+    return max(1, int(row_group_mb * 1024 * 1024 * table.num_rows / max(table.nbytes, 1)))
+
+
+def write_table(table: Any, where: Any, export_format: str, compression: str, row_group_mb: int | None) -> None:
+    if export_format == "orc":
+        from pyarrow import orc
+
+        options = {"stripe_size": row_group_mb * 1024 * 1024} if row_group_mb is not None else {}
+        orc.write_table(table, where, compression="uncompressed" if compression == "none" else compression, **options)
+        return
+    import pyarrow.parquet as pq
+
+    pq.write_table(table, where, compression=compression, row_group_size=rows_per_group(table, row_group_mb))
+
+
+def read_table(source: Any, export_format: str) -> Any:
+    if export_format == "orc":
+        from pyarrow import orc
+
+        return orc.ORCFile(source).read()
+    import pyarrow.parquet as pq
+
+    return pq.read_table(source)
+
+
+def iter_batches(source: Any, export_format: str) -> Iterator[Any]:
+    if export_format == "orc":
+        from pyarrow import orc
+
+        reader = orc.ORCFile(source)
+        for index in range(reader.nstripes):
+            yield reader.read_stripe(index)
+        return
+    import pyarrow.parquet as pq
+
+    yield from pq.ParquetFile(source).iter_batches()
@@ -1,13 +1,192 @@
 from __future__ import annotations
 
+import argparse
 import json
+import math
 import os
 import time
-from datetime import date
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
 from urllib.parse import quote
 
+from common.python.memory import MemorySampler
+
+if TYPE_CHECKING:
+    from common.python.history import RunHistory
+
+CONSUME_MODES = ("materialize", "stream")
+PHASE_NAMES = ("execute", "first_batch", "fetch", "convert")
+# Scenario predicate operators and their Delta Sharing JSON predicate names.
+PREDICATE_OPS = {"=": "equal", "<": "lessThan", "<=": "lessThanOrEqual", ">": "greaterThan", ">=": "greaterThanOrEqual"}
+# Parallel fetch: sub-queries take <column> % N = i, or N equal ranges of <column>.
+PARTITION_METHODS = ("modulo", "range")
+DEFAULT_PARTITION_COLUMN = "cs_order_number"
+
+
+class PhaseTimer:
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = {}
+        # Runner-specific per-iteration totals (bytes transferred, decode seconds, ...), reported as-is.
+        self.counters: dict[str, float] = {}
+
+    def count(self, name: str, value: float) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def __call__(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+
+@dataclass
+class RepeatPolicy:
+    repeats: int
+    adaptive: bool = False
+    max_repeats: int = 30
+    target_ci: float = 0.05
+    confidence: float = 0.95
+    budget_s: float | None = None
+    max_warmups: int = 5
+    warmup_tolerance: float = 0.1
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace, repeats: int) -> RepeatPolicy:
+        if not args.adaptive:
+            return cls(repeats=repeats)
+        return cls(
+            repeats=args.min_repeats or repeats,
+            adaptive=True,
+            max_repeats=max(args.max_repeats, args.min_repeats or repeats),
+            target_ci=args.target_ci,
+            budget_s=args.budget_s,
+            max_warmups=args.max_warmups,
+        )
+
+    def parameters(self) -> dict[str, Any]:
+        if not self.adaptive:
+            return {}
+        return {
+            "adaptive": True,
+            "min_repeats": self.repeats,
+            "max_repeats": self.max_repeats,
+            "target_ci": self.target_ci,
+            "confidence": self.confidence,
+            "budget_s": self.budget_s,
+            "max_warmups": self.max_warmups,
+        }
+
+    def warmup_done(self, warmup_times: list[float], elapsed_s: float) -> bool:
+        if not self.adaptive or len(warmup_times) >= self.max_warmups:
+            return True
+        if self.budget_s is not None and elapsed_s >= self.budget_s:
+            return True
+        if len(warmup_times) < 2:
+            return False
+        previous, latest = warmup_times[-2:]
+        return abs(latest - previous) <= self.warmup_tolerance * min(latest, previous)
+
+    def stop_reason(self, times: list[float], elapsed_s: float) -> str | None:
+        if not self.adaptive:
+            return "fixed" if len(times) >= self.repeats else None
+        if len(times) >= self.max_repeats:
+            return "max_repeats"
+        if times and self.budget_s is not None and elapsed_s + median(times) > self.budget_s:
+            return "budget"
+        if len(times) >= self.repeats and median_ci_relative_width(times, self.confidence) <= self.target_ci:
+            return "converged"
+        return None
+
+
+@dataclass
+class StreamStats:
+    rows: int = 0
+    bytes: int = 0
+    batches: int = 0
+
+    def add(self, batch: Any) -> None:
+        self.rows += batch.num_rows
+        self.bytes += batch.nbytes
+        self.batches += 1
+
+
+@dataclass
+class ScenarioSpec:
+    # Structured form of a scenario's SQL for readers that don't run SQL: None columns means all,
+    # predicate is {"column", "op", "value"}.
+    columns: list[str] | None = None
+    limit: int | None = None
+    predicate: dict[str, Any] | None = None
+
+    @classmethod
+    def from_scenario(cls, scenario: dict[str, Any]) -> ScenarioSpec | None:
+        if not any(key in scenario for key in ("columns", "limit", "predicate")):
+            return None
+        predicate = scenario.get("predicate")
+        if predicate is not None and predicate.get("op") not in PREDICATE_OPS:
+            raise RuntimeError(f"Unsupported predicate op in scenario {scenario['id']}: {predicate.get('op')}")
+        return cls(columns=scenario.get("columns"), limit=scenario.get("limit"), predicate=predicate)
+
+    @property
+    def read_columns(self) -> list[str] | None:
+        # Projected columns plus the predicate column, which has to be read to filter on.
+        if self.columns is None or self.predicate is None or self.predicate["column"] in self.columns:
+            return self.columns
+        return [*self.columns, self.predicate["column"]]
+
+    @property
+    def limit_hint(self) -> int | None:
+        # Servers count limit hints before any filtering, so only pass one without a predicate.
+        return self.limit if self.predicate is None else None
+
+    def sql(self, table: str, condition: str | None = None) -> str:
+        # condition is extra SQL ANDed with the predicate, e.g. a parallel fetch partition.
+        query = f"SELECT {', '.join(self.columns) if self.columns else '*'} FROM {table}"
+        conditions = [condition] if condition else []
+        if self.predicate is not None:
+            value = self.predicate["value"]
+            literal = "'" + value.replace("'", "''") + "'" if isinstance(value, str) else str(value)
+            conditions.insert(0, f"{self.predicate['column']} {self.predicate['op']} {literal}")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if self.limit is not None:
+            query += f" LIMIT {self.limit}"
+        return query
+
+    def json_predicate_hints(self) -> str | None:
+        if self.predicate is None:
+            return None
+        value = self.predicate["value"]
+        value_type = "string" if isinstance(value, str) else "double" if isinstance(value, float) else "long"
+        return json.dumps(
+            {
+                "op": PREDICATE_OPS[self.predicate["op"]],
+                "children": [
+                    {"op": "column", "name": self.predicate["column"], "valueType": value_type},
+                    {"op": "literal", "value": str(value), "valueType": value_type},
+                ],
+            }
+        )
+
+    def arrow_filter(self) -> Any:
+        if self.predicate is None:
+            return None
+        import pyarrow.compute as pc
+
+        field = pc.field(self.predicate["column"])
+        value = self.predicate["value"]
+        return {
+            "=": field == value,
+            "<": field < value,
+            "<=": field <= value,
+            ">": field > value,
+            ">=": field >= value,
+        }[self.predicate["op"]]
+
 
 def require_env(name: str) -> str:
     value = os.getenv(name, "")
@@ -20,47 +199,229 @@ def require_envs(names: list[str]) -> dict[str, str]:
     return {name: require_env(name) for name in names}
 
 
+def add_harness_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--consume",
+        choices=CONSUME_MODES,
+        default=os.getenv("BENCHMARK_CONSUME", "materialize"),
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        default=os.getenv("BENCHMARK_ADAPTIVE", "") not in ("", "0", "false"),
+    )
+    parser.add_argument("--min-repeats", type=int, default=int(os.getenv("BENCHMARK_MIN_REPEATS", "0")))
+    parser.add_argument("--max-repeats", type=int, default=int(os.getenv("BENCHMARK_MAX_REPEATS", "30")))
+    parser.add_argument("--target-ci", type=float, default=float(os.getenv("BENCHMARK_TARGET_CI", "0.05")))
+    parser.add_argument(
+        "--budget-s",
+        type=float,
+        default=float(os.environ["BENCHMARK_SCENARIO_BUDGET_S"]) if os.getenv("BENCHMARK_SCENARIO_BUDGET_S") else None,
+    )
+    parser.add_argument("--max-warmups", type=int, default=int(os.getenv("BENCHMARK_MAX_WARMUPS", "5")))
+    parser.add_argument(
+        "--parallel",
+        type=parse_int_list,
+        default=os.getenv("BENCHMARK_PARALLEL", "1"),
+        help="Connections to split each structured scenario across (runners with parallel_fetch); comma-separated to sweep.",
+    )
+    parser.add_argument(
+        "--partition-method",
+        choices=PARTITION_METHODS,
+        default=os.getenv("BENCHMARK_PARTITION_METHOD", "modulo"),
+        help="Split by <column> %% N (modulo) or into N equal <column> ranges between its min and max (range).",
+    )
+    parser.add_argument(
+        "--partition-column",
+        default=os.getenv("BENCHMARK_PARTITION_COLUMN", DEFAULT_PARTITION_COLUMN),
+        help="Non-null integer column the parallel fetch partitions on.",
+    )
+
+
+def parse_int_list(value: str) -> list[int]:
+    values = [int(item) for item in value.split(",") if item.strip()]
+    if not values or min(values) < 1:
+        raise argparse.ArgumentTypeError(f"Expected comma-separated positive integers, got {value}")
+    return values
+
+
+def parse_choice_list(choices: tuple[str, ...]) -> Callable[[str], list[str]]:
+    def parse(value: str) -> list[str]:
+        values = [item.strip() for item in value.split(",") if item.strip()]
+        if not values or any(item not in choices for item in values):
+            raise argparse.ArgumentTypeError(f"Expected comma-separated values from {', '.join(choices)}, got {value}")
+        return values
+
+    return parse
+
+
+def variant_client_id(client_id: str, consume: str) -> str:
+    return client_id if consume == "materialize" else f"{client_id}-{consume}"
+
+
 def load_queries(path: Path) -> dict[str, Any]:
     if not path.exists():
         raise RuntimeError("Missing queries/scenarios.json (run from repo root).")
 
     queries = json.loads(path.read_text(encoding="utf-8"))
     scenarios = {scenario["id"]: scenario["sql"] for scenario in queries["scenarios"]}
-    return {"queries": queries, "scenarios": scenarios}
+    specs = {scenario["id"]: ScenarioSpec.from_scenario(scenario) for scenario in queries["scenarios"]}
+    return {"queries": queries, "scenarios": scenarios, "specs": {key: spec for key, spec in specs.items() if spec}}
 
 
-def default_out_path(client_id: str) -> Path:
+def default_out_path(client_id: str, run_id: str | None = None) -> Path:
     out_dir = Path("results") / client_id
     out_dir.mkdir(parents=True, exist_ok=True)
-    return out_dir / f"run_{date.today().strftime('%Y%m%d')}.json"
+    run_id = run_id or time.strftime("%Y%m%dT%H%M%S")
+    return out_dir / f"run_{run_id}.json"
+
+
+def result_size(result: Any) -> tuple[int | None, int | None]:
+    if isinstance(result, StreamStats):
+        return result.rows, result.bytes
+    if hasattr(result, "num_rows") and hasattr(result, "nbytes"):
+        return result.num_rows, result.nbytes
+    if hasattr(result, "memory_usage"):
+        return len(result), int(result.memory_usage(index=True, deep=True).sum())
+    if isinstance(result, list):
+        return len(result), None
+    return None, None
+
 
+def per_second(value: int | None, seconds: float) -> float | None:
+    if value is None or seconds <= 0:
+        return None
+    return value / seconds
 
-def benchmark_seconds(run_query: Callable[[], Any], repeats: int) -> list[float]:
-    run_query()
-    times: list[float] = []
-    for _ in range(repeats):
+
+def benchmark_iteration(run_query: Callable[[PhaseTimer], Any]) -> dict[str, Any]:
+    phases = PhaseTimer()
+    with MemorySampler() as memory:
         start = time.perf_counter()
-        run_query()
-        times.append(time.perf_counter() - start)
-    return times
+        result = run_query(phases)
+        seconds = time.perf_counter() - start
+    rows, nbytes = result_size(result)
+    iteration: dict[str, Any] = {"seconds": seconds}
+    for name in PHASE_NAMES:
+        iteration[f"{name}_s"] = phases.seconds.get(name)
+    iteration.update(phases.counters)
+    iteration.update(
+        {
+            "rows": rows,
+            "bytes": nbytes,
+            "rows_per_s": per_second(rows, seconds),
+            "bytes_per_s": per_second(nbytes, seconds),
+            "bytes_per_row": nbytes / rows if nbytes is not None and rows else None,
+            **memory.metrics(),
+        }
+    )
+    return iteration
+
+
+def median(values: list[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+
+def median_ci_relative_width(times: list[float], confidence: float) -> float:
+    # Distribution-free CI from order statistics: [x(l), x(n-1-l)] covers the median with
+    # probability 1 - 2 * P(Binomial(n, 0.5) <= l).
+    n = len(times)
+    ordered = sorted(times)
+    lower = None
+    tail = 0.0
+    for index in range(n // 2):
+        tail += math.comb(n, index) / 2.0**n
+        if 1.0 - 2.0 * tail < confidence:
+            break
+        lower = index
+    center = median(times)
+    if lower is None or center <= 0:
+        return math.inf
+    return (ordered[n - 1 - lower] - ordered[lower]) / center
+
+
+def benchmark_seconds(
+    run_query: Callable[[PhaseTimer], Any],
+    repeats: int | RepeatPolicy,
+    on_iteration: Callable[[int, dict[str, Any]], None] | None = None,
+    before_iteration: Callable[[], None] | None = None,
+) -> dict[str, Any]:
+    policy = repeats if isinstance(repeats, RepeatPolicy) else RepeatPolicy(repeats=repeats)
+    before_iteration = before_iteration or (lambda: None)
+    started = time.perf_counter()
+    warmup_times: list[float] = []
+    while True:
+        before_iteration()
+        start = time.perf_counter()
+        run_query(PhaseTimer())
+        warmup_times.append(time.perf_counter() - start)
+        if policy.warmup_done(warmup_times, time.perf_counter() - started):
+            break
+
+    iterations: list[dict[str, Any]] = []
+    while True:
+        stop_reason = policy.stop_reason(
+            [iteration["seconds"] for iteration in iterations],
+            time.perf_counter() - started,
+        )
+        if stop_reason is not None:
+            break
+        before_iteration()
+        iteration = benchmark_iteration(run_query)
+        if on_iteration is not None:
+            on_iteration(len(iterations) + 1, iteration)
+        iterations.append(iteration)
+
+    times = [iteration["seconds"] for iteration in iterations]
+    return {
+        "iterations": iterations,
+        "warmup_times": warmup_times,
+        "stop_reason": stop_reason,
+        "median_ci_rel_width": median_ci_relative_width(times, policy.confidence) if times else None,
+    }
+
+
+def collect_iterations(iterations: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    keys = dict.fromkeys(key for iteration in iterations for key in iteration if key != "seconds")
+    collected: dict[str, list[Any]] = {"times": [iteration["seconds"] for iteration in iterations]}
+    collected.update({key: [iteration.get(key) for iteration in iterations] for key in keys})
+    return collected
 
 
 def run_scenario(
     scenario_id: str,
     query: str,
-    run_query: Callable[[], Any],
-    repeats: int,
+    run_query: Callable[[PhaseTimer], Any],
+    repeats: int | RepeatPolicy,
+    history: RunHistory | None = None,
+    before_iteration: Callable[[], None] | None = None,
 ) -> dict[str, Any]:
+    on_iteration = None
+    if history is not None:
+        def on_iteration(index: int, iteration: dict[str, Any]) -> None:
+            history.record(scenario_id, query, index, iteration)
+
+    benchmark = benchmark_seconds(run_query, repeats, on_iteration, before_iteration)
+    width = benchmark["median_ci_rel_width"]
     return {
         "scenario": {"id": scenario_id, "query": query},
-        "times": benchmark_seconds(run_query, repeats),
+        **collect_iterations(benchmark["iterations"]),
+        "warmup_times": benchmark["warmup_times"],
+        "stop_reason": benchmark["stop_reason"],
+        "median_ci_rel_width": width if width is None or math.isfinite(width) else None,
     }
 
 
 def run_scenarios(
     scenarios: dict[str, str],
-    run_query: Callable[[str], Any],
-    repeats: int,
+    run_query: Callable[[str, PhaseTimer], Any],
+    repeats: int | RepeatPolicy,
+    history: RunHistory | None = None,
+    before_iteration: Callable[[], None] | None = None,
 ) -> list[dict[str, Any]]:
     results: list[dict[str, Any]] = []
     for scenario_id, query in scenarios.items():
@@ -69,8 +430,10 @@ def run_scenarios(
             run_scenario(
                 scenario_id=scenario_id,
                 query=query,
-                run_query=lambda query=query: run_query(query),
-                repeats=repeats
+                run_query=lambda phases, query=query: run_query(query, phases),
+                repeats=repeats,
+                history=history,
+                before_iteration=before_iteration,
             )
         )
     return results
@@ -81,31 +444,105 @@ def build_payload(
     client_id: str,
     repeats: int,
     results: list[dict[str, Any]],
+    consume: str = "materialize",
+    run: dict[str, Any] | None = None,
+    policy: RepeatPolicy | None = None,
 ) -> dict[str, Any]:
-    return {
+    payload = {
         "schema_version": schema_version,
-        "client": {"id": client_id, "language": "python"},
-        "parameters": {"repeats": repeats},
+        "client": {"id": variant_client_id(client_id, consume), "language": "python"},
+        "parameters": {"repeats": repeats, "consume": consume, **(policy.parameters() if policy else {})},
         "results": results,
     }
+    if run is not None:
+        payload["run"] = run
+    return payload
+
+
+def collect_batches(batches: Iterable[Any], phases: PhaseTimer) -> list[Any]:
+    iterator = iter(batches)
+    with phases("first_batch"):
+        first = next(iterator, None)
+    if first is None:
+        return []
+    collected = [first]
+    with phases("fetch"):
+        collected.extend(iterator)
+    return collected
+
+
+def limit_batches(batches: Iterable[Any], limit: int | None) -> Iterator[Any]:
+    rows_selected = 0
+    for batch in batches:
+        if limit is None:
+            yield batch
+            continue
 
+        remaining = limit - rows_selected
+        if remaining <= 0:
+            break
 
-def fetch_query_result(cursor: Any) -> Any:
+        if batch.num_rows <= remaining:
+            yield batch
+            rows_selected += batch.num_rows
+        else:
+            yield batch.slice(0, remaining)
+            break
+
+
+def filter_batches(batches: Iterable[Any], spec: ScenarioSpec) -> Iterator[Any]:
+    # Applies the predicate client side and drops a predicate-only column from the projection.
+    if spec.predicate is None:
+        yield from batches
+        return
+    expression = spec.arrow_filter()
+    for batch in batches:
+        batch = batch.filter(expression)
+        if spec.columns is not None:
+            batch = batch.select(spec.columns)
+        if batch.num_rows:
+            yield batch
+
+
+def drain_batches(batches: Iterable[Any], phases: PhaseTimer) -> StreamStats:
+    iterator = iter(batches)
+    stats = StreamStats()
+    with phases("first_batch"):
+        first = next(iterator, None)
+    if first is None:
+        return stats
+    stats.add(first)
+    del first
+    with phases("fetch"):
+        for batch in iterator:
+            stats.add(batch)
+    return stats
+
+
+def fetch_query_result(cursor: Any, phases: PhaseTimer | None = None) -> Any:
+    phases = phases or PhaseTimer()
     if hasattr(cursor, "fetchall_arrow"):
-        return cursor.fetchall_arrow()
+        with phases("fetch"):
+            return cursor.fetchall_arrow()
     if hasattr(cursor, "fetchallarrow"):
-        return cursor.fetchallarrow()
+        with phases("fetch"):
+            return cursor.fetchallarrow()
     if hasattr(cursor, "fetch_arrow_table"):
-        return cursor.fetch_arrow_table()
+        with phases("fetch"):
+            return cursor.fetch_arrow_table()
 
-    rows = cursor.fetchall()
+    with phases("first_batch"):
+        rows = list(cursor.fetchmany(getattr(cursor, "arraysize", 1) or 1))
+    with phases("fetch"):
+        rows.extend(cursor.fetchall())
     if rows and getattr(cursor, "description", None):
         columns = [column[0] for column in cursor.description]
         try:
             import pandas as pd
         except Exception:
             return rows
-        return pd.DataFrame.from_records(rows, columns=columns)
+        with phases("convert"):
+            return pd.DataFrame.from_records(rows, columns=columns)
     return rows
 
 
@@ -119,6 +556,17 @@ def strip_scheme(host: str) -> str:
     return cleaned.rstrip("/")
 
 
+def connect_databricks_sql(creds: dict[str, str], **kwargs: Any) -> Any:
+    import databricks.sql as sql
+
+    return sql.connect(
+        server_hostname=strip_scheme(creds["DATABRICKS_HOST"]),
+        http_path=f"/sql/1.0/warehouses/{creds['DATABRICKS_WAREHOUSE_ID']}",
+        access_token=creds["DATABRICKS_TOKEN"],
+        **kwargs,
+    )
+
+
 def build_databricks_jdbc_uri(host: str, warehouse_id: str) -> str:
     return (
         f"jdbc:databricks://{strip_scheme(host)}:443/default;"
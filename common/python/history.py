@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import socket
+import subprocess
+import uuid
+from datetime import date, datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+DEFAULT_HISTORY_DIR = Path("results") / "history"
+TRACKED_PACKAGES = [
+    "adbc-driver-manager",
+    "databricks-sdk",
+    "databricks-sql-connector",
+    "delta-kernel-rust-sharing-wrapper",
+    "delta-sharing",
+    "duckdb",
+    "jaydebeapi",
+    "JPype1",
+    "pandas",
+    "pyarrow",
+    "pyodbc",
+]
+HISTORY_METRICS = [
+    "execute_s",
+    "first_batch_s",
+    "fetch_s",
+    "convert_s",
+    "rows",
+    "bytes",
+    "rows_per_s",
+    "bytes_per_s",
+    "bytes_per_row",
+    "peak_rss_bytes",
+    "rss_baseline_bytes",
+    "rss_delta_bytes",
+    "arrow_allocated_bytes",
+    "arrow_peak_bytes",
+]
+PARTITION_COLUMNS = ["client_id", "run_date"]
+
+
+def history_schema(include_partitions: bool = True) -> Any:
+    import pyarrow as pa
+
+    fields = [
+        ("run_id", pa.string()),
+        ("started_at", pa.timestamp("us", tz="UTC")),
+        ("language", pa.string()),
+        ("git_sha", pa.string()),
+        ("host_fingerprint", pa.string()),
+        ("host", pa.string()),
+        ("parameters", pa.string()),
+        ("scenario_id", pa.string()),
+        ("query", pa.string()),
+        ("iteration", pa.int32()),
+        ("seconds", pa.float64()),
+        *[(name, pa.float64()) for name in HISTORY_METRICS],
+        ("extra", pa.string()),
+    ]
+    if include_partitions:
+        fields.extend((name, pa.string()) for name in PARTITION_COLUMNS)
+    return pa.schema(fields)
+
+
+def new_run_id(started_at: datetime | None = None) -> str:
+    started_at = started_at or datetime.now(timezone.utc)
+    return f"{started_at.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def git_sha() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def package_versions() -> dict[str, str | None]:
+    versions: dict[str, str | None] = {}
+    for name in TRACKED_PACKAGES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def host_info() -> dict[str, Any]:
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "packages": package_versions(),
+    }
+
+
+def fingerprint(values: dict[str, Any]) -> str:
+    encoded = json.dumps(values, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class RunHistory:
+    def __init__(
+        self,
+        client_id: str,
+        language: str,
+        parameters: dict[str, Any],
+        root: Path | None = DEFAULT_HISTORY_DIR,
+    ) -> None:
+        self.started_at = datetime.now(timezone.utc)
+        self.run_id = new_run_id(self.started_at)
+        self.client_id = client_id
+        self.language = language
+        self.parameters = parameters
+        self.root = root
+        self.git_sha = git_sha()
+        self.host = host_info()
+        self.host_fingerprint = fingerprint(self.host)
+        self.rows: list[dict[str, Any]] = []
+
+    @classmethod
+    def from_env(cls, client_id: str, parameters: dict[str, Any], language: str = "python") -> RunHistory:
+        root = os.getenv("BENCHMARK_HISTORY_DIR", str(DEFAULT_HISTORY_DIR))
+        return cls(client_id=client_id, language=language, parameters=parameters, root=Path(root) if root else None)
+
+    @property
+    def partition_dir(self) -> Path | None:
+        if self.root is None:
+            return None
+        return self.root / f"client_id={self.client_id}" / f"run_date={self.started_at.date().isoformat()}"
+
+    def metadata(self) -> dict[str, Any]:
+        return {
+            "id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "git_sha": self.git_sha,
+            "host_fingerprint": self.host_fingerprint,
+            "host": self.host,
+        }
+
+    def record(self, scenario_id: str, query: str, iteration: int, values: dict[str, Any]) -> None:
+        # Rows are buffered and written once by flush(), so the store holds one file per run, not per iteration.
+        if self.partition_dir is None:
+            return
+
+        extra = {
+            key: value
+            for key, value in values.items()
+            if key != "seconds" and key not in HISTORY_METRICS
+        }
+        row: dict[str, Any] = {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "language": self.language,
+            "git_sha": self.git_sha,
+            "host_fingerprint": self.host_fingerprint,
+            "host": json.dumps(self.host, sort_keys=True),
+            "parameters": json.dumps(self.parameters, sort_keys=True),
+            "scenario_id": scenario_id,
+            "query": query,
+            "iteration": iteration,
+            "seconds": values["seconds"],
+            "extra": json.dumps(extra, sort_keys=True) if extra else None,
+        }
+        for name in HISTORY_METRICS:
+            value = values.get(name)
+            row[name] = None if value is None else float(value)
+        self.rows.append(row)
+
+    def flush(self) -> None:
+        partition_dir = self.partition_dir
+        if partition_dir is None or not self.rows:
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist(self.rows, schema=history_schema(include_partitions=False))
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        # A run_id is written once; flushing again (after more rows) replaces the file.
+        out_path = partition_dir / f"{self.run_id}.parquet"
+        # Dot-prefixed temp files are skipped by load_history until the atomic rename lands.
+        temp_path = partition_dir / f".{out_path.name}.tmp"
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, out_path)
+
+
+def load_history(
+    root: Path = DEFAULT_HISTORY_DIR,
+    clients: list[str] | None = None,
+    scenarios: list[str] | None = None,
+    start: date | str | None = None,
+    end: date | str | None = None,
+    run_ids: list[str] | None = None,
+    columns: list[str] | None = None,
+) -> Any:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    schema = history_schema()
+    if not root.exists():
+        return schema.empty_table()
+
+    dataset = ds.dataset(
+        str(root),
+        format="parquet",
+        partitioning=ds.partitioning(
+            pa.schema([(name, pa.string()) for name in PARTITION_COLUMNS]),
+            flavor="hive",
+        ),
+        schema=schema,
+        ignore_prefixes=[".", "_"],
+    )
+    # Partition filters prune whole client/date directories before any footer is read.
+    filters = []
+    if clients:
+        filters.append(ds.field("client_id").isin(clients))
+    if start is not None:
+        filters.append(ds.field("run_date") >= str(start))
+    if end is not None:
+        filters.append(ds.field("run_date") <= str(end))
+    if scenarios:
+        filters.append(ds.field("scenario_id").isin(scenarios))
+    if run_ids:
+        filters.append(ds.field("run_id").isin(run_ids))
+
+    expression = None
+    for condition in filters:
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Query the run history store.")
+    parser.add_argument("--history-dir", type=Path, default=DEFAULT_HISTORY_DIR)
+    parser.add_argument("--client", action="append", dest="clients")
+    parser.add_argument("--scenario", action="append", dest="scenarios")
+    parser.add_argument("--run-id", action="append", dest="run_ids")
+    parser.add_argument("--start", help="First run date (YYYY-MM-DD), inclusive.")
+    parser.add_argument("--end", help="Last run date (YYYY-MM-DD), inclusive.")
+    parser.add_argument("--out", type=Path, help="Write matching iterations to CSV or Parquet.")
+    args = parser.parse_args(argv)
+
+    table = load_history(
+        root=args.history_dir,
+        clients=args.clients,
+        scenarios=args.scenarios,
+        start=args.start,
+        end=args.end,
+        run_ids=args.run_ids,
+    )
+    if args.out is None:
+        runs = table.group_by(["client_id", "run_id"]).aggregate([("seconds", "count")])
+        print(runs.sort_by([("client_id", "ascending"), ("run_id", "ascending")]).to_pandas().to_string(index=False))
+        return
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    if args.out.suffix == ".csv":
+        import pyarrow.csv as pacsv
+
+        pacsv.write_csv(table, str(args.out))
+    else:
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, str(args.out))
+    print(f"Wrote {table.num_rows} iterations to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
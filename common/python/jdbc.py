@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+import pyarrow as pa
+
+from common.python.helpers import (
+    PhaseTimer,
+    collect_batches,
+    fetch_query_result,
+    parse_choice_list,
+    parse_int_list,
+    variant_client_id,
+)
+from common.python.runner import Runner
+
+# rows: jaydebeapi fetchall, one Python object per cell; columnar: ColumnarResultSet chunks copied as primitive arrays.
+FETCH_MODES = ("rows", "columnar")
+JDBC_SWEEP_ARGUMENTS = ("jdbc_fetch", "fetch_rows")
+DEFAULT_FETCH_ROWS = 65536
+ARROW_ADD_OPENS = "--add-opens=java.base/java.nio=ALL-UNNAMED"
+HELPER_SOURCE = Path(__file__).resolve().parents[1] / "java" / "dbxfetch" / "ColumnarResultSet.java"
+HELPER_CLASSES = Path("data") / "java-classes"
+# Column kinds, as in ColumnarResultSet.java.
+INT, LONG, DOUBLE, DECIMAL, BOOLEAN, DATE, TIMESTAMP, STRING = range(8)
+
+
+def compile_helper() -> Path | None:
+    # Compiled once into data/java-classes; None without a JDK (rows mode still works).
+    target = HELPER_CLASSES / "dbxfetch" / "ColumnarResultSet.class"
+    if target.exists() and target.stat().st_mtime >= HELPER_SOURCE.stat().st_mtime:
+        return HELPER_CLASSES.resolve()
+    java_home = os.getenv("JAVA_HOME")
+    javac = str(Path(java_home) / "bin" / "javac") if java_home else shutil.which("javac")
+    if not javac or not Path(javac).exists():
+        return None
+    HELPER_CLASSES.mkdir(parents=True, exist_ok=True)
+    subprocess.run([javac, "--release", "11", "-d", str(HELPER_CLASSES), str(HELPER_SOURCE)], check=True)
+    return HELPER_CLASSES.resolve()
+
+
+def jdbc_jar_paths() -> list[str]:
+    # Driver jars of every imported JDBC runner, so runners sharing a process (--all) share one classpath.
+    paths = [os.getenv(runner_class.jar_env, "") for runner_class in JdbcRunner.__subclasses__()]
+    return [path for path in paths if path]
+
+
+def start_jvm(jar_paths: list[str]) -> bool:
+    # The classpath is fixed at JVM start, so the helper goes on it whenever it can be built; returns whether it did.
+    import jpype
+
+    if jpype.isJVMStarted():
+        try:
+            jpype.JClass("dbxfetch.ColumnarResultSet")
+        except Exception:
+            return False
+        return True
+    helper = compile_helper()
+    jars = list(dict.fromkeys(jar_paths))
+    classpath = os.pathsep.join([*jars, str(helper)] if helper else jars)
+    jpype.startJVM(jpype.getDefaultJVMPath(), ARROW_ADD_OPENS, f"-Djava.class.path={classpath}")
+    return helper is not None
+
+
+def add_jdbc_arguments(parser: argparse.ArgumentParser) -> None:
+    if parser.get_default("fetch_rows") is not None:
+        # Already added by another JDBC runner in the same run_cli call.
+        return
+    parser.add_argument(
+        "--jdbc-fetch",
+        type=parse_choice_list(FETCH_MODES),
+        default=os.getenv("JDBC_FETCH", "rows"),
+        help=f"Result path ({', '.join(FETCH_MODES)}); comma-separated to sweep.",
+    )
+    parser.add_argument(
+        "--fetch-rows",
+        type=parse_int_list,
+        default=os.getenv("JDBC_FETCH_ROWS", str(DEFAULT_FETCH_ROWS)),
+        help="Rows per columnar chunk (and statement fetch size) for --jdbc-fetch columnar; comma-separated to sweep.",
+    )
+
+
+def arrow_type(kind: int, precision: int, scale: int) -> pa.DataType:
+    if kind == DECIMAL:
+        return pa.decimal128(precision, scale)
+    return {
+        INT: pa.int32(),
+        LONG: pa.int64(),
+        DOUBLE: pa.float64(),
+        BOOLEAN: pa.bool_(),
+        DATE: pa.date32(),
+        TIMESTAMP: pa.timestamp("us"),
+        STRING: pa.string(),
+    }[kind]
+
+
+def validity_buffer(mask: np.ndarray | None) -> tuple[pa.Buffer | None, int]:
+    # Arrow validity bitmap (1 = valid, LSB first) and null count for from_buffers.
+    if mask is None:
+        return None, 0
+    return pa.py_buffer(np.packbits(~mask, bitorder="little")), int(np.count_nonzero(mask))
+
+
+def column_array(reader: Any, index: int, kind: int, column_type: pa.DataType) -> pa.Array:
+    # np.array() copies Java primitive arrays through the buffer protocol, not element by element.
+    nulls = reader.nulls(index)
+    mask = None if nulls is None else np.array(nulls, dtype=bool)
+    if kind == STRING:
+        # UTF-8 bytes and int32 offsets come from the Java side, so no Python str is created per cell.
+        offsets = np.array(reader.stringOffsets(index), dtype=np.int32)
+        data = np.array(reader.stringData(index), dtype=np.int8)
+        validity, null_count = validity_buffer(mask)
+        buffers = [validity, pa.py_buffer(offsets), pa.py_buffer(data)]
+        return pa.Array.from_buffers(column_type, offsets.size - 1, buffers, null_count=null_count)
+    if kind == BOOLEAN:
+        return pa.array(np.array(reader.booleans(index), dtype=bool), mask=mask)
+    if kind == DECIMAL:
+        unscaled = np.array(reader.longs(index), dtype=np.int64)
+        # decimal128 values are 16-byte little-endian two's complement integers: low word, then the sign extension.
+        words = np.empty((unscaled.size, 2), dtype=np.int64)
+        words[:, 0] = unscaled
+        words[:, 1] = unscaled >> 63
+        validity, null_count = validity_buffer(mask)
+        return pa.Array.from_buffers(column_type, unscaled.size, [validity, pa.py_buffer(words)], null_count=null_count)
+    if kind in (INT, DATE):
+        values = np.array(reader.ints(index), dtype=np.int32)
+    elif kind == DOUBLE:
+        values = np.array(reader.doubles(index), dtype=np.float64)
+    else:
+        values = np.array(reader.longs(index), dtype=np.int64)
+    return pa.array(values, mask=mask).view(column_type)
+
+
+def columnar_schema(result_set: Any, reader: Any) -> tuple[pa.Schema, list[int]]:
+    meta = result_set.getMetaData()
+    kinds = [int(kind) for kind in reader.kinds()]
+    scales = [int(scale) for scale in reader.scales()]
+    fields = [
+        pa.field(str(meta.getColumnLabel(i + 1)), arrow_type(kind, int(meta.getPrecision(i + 1)), scales[i]))
+        for i, kind in enumerate(kinds)
+    ]
+    return pa.schema(fields), kinds
+
+
+def iter_columnar_batches(statement: Any, reader: Any, schema: pa.Schema, kinds: list[int], rows: int) -> Iterator[pa.RecordBatch]:
+    try:
+        while reader.fetch(rows) > 0:
+            columns = [column_array(reader, i, kind, schema.field(i).type) for i, kind in enumerate(kinds)]
+            yield pa.RecordBatch.from_arrays(columns, schema=schema)
+    finally:
+        statement.close()
+
+
+class JdbcRunner(Runner):
+    # Shared by the Databricks and local JDBC runners; subclasses supply the driver, URL and jar.
+    sweep_arguments = JDBC_SWEEP_ARGUMENTS
+    parallel_fetch = True
+    driver_class = ""
+    # Env var holding the driver jar path; read for every JDBC runner when the JVM starts.
+    jar_env = ""
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        add_jdbc_arguments(parser)
+
+    def variant(self) -> str:
+        suffix = ""
+        if self.args.jdbc_fetch == "columnar":
+            suffix = "-columnar" if self.args.fetch_rows == DEFAULT_FETCH_ROWS else f"-columnar-r{self.args.fetch_rows}"
+        return variant_client_id(f"{self.client_id}{suffix}", self.args.consume)
+
+    def parameters(self) -> dict[str, Any]:
+        if self.args.jdbc_fetch == "rows":
+            return {"fetch": "rows"}
+        return {"fetch": "columnar", "fetch_rows": self.args.fetch_rows}
+
+    def jar_path(self) -> str:
+        return self.creds[self.jar_env]
+
+    def jdbc_url(self) -> str:
+        raise NotImplementedError
+
+    def driver_args(self) -> list[str] | None:
+        return None
+
+    def rewrite_query(self, query: str) -> str:
+        return query
+
+    def connect(self) -> None:
+        import jaydebeapi
+        import jpype
+
+        helper = start_jvm([self.jar_path(), *jdbc_jar_paths()])
+        try:
+            jpype.JClass(self.driver_class)
+        except Exception as error:
+            raise RuntimeError(
+                f"{self.driver_class} ({self.jar_path()}) is not on the classpath of the JVM already running in this process; "
+                f"set {self.jar_env} before the first JDBC runner starts the JVM."
+            ) from error
+        if self.args.jdbc_fetch == "columnar" and not helper:
+            raise RuntimeError("--jdbc-fetch columnar needs a JDK (javac on PATH or JAVA_HOME) to build ColumnarResultSet.")
+        self.connection = jaydebeapi.connect(self.driver_class, self.jdbc_url(), self.driver_args())
+
+    def execute(self, query: str, phases: PhaseTimer):
+        if self.args.jdbc_fetch == "columnar":
+            import jpype
+
+            statement = self.connection.jconn.createStatement()
+            try:
+                statement.setFetchSize(self.args.fetch_rows)
+                with phases("execute"):
+                    result_set = statement.executeQuery(self.rewrite_query(query))
+                reader = jpype.JClass("dbxfetch.ColumnarResultSet")(result_set)
+                schema, kinds = columnar_schema(result_set, reader)
+            except Exception:
+                statement.close()
+                raise
+            return statement, reader, schema, kinds
+        cursor = self.connection.cursor()
+        try:
+            with phases("execute"):
+                cursor.execute(self.rewrite_query(query))
+        except Exception:
+            cursor.close()
+            raise
+        return cursor
+
+    def iter_batches(self, handle, phases: PhaseTimer):
+        if self.args.jdbc_fetch != "columnar":
+            raise RuntimeError(f"{self.client_id} --jdbc-fetch=rows does not expose Arrow batches; use --jdbc-fetch=columnar or --consume=materialize.")
+        statement, reader, schema, kinds = handle
+        return iter_columnar_batches(statement, reader, schema, kinds, self.args.fetch_rows)
+
+    def materialize(self, handle, phases: PhaseTimer):
+        if self.args.jdbc_fetch == "columnar":
+            schema = handle[2]
+            batches = collect_batches(self.iter_batches(handle, phases), phases)
+            with phases("convert"):
+                return pa.Table.from_batches(batches, schema=schema)
+        try:
+            return fetch_query_result(handle, phases)
+        finally:
+            handle.close()
+
+    def close(self) -> None:
+        self.connection.close()
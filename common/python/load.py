@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any
+
+import numpy as np
+from dotenv import load_dotenv
+
+from common.python.helpers import (
+    PhaseTimer,
+    add_harness_arguments,
+    default_out_path,
+    load_queries,
+    require_envs,
+    result_size,
+    write_payload,
+)
+from common.python.runner import QUERIES_PATH, RUNNER_IDS, Runner, expand_sweep, get_runner
+
+LOAD_MODES = ("thread", "process")
+LATENCY_QUANTILES = {"p50_s": 0.5, "p95_s": 0.95, "p99_s": 0.99}
+CONNECT_TIMEOUT_S = 600.0
+
+
+def parse_levels(value: str) -> list[int]:
+    levels = [int(level) for level in value.split(",") if level.strip()]
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError(f"Invalid concurrency levels: {value}")
+    return levels
+
+
+def parse_mix(values: list[str] | None, scenarios: dict[str, str]) -> dict[str, float]:
+    # "--scenario narrow_100000:3 --scenario wide_1000" replays narrow_100000 three times as often.
+    if not values:
+        return {scenario_id: 1.0 for scenario_id in scenarios}
+    mix: dict[str, float] = {}
+    for value in values:
+        scenario_id, _, weight = value.partition(":")
+        if scenario_id not in scenarios:
+            raise RuntimeError(f"Unknown scenario in --scenario: {scenario_id}")
+        mix[scenario_id] = float(weight) if weight else 1.0
+    return mix
+
+
+def replay_mix(
+    runner: Runner,
+    scenarios: dict[str, str],
+    mix: dict[str, float],
+    start: float,
+    deadline: float,
+    seed: int,
+) -> list[dict[str, Any]]:
+    run_query = runner.stream_query if runner.args.consume == "stream" else runner.run_query
+    rng = random.Random(seed)
+    scenario_ids = list(mix)
+    weights = list(mix.values())
+    records: list[dict[str, Any]] = []
+    while time.perf_counter() < deadline:
+        scenario_id = rng.choices(scenario_ids, weights)[0]
+        phases = PhaseTimer()
+        started = time.perf_counter()
+        try:
+            result = run_query(scenarios[scenario_id], phases)
+        except Exception as error:
+            records.append(
+                {
+                    "scenario_id": scenario_id,
+                    "start_s": started - start,
+                    "seconds": time.perf_counter() - started,
+                    "error": repr(error),
+                }
+            )
+            continue
+        seconds = time.perf_counter() - started
+        rows, nbytes = result_size(result)
+        del result
+        records.append(
+            {
+                "scenario_id": scenario_id,
+                "start_s": started - start,
+                "seconds": seconds,
+                "rows": rows,
+                "bytes": nbytes,
+            }
+        )
+    return records
+
+
+def warm_up(runner: Runner, scenarios: dict[str, str], mix: dict[str, float], seed: int) -> None:
+    # Cold-connection costs (first cloud fetch, JIT, caches) are paid before the measured window.
+    run_query = runner.stream_query if runner.args.consume == "stream" else runner.run_query
+    rng = random.Random(-seed - 1)
+    for _ in range(runner.args.warmup_queries):
+        run_query(scenarios[rng.choices(list(mix), list(mix.values()))[0]], PhaseTimer())
+
+
+def load_worker(
+    runner_class: type[Runner],
+    creds: dict[str, str],
+    args: argparse.Namespace,
+    prepared: dict[str, Any],
+    scenarios: dict[str, str],
+    mix: dict[str, float],
+    seed: int,
+    barrier: Any,
+    results: Any,
+) -> None:
+    # Every worker owns its connection; the barrier keeps connection setup out of the measured window.
+    runner = runner_class(creds, args)
+    try:
+        runner.connect()
+    except Exception as error:
+        barrier.abort()
+        results.put({"error": f"connect failed: {error!r}", "records": []})
+        return
+    try:
+        runner.adopt(prepared)
+        warm_up(runner, scenarios, mix, seed)
+        barrier.wait(timeout=CONNECT_TIMEOUT_S)
+        start = time.perf_counter()
+        records = replay_mix(runner, scenarios, mix, start, start + args.duration_s, seed)
+        results.put({"error": None, "records": records})
+    except Exception as error:
+        results.put({"error": repr(error), "records": []})
+    finally:
+        runner.close()
+
+
+def process_worker(client_id: str, *worker_args: Any) -> None:
+    load_dotenv()
+    load_worker(get_runner(client_id), *worker_args)
+
+
+def run_level(
+    runner: Runner,
+    scenarios: dict[str, str],
+    mix: dict[str, float],
+    concurrency: int,
+    mode: str,
+    seed: int,
+) -> dict[str, Any]:
+    if mode == "process":
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(concurrency + 1)
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=process_worker,
+                args=(runner.client_id, runner.creds, runner.args, runner.prepared_state(), scenarios, mix, seed + index, barrier, results),
+            )
+            for index in range(concurrency)
+        ]
+    else:
+        barrier = threading.Barrier(concurrency + 1)
+        results = queue.Queue()
+        workers = [
+            threading.Thread(
+                target=load_worker,
+                args=(type(runner), runner.creds, runner.args, runner.prepared_state(), scenarios, mix, seed + index, barrier, results),
+                daemon=True,
+            )
+            for index in range(concurrency)
+        ]
+
+    for worker in workers:
+        worker.start()
+    try:
+        barrier.wait(timeout=CONNECT_TIMEOUT_S)
+    except threading.BrokenBarrierError:
+        pass
+    start = time.perf_counter()
+    outcomes = [results.get() for _ in workers]
+    wall_s = time.perf_counter() - start
+    for worker in workers:
+        worker.join()
+
+    failed = [outcome["error"] for outcome in outcomes if outcome["error"]]
+    if len(failed) == len(workers):
+        raise RuntimeError(f"All {concurrency} load workers failed: {failed[0]}")
+    records = [record for outcome in outcomes for record in outcome["records"]]
+    return summarize_level(records, concurrency, mode, wall_s, failed)
+
+
+def latency_summary(seconds: list[float]) -> dict[str, float | None]:
+    if not seconds:
+        return {name: None for name in LATENCY_QUANTILES}
+    values = np.quantile(np.asarray(seconds), list(LATENCY_QUANTILES.values()))
+    return {name: float(value) for name, value in zip(LATENCY_QUANTILES, values)}
+
+
+def summarize_level(
+    records: list[dict[str, Any]],
+    concurrency: int,
+    mode: str,
+    wall_s: float,
+    worker_errors: list[str],
+) -> dict[str, Any]:
+    ok = [record for record in records if "error" not in record]
+    rows = sum(record["rows"] or 0 for record in ok)
+    nbytes = sum(record["bytes"] or 0 for record in ok)
+    by_scenario: dict[str, list[float]] = {}
+    for record in ok:
+        by_scenario.setdefault(record["scenario_id"], []).append(record["seconds"])
+    return {
+        "concurrency": concurrency,
+        "mode": mode,
+        "wall_s": wall_s,
+        "queries": len(ok),
+        "errors": len(records) - len(ok),
+        "worker_errors": worker_errors,
+        "queries_per_s": len(ok) / wall_s,
+        "rows": rows,
+        "bytes": nbytes,
+        "rows_per_s": rows / wall_s,
+        "bytes_per_s": nbytes / wall_s,
+        **latency_summary([record["seconds"] for record in ok]),
+        "scenarios": {
+            scenario_id: {"queries": len(seconds), **latency_summary(seconds)}
+            for scenario_id, seconds in sorted(by_scenario.items())
+        },
+        "errors_sample": sorted({record["error"] for record in records if "error" in record})[:5],
+    }
+
+
+def print_level(level: dict[str, Any]) -> None:
+    print(
+        f"{level['concurrency']:>5} {level['queries']:>8} {level['errors']:>6} "
+        f"{level['rows_per_s']:>14,.0f} {level['bytes_per_s'] / 1e6:>10.1f} "
+        + " ".join(f"{float('nan') if level[name] is None else level[name]:>9.3f}" for name in LATENCY_QUANTILES),
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Replay a scenario mix from N concurrent clients for a fixed duration and report throughput and tail latency."
+    )
+    add_harness_arguments(parser)
+    parser.add_argument("--runner", required=True, choices=RUNNER_IDS)
+    parser.add_argument("--concurrency", type=parse_levels, default=[1, 2, 4, 8], help="Comma-separated levels, e.g. 1,2,4,8,16.")
+    parser.add_argument("--duration-s", type=float, default=60.0, help="Replay duration per concurrency level.")
+    parser.add_argument("--mode", choices=LOAD_MODES, default="thread", help="Run clients as threads or processes.")
+    parser.add_argument("--scenario", action="append", dest="scenarios", help="Scenario id with optional weight, e.g. narrow_100000:3.")
+    parser.add_argument("--warmup-queries", type=int, default=1, help="Unmeasured queries per client before each level starts.")
+    parser.add_argument("--seed", type=int, default=0)
+    known, _ = parser.parse_known_args(argv)
+    runner_class = get_runner(known.runner)
+    runner_class.add_arguments(parser)
+    combinations = expand_sweep(runner_class, parser.parse_args(argv))
+    if len(combinations) > 1:
+        parser.error(f"load mode runs one configuration; pass single values for {', '.join((*runner_class.sweep_arguments, 'parallel'))}")
+    args = combinations[0]
+    if args.parallel > 1:
+        parser.error("load mode runs single-stream queries; concurrency comes from --concurrency")
+
+    if args.consume == "stream" and not runner_class.supports_stream():
+        raise RuntimeError(f"{runner_class.client_id} does not expose Arrow batches; only --consume=materialize is supported.")
+    creds = require_envs(runner_class.required_envs)
+    loaded = load_queries(QUERIES_PATH)
+    mix = parse_mix(args.scenarios, loaded["scenarios"])
+
+    # The coordinating runner prepares shared state once (exports, limits); workers open their own connections.
+    runner = runner_class(creds, args)
+    runner.specs = loaded["specs"]
+    runner.connect()
+    levels = []
+    try:
+        runner.prepare(loaded["scenarios"])
+        print(f"{'conc':>5} {'queries':>8} {'errors':>6} {'rows/s':>14} {'MB/s':>10} {'p50_s':>9} {'p95_s':>9} {'p99_s':>9}")
+        for concurrency in args.concurrency:
+            level = run_level(runner, loaded["scenarios"], mix, concurrency, args.mode, args.seed)
+            levels.append(level)
+            print_level(level)
+    finally:
+        runner.close()
+
+    payload = {
+        "schema_version": loaded["queries"]["schema_version"],
+        "client": {"id": runner.variant(), "language": "python"},
+        "parameters": {
+            "consume": args.consume,
+            "mode": args.mode,
+            "duration_s": args.duration_s,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "warmup_queries": args.warmup_queries,
+            "seed": args.seed,
+            **runner.parameters(),
+        },
+        "levels": levels,
+    }
+    out_path = default_out_path(f"{runner.variant()}-load")
+    write_payload(payload, out_path)
+    print(f"Wrote {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import resource
+import sys
+import threading
+from pathlib import Path
+from typing import Any
+
+STATM_PATH = Path("/proc/self/statm")
+PAGE_SIZE = resource.getpagesize()
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes() -> int:
+    try:
+        return int(STATM_PATH.read_text().split()[1]) * PAGE_SIZE
+    except OSError:
+        return peak_rss_bytes()
+
+
+def loaded_pyarrow() -> Any:
+    # Only account Arrow memory when the runner already imported pyarrow.
+    return sys.modules.get("pyarrow")
+
+
+class MemorySampler:
+    def __init__(self, interval_s: float = 0.01) -> None:
+        self.interval_s = interval_s
+        self.baseline_rss_bytes = 0
+        self.peak_rss_bytes = 0
+        self.baseline_arrow_bytes: int | None = None
+        self.peak_arrow_bytes: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        self.peak_rss_bytes = max(self.peak_rss_bytes, current_rss_bytes())
+        pa = loaded_pyarrow()
+        if pa is not None:
+            self.peak_arrow_bytes = max(self.peak_arrow_bytes or 0, pa.total_allocated_bytes())
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def __enter__(self) -> MemorySampler:
+        pa = loaded_pyarrow()
+        self.baseline_rss_bytes = current_rss_bytes()
+        self.peak_rss_bytes = self.baseline_rss_bytes
+        self.baseline_arrow_bytes = pa.total_allocated_bytes() if pa is not None else None
+        self.peak_arrow_bytes = self.baseline_arrow_bytes
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="memory-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+
+    def metrics(self) -> dict[str, int | None]:
+        pa = loaded_pyarrow()
+        metrics: dict[str, int | None] = {
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "rss_baseline_bytes": self.baseline_rss_bytes,
+            "rss_delta_bytes": self.peak_rss_bytes - self.baseline_rss_bytes,
+            "arrow_allocated_bytes": None,
+            "arrow_peak_bytes": self.peak_arrow_bytes,
+        }
+        if pa is not None:
+            metrics["arrow_allocated_bytes"] = pa.total_allocated_bytes()
+        return metrics
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import os
+from typing import Any
+
+import pyarrow as pa
+
+from common.python.helpers import (
+    PhaseTimer,
+    collect_batches,
+    fetch_query_result,
+    parse_choice_list,
+    parse_int_list,
+    variant_client_id,
+)
+from common.python.runner import Runner
+
+# rows: pyodbc row tuples into a pandas DataFrame; arrow: arrow-odbc column-wise bound buffers into Arrow batches.
+FETCH_MODES = ("rows", "arrow")
+ODBC_SWEEP_ARGUMENTS = ("odbc_fetch", "batch_size")
+DEFAULT_BATCH_SIZE = 65536
+
+
+def add_odbc_arguments(parser: argparse.ArgumentParser) -> None:
+    if parser.get_default("odbc_fetch") is not None:
+        # Already added by another ODBC runner in the same run_cli call.
+        return
+    parser.add_argument(
+        "--odbc-fetch",
+        type=parse_choice_list(FETCH_MODES),
+        default=os.getenv("ODBC_FETCH", "rows"),
+        help=f"Result path ({', '.join(FETCH_MODES)}); comma-separated to sweep.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=parse_int_list,
+        default=os.getenv("ODBC_BATCH_SIZE", str(DEFAULT_BATCH_SIZE)),
+        help="Rows per bound buffer for --odbc-fetch arrow; comma-separated to sweep.",
+    )
+    parser.add_argument(
+        "--max-text-size",
+        type=int,
+        default=int(os.environ["ODBC_MAX_TEXT_SIZE"]) if os.getenv("ODBC_MAX_TEXT_SIZE") else None,
+        help="Upper bound for text column buffers in --odbc-fetch arrow; default: the size the driver reports.",
+    )
+
+
+def odbc_suffix(args: argparse.Namespace) -> str:
+    if args.odbc_fetch == "rows":
+        return ""
+    return "-arrow" if args.batch_size == DEFAULT_BATCH_SIZE else f"-arrow-b{args.batch_size}"
+
+
+def odbc_parameters(args: argparse.Namespace) -> dict[str, Any]:
+    if args.odbc_fetch == "rows":
+        return {"fetch": "rows"}
+    return {"fetch": "arrow", "batch_size": args.batch_size, "max_text_size": args.max_text_size}
+
+
+class OdbcRunner(Runner):
+    # Shared by the Databricks and local ODBC runners; subclasses supply the connection string.
+    sweep_arguments = ODBC_SWEEP_ARGUMENTS
+    parallel_fetch = True
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        add_odbc_arguments(parser)
+
+    def variant(self) -> str:
+        return variant_client_id(f"{self.client_id}{odbc_suffix(self.args)}", self.args.consume)
+
+    def parameters(self) -> dict[str, Any]:
+        return odbc_parameters(self.args)
+
+    def connection_string(self) -> str:
+        raise NotImplementedError
+
+    def rewrite_query(self, query: str) -> str:
+        return query
+
+    def connect(self) -> None:
+        if self.args.odbc_fetch == "arrow":
+            import arrow_odbc
+
+            self.connection = arrow_odbc.connect(self.connection_string())
+            return
+        import pyodbc
+
+        self.connection = pyodbc.connect(self.connection_string(), autocommit=True)
+
+    def execute(self, query: str, phases: PhaseTimer):
+        if self.args.odbc_fetch == "arrow":
+            with phases("execute"):
+                return self.connection.read_arrow_batches(
+                    self.rewrite_query(query),
+                    batch_size=self.args.batch_size,
+                    max_text_size=self.args.max_text_size,
+                )
+        cursor = self.connection.cursor()
+        try:
+            with phases("execute"):
+                cursor.execute(self.rewrite_query(query))
+        except Exception:
+            cursor.close()
+            raise
+        return cursor
+
+    def iter_batches(self, handle, phases: PhaseTimer):
+        if self.args.odbc_fetch != "arrow":
+            raise RuntimeError(f"{self.client_id} --odbc-fetch=rows does not expose Arrow batches; use --odbc-fetch=arrow or --consume=materialize.")
+        return handle
+
+    def materialize(self, handle, phases: PhaseTimer):
+        if self.args.odbc_fetch == "arrow":
+            batches = collect_batches(handle, phases)
+            with phases("convert"):
+                return pa.Table.from_batches(batches, schema=handle.schema)
+        try:
+            return fetch_query_result(handle, phases)
+        finally:
+            handle.close()
+
+    def close(self) -> None:
+        if self.args.odbc_fetch == "arrow":
+            # arrow-odbc connections have no close(); the handle is released with the object.
+            self.connection = None
+            return
+        self.connection.close()
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from dotenv import load_dotenv
+
+from common.python.runner import RUNNER_IDS
+
+
+@dataclass
+class RunnerSpec:
+    id: str
+    language: str
+    resource: str
+    # Optional runners (e.g. local synthetic data) only run when named with --only.
+    optional: bool = False
+
+    def command(self, runner_args: list[str]) -> list[str]:
+        script = Path("runners") / self.id / ("run.py" if self.language == "python" else "run.R")
+        if self.language == "python":
+            return [sys.executable, str(script), *runner_args]
+        return ["Rscript", str(script)]
+
+
+@dataclass
+class RunnerStatus:
+    id: str
+    resource: str
+    status: str = "pending"
+    returncode: int | None = None
+    seconds: float | None = None
+    log_path: str = ""
+    env_overrides: list[str] = field(default_factory=list)
+    runner_args: list[str] = field(default_factory=list)
+
+
+# Python runners not on the warehouse; python-local-* runners use local synthetic data and are optional.
+PYTHON_RESOURCES = {
+    "python-sharing-client": "sharing",
+    "python-sharing-client-hack": "sharing",
+    "python-external-duckdb": "uc-external",
+}
+
+
+def python_runner_spec(runner_id: str) -> RunnerSpec:
+    if runner_id.startswith("python-local-"):
+        return RunnerSpec(runner_id, "python", "local", optional=True)
+    return RunnerSpec(runner_id, "python", PYTHON_RESOURCES.get(runner_id, "warehouse"))
+
+
+# Runners that share a resource run one after another; different resources may run concurrently.
+RUNNERS = [
+    *(python_runner_spec(runner_id) for runner_id in RUNNER_IDS),
+    RunnerSpec("r-brickster-sql", "r", "warehouse"),
+    RunnerSpec("r-adbc", "r", "warehouse"),
+    RunnerSpec("r-odbc", "r", "warehouse"),
+    RunnerSpec("r-jdbc", "r", "warehouse"),
+]
+
+
+def parse_env_overrides(values: list[str]) -> dict[str, dict[str, str]]:
+    overrides: dict[str, dict[str, str]] = {}
+    for value in values:
+        runner_id, _, assignment = value.partition(":")
+        key, _, env_value = assignment.partition("=")
+        if not runner_id or not key:
+            raise RuntimeError(f"Invalid --env value (expected <runner>:<KEY>=<value>): {value}")
+        overrides.setdefault(runner_id, {})[key] = env_value
+    return overrides
+
+
+def parse_runner_args(values: list[str]) -> dict[str, list[str]]:
+    known = {spec.id: spec for spec in RUNNERS}
+    runner_args: dict[str, list[str]] = {}
+    for value in values:
+        runner_id, _, text = value.partition("=")
+        if runner_id not in known or not text:
+            raise RuntimeError(f"Invalid --runner-args value (expected <runner>=<args>): {value}")
+        if known[runner_id].language != "python":
+            raise RuntimeError(f"--runner-args only applies to Python runners: {runner_id}")
+        runner_args.setdefault(runner_id, []).extend(shlex.split(text))
+    return runner_args
+
+
+def resource_key(spec: RunnerSpec, env: dict[str, str]) -> str:
+    # Warehouse runners pointed at different warehouses do not contend with each other.
+    if spec.resource == "warehouse":
+        return f"warehouse:{env.get('DATABRICKS_WAREHOUSE_ID', '')}"
+    return spec.resource
+
+
+def kill_process_group(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+def run_runner(
+    spec: RunnerSpec,
+    status: RunnerStatus,
+    env: dict[str, str],
+    runner_args: list[str],
+    timeout_s: float | None,
+    log_dir: Path,
+) -> RunnerStatus:
+    log_path = log_dir / f"{spec.id}.log"
+    status.log_path = str(log_path)
+    status.status = "running"
+    print(f"[start] {spec.id} ({status.resource})", flush=True)
+    start = time.perf_counter()
+    with log_path.open("w", encoding="utf-8") as log_file:
+        try:
+            process = subprocess.Popen(
+                spec.command(runner_args),
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                env=env,
+                start_new_session=True,
+            )
+        except OSError as error:
+            log_file.write(f"Failed to start runner: {error}\n")
+            status.status = "failed"
+        else:
+            try:
+                status.returncode = process.wait(timeout=timeout_s)
+                status.status = "ok" if status.returncode == 0 else "failed"
+            except subprocess.TimeoutExpired:
+                kill_process_group(process)
+                status.returncode = process.returncode
+                status.status = "timeout"
+    status.seconds = time.perf_counter() - start
+    print(f"[{status.status}] {spec.id} in {status.seconds:.1f}s (log: {log_path})", flush=True)
+    return status
+
+
+def run_chain(
+    chain: list[tuple[RunnerSpec, RunnerStatus, dict[str, str]]],
+    timeout_s: float | None,
+    log_dir: Path,
+) -> None:
+    for spec, status, env in chain:
+        run_runner(spec, status, env, status.runner_args, timeout_s, log_dir)
+
+
+def select_runners(only: list[str] | None, skip: list[str] | None, languages: list[str] | None) -> list[RunnerSpec]:
+    known = {spec.id for spec in RUNNERS}
+    unknown = sorted((set(only or []) | set(skip or [])) - known)
+    if unknown:
+        raise RuntimeError(f"Unknown runner id(s): {', '.join(unknown)}")
+    return [
+        spec
+        for spec in RUNNERS
+        if (spec.id in (only or []) or (not only and not spec.optional))
+        and spec.id not in (skip or [])
+        and (not languages or spec.language in languages)
+    ]
+
+
+def print_report(statuses: list[RunnerStatus], wall_s: float) -> None:
+    print()
+    print(f"{'runner':<30} {'resource':<28} {'status':<8} {'exit':>5} {'seconds':>9}")
+    for status in statuses:
+        seconds = f"{status.seconds:.1f}" if status.seconds is not None else "-"
+        returncode = "-" if status.returncode is None else str(status.returncode)
+        print(f"{status.id:<30} {status.resource:<28} {status.status:<8} {returncode:>5} {seconds:>9}")
+    print(f"Total wall-clock: {wall_s:.1f}s")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run benchmark runners in isolated subprocesses with timeouts and a status report.",
+        epilog=(
+            "Arguments after -- are passed to every Python runner (for example -- --consume=stream); "
+            "use --runner-args for options only one runner understands."
+        ),
+    )
+    parser.add_argument("--only", action="append", help="Runner id to include (repeatable).")
+    parser.add_argument("--skip", action="append", help="Runner id to exclude (repeatable).")
+    parser.add_argument("--language", action="append", choices=["python", "r"])
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("BENCHMARK_CONCURRENCY", "1")),
+        help="Maximum number of independent resources benchmarked at once.",
+    )
+    parser.add_argument(
+        "--timeout-s",
+        type=float,
+        default=float(os.getenv("BENCHMARK_RUNNER_TIMEOUT_S", "10800")),
+        help="Per-runner timeout in seconds (0 disables).",
+    )
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        help="Per-runner env override, e.g. r-adbc:DATABRICKS_WAREHOUSE_ID=abc123 (repeatable).",
+    )
+    parser.add_argument(
+        "--runner-args",
+        action="append",
+        default=[],
+        help='Arguments for one Python runner, after the shared ones, e.g. python-adbc="--adbc-mode table" (repeatable).',
+    )
+    parser.add_argument("--log-dir", type=Path, default=Path("results") / "logs")
+    argv = sys.argv[1:] if argv is None else argv
+    runner_args: list[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, runner_args = argv[:split], argv[split + 1 :]
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    overrides = parse_env_overrides(args.env)
+    scoped_args = parse_runner_args(args.runner_args)
+    specs = select_runners(args.only, args.skip, args.language)
+    log_dir = args.log_dir / time.strftime("%Y%m%dT%H%M%S")
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    base_env = dict(os.environ)
+    base_env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(Path.cwd()), base_env.get("PYTHONPATH", "")]))
+    chains: dict[str, list[tuple[RunnerSpec, RunnerStatus, dict[str, str]]]] = {}
+    statuses: list[RunnerStatus] = []
+    for spec in specs:
+        env = {**base_env, **overrides.get(spec.id, {})}
+        resource = resource_key(spec, env)
+        status = RunnerStatus(
+            id=spec.id,
+            resource=resource,
+            env_overrides=sorted(overrides.get(spec.id, {})),
+            runner_args=[*runner_args, *scoped_args.get(spec.id, [])],
+        )
+        statuses.append(status)
+        chains.setdefault(resource, []).append((spec, status, env))
+
+    timeout_s = args.timeout_s or None
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        futures = [pool.submit(run_chain, chain, timeout_s, log_dir) for chain in chains.values()]
+        for future in futures:
+            future.result()
+    wall_s = time.perf_counter() - start
+
+    print_report(statuses, wall_s)
+    report: dict[str, Any] = {
+        "concurrency": args.concurrency,
+        "timeout_s": timeout_s,
+        "runner_args": runner_args,
+        "wall_seconds": wall_s,
+        "runners": [asdict(status) for status in statuses],
+    }
+    (log_dir / "orchestrate.json").write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0 if all(status.status == "ok" for status in statuses) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
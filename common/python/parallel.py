@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any
+
+from common.python.helpers import DEFAULT_PARTITION_COLUMN, PhaseTimer, StreamStats
+from common.python.runner import Runner
+from common.python.synthetic import SOURCE_TABLE
+
+
+def split_limit(limit: int | None, parts: int) -> list[int | None]:
+    # Shares differ by at most one row and add up to the limit.
+    if limit is None:
+        return [None] * parts
+    return [limit // parts + (1 if index < limit % parts else 0) for index in range(parts)]
+
+
+def partition_conditions(column: str, method: str, parts: int, bounds: tuple[int, int] | None) -> list[str]:
+    if method == "modulo":
+        return [f"{column} % {parts} = {index}" for index in range(parts)]
+    low, high = bounds
+    edges = [low + (high - low + 1) * index // parts for index in range(parts + 1)]
+    return [f"{column} >= {start} AND {column} < {end}" for start, end in zip(edges, edges[1:])]
+
+
+def first_row(result: Any) -> tuple[Any, ...]:
+    # Arrow table or pandas DataFrame, whichever the runner materializes.
+    if hasattr(result, "to_pylist"):
+        return tuple(result.to_pylist()[0].values())
+    return tuple(result.iloc[0])
+
+
+def concat_results(results: list[Any]) -> Any:
+    if all(hasattr(result, "num_rows") for result in results):
+        import pyarrow as pa
+
+        # concat_tables only collects the partitions' chunks; no buffers are copied.
+        return pa.concat_tables(results)
+    import pandas as pd
+
+    return pd.concat(results, ignore_index=True)
+
+
+class ParallelFetch(Runner):
+    # Wraps a runner: each structured scenario is split into N disjoint sub-queries on one
+    # integer column, run concurrently over N connections of that runner and concatenated.
+    def __init__(self, runner_class: type[Runner], creds: dict[str, str] | None, args: argparse.Namespace) -> None:
+        super().__init__(creds, args)
+        self.runner_class = runner_class
+        self.client_id = runner_class.client_id
+        self.required_envs = runner_class.required_envs
+        self.runners = [runner_class(creds, args)]
+        self.pool: ThreadPoolExecutor | None = None
+
+    def variant(self) -> str:
+        suffix = f"-p{self.args.parallel}"
+        if self.args.partition_method != "modulo":
+            suffix += f"-{self.args.partition_method}"
+        if self.args.partition_column != DEFAULT_PARTITION_COLUMN:
+            suffix += f"-{self.args.partition_column}"
+        return f"{self.runners[0].variant()}{suffix}"
+
+    def parameters(self) -> dict[str, Any]:
+        return {
+            **self.runners[0].parameters(),
+            "parallel": self.args.parallel,
+            "partition_method": self.args.partition_method,
+            "partition_column": self.args.partition_column,
+        }
+
+    def connect(self) -> None:
+        self.runners[0].specs = self.specs
+        self.runners[0].connect()
+        self.pool = ThreadPoolExecutor(max_workers=self.args.parallel)
+
+    def prepare(self, scenarios: dict[str, str]) -> None:
+        primary = self.runners[0]
+        primary.prepare(scenarios)
+        # The other connections open concurrently and reuse the primary's prepared state, as load mode workers do.
+        extra = [self.runner_class(self.creds, self.args) for _ in range(self.args.parallel - 1)]
+        for runner in extra:
+            runner.specs = self.specs
+        list(self.pool.map(lambda runner: runner.connect(), extra))
+        self.runners.extend(extra)
+        for runner in extra:
+            runner.adopt(primary.prepared_state())
+
+        bounds = None
+        if self.args.partition_method == "range":
+            column = self.args.partition_column
+            bounds_query = f"SELECT MIN({column}) AS low, MAX({column}) AS high FROM {SOURCE_TABLE}"
+            bounds = tuple(int(value) for value in first_row(primary.run_query(bounds_query, PhaseTimer())))
+        # Scenarios without structured fields (select_1) run unsplit on the primary connection.
+        self.sub_queries = {}
+        for scenario_id, query in scenarios.items():
+            spec = self.specs.get(scenario_id)
+            if spec is None:
+                continue
+            conditions = partition_conditions(self.args.partition_column, self.args.partition_method, self.args.parallel, bounds)
+            self.sub_queries[query] = [
+                replace(spec, limit=limit).sql(SOURCE_TABLE, condition)
+                for condition, limit in zip(conditions, split_limit(spec.limit, self.args.parallel))
+                # A partition whose limit share is zero adds no rows.
+                if limit != 0
+            ]
+
+    def before_iteration(self) -> None:
+        for runner in self.runners:
+            runner.before_iteration()
+
+    def run_partitions(self, query: str, phases: PhaseTimer, fetch) -> list[Any]:
+        def run(index: int, sub_query: str) -> tuple[Any, float]:
+            start = time.perf_counter()
+            result = fetch(self.runners[index], sub_query)
+            return result, time.perf_counter() - start
+
+        sub_queries = self.sub_queries[query]
+        with phases("fetch"):
+            outcomes = list(self.pool.map(run, range(len(sub_queries)), sub_queries))
+        seconds = [elapsed for _, elapsed in outcomes]
+        phases.count("partitions", len(sub_queries))
+        # The slowest partition bounds the query; a wide spread means skewed partitions.
+        phases.count("partition_max_s", max(seconds))
+        phases.count("partition_min_s", min(seconds))
+        return [result for result, _ in outcomes]
+
+    def run_query(self, query: str, phases: PhaseTimer) -> Any:
+        if query not in self.sub_queries:
+            return self.runners[0].run_query(query, phases)
+        # Sub-query phases overlap in time, so each partition keeps its own timer and the wrapper reports wall time.
+        results = self.run_partitions(query, phases, lambda runner, sub_query: runner.run_query(sub_query, PhaseTimer()))
+        with phases("convert"):
+            return concat_results(results)
+
+    def stream_query(self, query: str, phases: PhaseTimer) -> Any:
+        if query not in self.sub_queries:
+            return self.runners[0].stream_query(query, phases)
+        stats = StreamStats()
+        for partition in self.run_partitions(query, phases, lambda runner, sub_query: runner.stream_query(sub_query, PhaseTimer())):
+            stats.rows += partition.rows
+            stats.bytes += partition.bytes
+            stats.batches += partition.batches
+        return stats
+
+    def close(self) -> None:
+        for runner in self.runners:
+            runner.close()
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import itertools
+import json
+import sys
+import traceback
+from pathlib import Path
+from typing import Any, Iterable
+
+from dotenv import load_dotenv
+
+from common.python.helpers import (
+    PhaseTimer,
+    RepeatPolicy,
+    ScenarioSpec,
+    add_harness_arguments,
+    build_payload,
+    default_out_path,
+    drain_batches,
+    load_queries,
+    median,
+    require_envs,
+    run_scenarios,
+    variant_client_id,
+    write_payload,
+)
+from common.python.history import RunHistory
+
+QUERIES_PATH = Path("queries") / "scenarios.json"
+RUNNERS_DIR = Path(__file__).resolve().parents[2] / "runners"
+# Runner modules are only imported when selected, so unused drivers (JVM, ODBC manager, ...) never load.
+RUNNER_IDS = [
+    "python-sql-connector",
+    "python-volume-download",
+    "python-adbc",
+    "python-odbc",
+    "python-jdbc",
+    "python-sharing-client",
+    "python-sharing-client-hack",
+    "python-external-duckdb",
+    "python-local-arrow",
+    "python-local-duckdb",
+    "python-local-delta-kernel",
+    "python-local-reencode",
+    "python-local-odbc",
+    "python-local-jdbc",
+]
+
+_registry: dict[str, type[Runner]] = {}
+
+
+class Runner:
+    client_id = ""
+    required_envs: list[str] = []
+    # Attributes set by prepare() that extra connections (load mode workers) can reuse as-is.
+    prepared_attributes: tuple[str, ...] = ()
+    # List-valued arguments; run_cli benchmarks every combination as its own variant.
+    sweep_arguments: tuple[str, ...] = ()
+    # Structured scenario fields (columns, limit, predicate) by scenario id, set before prepare().
+    specs: dict[str, ScenarioSpec] = {}
+    # execute() takes any SQL over the source table, so --parallel can split scenarios across connections.
+    parallel_fetch = False
+
+    def __init__(self, creds: dict[str, str], args: argparse.Namespace) -> None:
+        self.creds = creds
+        self.args = args
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        pass
+
+    @classmethod
+    def supports_stream(cls) -> bool:
+        return cls.iter_batches is not Runner.iter_batches
+
+    def variant(self) -> str:
+        return variant_client_id(self.client_id, self.args.consume)
+
+    def parameters(self) -> dict[str, Any]:
+        return {}
+
+    def connect(self) -> None:
+        pass
+
+    def prepare(self, scenarios: dict[str, str]) -> None:
+        pass
+
+    def prepared_state(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.prepared_attributes}
+
+    def adopt(self, state: dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def before_iteration(self) -> None:
+        # Untimed; runs before every warmup and timed iteration (cache flushes, reconnects).
+        pass
+
+    def execute(self, query: str, phases: PhaseTimer) -> Any:
+        return query
+
+    def iter_batches(self, handle: Any, phases: PhaseTimer) -> Iterable[Any]:
+        raise NotImplementedError(f"{self.client_id} does not expose Arrow batches")
+
+    def materialize(self, handle: Any, phases: PhaseTimer) -> Any:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def run_query(self, query: str, phases: PhaseTimer) -> Any:
+        return self.materialize(self.execute(query, phases), phases)
+
+    def stream_query(self, query: str, phases: PhaseTimer) -> Any:
+        return drain_batches(self.iter_batches(self.execute(query, phases), phases), phases)
+
+
+def register_runner(cls: type[Runner]) -> type[Runner]:
+    _registry[cls.client_id] = cls
+    return cls
+
+
+def get_runner(client_id: str) -> type[Runner]:
+    if client_id not in _registry:
+        if client_id not in RUNNER_IDS:
+            raise RuntimeError(f"Unknown runner: {client_id} (known: {', '.join(RUNNER_IDS)})")
+        module_path = RUNNERS_DIR / client_id / "run.py"
+        module_name = f"dbx_fetch_benchmark_runners.{client_id.replace('-', '_')}"
+        spec = importlib.util.spec_from_file_location(module_name, module_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return _registry[client_id]
+
+
+def make_runner(runner_class: type[Runner], creds: dict[str, str] | None, args: argparse.Namespace) -> Runner:
+    if args.parallel > 1:
+        from common.python.parallel import ParallelFetch
+
+        return ParallelFetch(runner_class, creds, args)
+    return runner_class(creds, args)
+
+
+def expand_sweep(runner_class: type[Runner], args: argparse.Namespace) -> list[argparse.Namespace]:
+    names = (*runner_class.sweep_arguments, "parallel")
+    # Runners that can't split queries run single-stream whatever --parallel asks for.
+    values = [getattr(args, name) for name in runner_class.sweep_arguments]
+    values.append(args.parallel if runner_class.parallel_fetch else [1])
+    combinations = {}
+    for combination in itertools.product(*values):
+        expanded = argparse.Namespace(**vars(args))
+        for name, value in zip(names, combination):
+            setattr(expanded, name, value)
+        # Combinations that resolve to the same variant (an option unused by the chosen mode) run once.
+        combinations.setdefault(make_runner(runner_class, None, expanded).variant(), expanded)
+    return list(combinations.values())
+
+
+def parallel_speedup(by_parallel: dict[str, dict[str, dict[int, float]]]) -> dict[str, Any]:
+    # Single-stream median over --parallel N median, for variants that ran both N=1 and some N > 1.
+    speedup: dict[str, Any] = {}
+    for base, scenarios in by_parallel.items():
+        for scenario_id, levels in scenarios.items():
+            if 1 not in levels or len(levels) < 2:
+                continue
+            speedup.setdefault(base, {})[scenario_id] = {
+                parallel: {"median_s": seconds, "speedup": levels[1] / seconds}
+                for parallel, seconds in sorted(levels.items())
+            }
+    return speedup
+
+
+def print_sweep_summary(out_paths: list[Path]) -> Path:
+    # Fastest variant per scenario (= result-size bucket: shape x rows) by median time, across every
+    # run of the sweep; also written with the winning parameters to results/sweeps/.
+    from common.python.aggregate import scenario_rows, scenario_shape
+
+    best: dict[str, dict[str, Any]] = {}
+    # Median seconds by single-stream variant, scenario and --parallel N, for the speed-up table.
+    by_parallel: dict[str, dict[str, dict[int, float]]] = {}
+    for out_path in out_paths:
+        payload = json.loads(out_path.read_text(encoding="utf-8"))
+        parallel = payload["parameters"].get("parallel", 1)
+        variant = payload["client"]["id"]
+        base = variant if parallel == 1 else variant[: variant.rindex(f"-p{parallel}")]
+        for result in payload["results"]:
+            scenario_id = result["scenario"]["id"]
+            seconds = median(result["times"])
+            # Scenarios the wrapper ran unsplit (no partitions counter) have nothing to compare.
+            if parallel == 1 or "partitions" in result:
+                by_parallel.setdefault(base, {}).setdefault(scenario_id, {})[parallel] = seconds
+            if scenario_id not in best or seconds < best[scenario_id]["median_s"]:
+                best[scenario_id] = {
+                    "shape": scenario_shape(scenario_id),
+                    "rows": scenario_rows(scenario_id),
+                    "median_s": seconds,
+                    "variant": payload["client"]["id"],
+                    "parameters": payload["parameters"],
+                    "run": str(out_path),
+                }
+    print(f"{'scenario':<24} {'shape':<7} {'rows':>9} {'median_s':>10}  fastest variant")
+    for scenario_id, entry in best.items():
+        rows = "" if entry["rows"] is None else entry["rows"]
+        print(f"{scenario_id:<24} {entry['shape']:<7} {rows:>9} {entry['median_s']:>10.3f}  {entry['variant']}")
+
+    speedup = parallel_speedup(by_parallel)
+    if speedup:
+        print(f"\n{'scenario':<24} {'N':>3} {'median_s':>10} {'speedup':>8}  single-stream variant")
+        for base, scenarios in speedup.items():
+            for scenario_id, levels in scenarios.items():
+                for parallel, entry in levels.items():
+                    print(f"{scenario_id:<24} {parallel:>3} {entry['median_s']:>10.3f} {entry['speedup']:>7.2f}x  {base}")
+
+    summary_path = Path("results") / "sweeps" / f"sweep_{out_paths[0].stem.removeprefix('run_')}.json"
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary = {"runs": [str(out_path) for out_path in out_paths], "best": best}
+    if speedup:
+        summary["speedup"] = speedup
+    write_payload(summary, summary_path)
+    print(f"Wrote {summary_path}")
+    return summary_path
+
+
+def benchmark_runner(runner_class: type[Runner], args: argparse.Namespace) -> Path:
+    if args.consume == "stream" and not runner_class.supports_stream():
+        raise RuntimeError(f"{runner_class.client_id} does not expose Arrow batches; only --consume=materialize is supported.")
+
+    creds = require_envs([*runner_class.required_envs, "BENCHMARK_REPEATS"])
+    repeats = int(creds["BENCHMARK_REPEATS"])
+    policy = RepeatPolicy.from_args(args, repeats)
+    loaded = load_queries(QUERIES_PATH)
+
+    runner = make_runner(runner_class, creds, args)
+    runner.specs = loaded["specs"]
+    history = RunHistory.from_env(
+        client_id=runner.variant(),
+        parameters={"repeats": repeats, "consume": args.consume, **policy.parameters(), **runner.parameters()},
+    )
+    run_query = runner.stream_query if args.consume == "stream" else runner.run_query
+    runner.connect()
+    try:
+        runner.prepare(loaded["scenarios"])
+        results = run_scenarios(
+            loaded["scenarios"],
+            run_query,
+            policy,
+            history=history,
+            before_iteration=runner.before_iteration,
+        )
+    finally:
+        # Also keeps the finished scenarios of a run that failed part way.
+        history.flush()
+        runner.close()
+
+    payload = build_payload(
+        schema_version=loaded["queries"]["schema_version"],
+        client_id=runner.client_id,
+        repeats=repeats,
+        results=results,
+        consume=args.consume,
+        run=history.metadata(),
+        policy=policy,
+    )
+    payload["client"]["id"] = runner.variant()
+    payload["parameters"].update(runner.parameters())
+    out_path = default_out_path(payload["client"]["id"], history.run_id)
+    write_payload(payload, out_path)
+    return out_path
+
+
+def run_cli(runner_classes: list[type[Runner]] | None = None, argv: list[str] | None = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run one or more Python benchmark runners in this process.")
+    add_harness_arguments(parser)
+    if runner_classes is None:
+        parser.add_argument("--runner", action="append", choices=RUNNER_IDS, help="Runner id (repeatable).")
+        parser.add_argument("--all", action="store_true", help="Run every registered Python runner.")
+        parser.add_argument("--list", action="store_true", help="List runner ids and exit.")
+        known, _ = parser.parse_known_args(argv)
+        if known.list:
+            print("\n".join(RUNNER_IDS))
+            return 0
+        selected = RUNNER_IDS if known.all else (known.runner or [])
+        if not selected:
+            parser.error("select runners with --runner <id> (repeatable) or --all")
+        runner_classes = [get_runner(client_id) for client_id in selected]
+    for runner_class in runner_classes:
+        runner_class.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    runs = [(runner_class, run_args) for runner_class in runner_classes for run_args in expand_sweep(runner_class, args)]
+    failures = 0
+    out_paths = []
+    for runner_class, run_args in runs:
+        print(f"Running runner: {make_runner(runner_class, None, run_args).variant()}")
+        try:
+            out_path = benchmark_runner(runner_class, run_args)
+        except Exception:
+            failures += 1
+            traceback.print_exc()
+            if len(runs) == 1:
+                raise
+            continue
+        print(f"Wrote {out_path}")
+        out_paths.append(out_path)
+    swept = any(runner_class.sweep_arguments for runner_class in runner_classes) or len(args.parallel) > 1
+    if swept and len(out_paths) > 1:
+        print_sweep_summary(out_paths)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    # Runner modules register into the importable module, not this __main__ copy.
+    from common.python import runner
+
+    sys.exit(runner.run_cli())
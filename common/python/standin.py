@@ -0,0 +1,592 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from common.python.formats import add_export_arguments, export_suffix, write_table
+from common.python.helpers import ScenarioSpec, load_queries, parse_int_list
+
+DEFAULT_ROOT = Path("data") / "standin"
+DEFAULT_PROFILE_PATH = Path("secrets") / "standin.share"
+DEFAULT_SHARED_TABLE = "dbx_fetch_benchmark_share.dbx_fetch_benchmark_sharing.catalog_sales"
+STAGED_EXPORT_DIR = "dbx-fetch-benchmark/standin"
+SHARING_PREFIX = "/api/2.0/delta-sharing"
+FILES_PREFIX = "/api/2.0/fs/files"
+DIRECTORIES_PREFIX = "/api/2.0/fs/directories"
+PRESIGNED_PREFIX = "/presigned"
+CHUNK_BYTES = 64 * 1024
+PRESIGNED_EXPIRY_S = 3600
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+SHARING_TABLE_ROUTE = re.compile(r"^/shares/([^/]+)/schemas/([^/]+)/tables/([^/]+)/(metadata|version|query)$")
+
+
+class TokenBucket:
+    # Reservation-style bucket: callers take tokens up front and sleep off any deficit, which keeps
+    # concurrent streams fair without a scheduler thread.
+    def __init__(self, rate_bytes_per_s: float, burst_bytes: float | None = None) -> None:
+        self.rate = rate_bytes_per_s
+        self.capacity = burst_bytes if burst_bytes is not None else max(rate_bytes_per_s * 0.05, CHUNK_BYTES)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount: int) -> None:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            deficit = -self.tokens
+        if deficit > 0:
+            time.sleep(deficit / self.rate)
+
+
+class Shaper:
+    def __init__(
+        self,
+        bandwidth_mbps: float | None = None,
+        stream_mbps: float | None = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        max_concurrent: int | None = None,
+        seed: int = 0,
+    ) -> None:
+        self.link = TokenBucket(bandwidth_mbps * 125_000) if bandwidth_mbps else None
+        self.stream_bytes_per_s = stream_mbps * 125_000 if stream_mbps else None
+        self.latency_s = latency_ms / 1000.0
+        self.jitter_s = jitter_ms / 1000.0
+        self.slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        # Requests over the concurrency limit queue here, like a throttled front end.
+        if self.slots is not None:
+            self.slots.acquire()
+        try:
+            with self.rng_lock:
+                delay = self.latency_s + self.rng.uniform(-self.jitter_s, self.jitter_s)
+            if delay > 0:
+                time.sleep(delay)
+            yield
+        finally:
+            if self.slots is not None:
+                self.slots.release()
+
+    def send(self, wfile: BinaryIO, source: BinaryIO, length: int) -> None:
+        stream = TokenBucket(self.stream_bytes_per_s) if self.stream_bytes_per_s else None
+        remaining = length
+        while remaining > 0:
+            chunk = source.read(min(CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            if stream is not None:
+                stream.consume(len(chunk))
+            if self.link is not None:
+                self.link.consume(len(chunk))
+            wfile.write(chunk)
+            remaining -= len(chunk)
+
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "bandwidth_bytes_per_s": self.link.rate if self.link else None,
+            "stream_bytes_per_s": self.stream_bytes_per_s,
+            "latency_s": self.latency_s,
+            "jitter_s": self.jitter_s,
+        }
+
+
+class SharedTable:
+    def __init__(self, share: str, schema: str, name: str, path: Path) -> None:
+        self.share = share
+        self.schema = schema
+        self.name = name
+        self.path = path
+        self.version, self.protocol, self.metadata, self.add_files = read_delta_log(path)
+
+    def file_id(self, relative_path: str) -> str:
+        return hashlib.sha256(f"{self.share}.{self.schema}.{self.name}/{relative_path}".encode()).hexdigest()[:32]
+
+
+def read_delta_log(path: Path) -> tuple[int, dict[str, Any], dict[str, Any], list[dict[str, Any]]]:
+    # Replays JSON commits in order; enough for the single-commit tables from common.python.synthetic.
+    commits = sorted((path / "_delta_log").glob("*.json"))
+    if not commits:
+        raise RuntimeError(f"No Delta log under {path}/_delta_log; run `python -m common.python.synthetic` first.")
+    protocol: dict[str, Any] = {}
+    metadata: dict[str, Any] = {}
+    add_files: dict[str, dict[str, Any]] = {}
+    for commit in commits:
+        for line in commit.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            action = json.loads(line)
+            if "protocol" in action:
+                protocol = action["protocol"]
+            elif "metaData" in action:
+                metadata = action["metaData"]
+            elif "add" in action:
+                add_files[action["add"]["path"]] = action["add"]
+            elif "remove" in action:
+                add_files.pop(action["remove"]["path"], None)
+    return int(commits[-1].stem), protocol, metadata, list(add_files.values())
+
+
+def num_records(add: dict[str, Any]) -> int | None:
+    stats = add.get("stats")
+    if not stats:
+        return None
+    return json.loads(stats).get("numRecords")
+
+
+def resolve_within(root: Path, relative_path: str) -> Path:
+    # Presigned and Files API paths come from the client; ".." must not leave the served directory.
+    root = root.resolve()
+    resolved = (root / relative_path.lstrip("/")).resolve()
+    if root not in resolved.parents and resolved != root:
+        raise FileNotFoundError(relative_path)
+    return resolved
+
+
+def response_format(capabilities: str | None) -> str:
+    # "responseformat=delta,parquet;readerfeatures=..." -> prefer parquet when the client accepts it.
+    if not capabilities:
+        return "parquet"
+    for part in capabilities.split(";"):
+        key, _, value = part.partition("=")
+        if key.strip().lower() == "responseformat":
+            formats = [item.strip().lower() for item in value.split(",")]
+            return "parquet" if "parquet" in formats else "delta"
+    return "parquet"
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandinServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_HEAD(self) -> None:
+        self.dispatch("HEAD")
+
+    def do_GET(self) -> None:
+        self.dispatch("GET")
+
+    def do_POST(self) -> None:
+        self.dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self.dispatch("PUT")
+
+    def do_DELETE(self) -> None:
+        self.dispatch("DELETE")
+
+    def dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = self.read_body()
+        with self.server.shaper.request():
+            try:
+                if path.startswith(PRESIGNED_PREFIX + "/"):
+                    self.serve_presigned(method, path[len(PRESIGNED_PREFIX) :])
+                    return
+                if not self.authorized():
+                    self.send_error_json(HTTPStatus.UNAUTHORIZED, "UNAUTHENTICATED", "Invalid access token.")
+                elif path.startswith(FILES_PREFIX + "/"):
+                    self.serve_files_api(method, path[len(FILES_PREFIX) :], body)
+                elif path.startswith(DIRECTORIES_PREFIX + "/"):
+                    self.serve_directories_api(method, path[len(DIRECTORIES_PREFIX) :], query)
+                elif path == "/api/2.0/fs/create-download-url" and method == "POST":
+                    self.serve_create_download_url(query["path"])
+                elif path.startswith(SHARING_PREFIX + "/"):
+                    self.serve_sharing(method, path[len(SHARING_PREFIX) :], body)
+                else:
+                    self.send_error_json(HTTPStatus.NOT_FOUND, "ENDPOINT_NOT_FOUND", f"No stand-in route for {path}")
+            except FileNotFoundError as error:
+                self.send_error_json(HTTPStatus.NOT_FOUND, "NOT_FOUND", str(error))
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def authorized(self) -> bool:
+        token = self.server.token
+        return token is None or self.headers.get("Authorization") == f"Bearer {token}"
+
+    def send_json(self, payload: Any, status: HTTPStatus = HTTPStatus.OK, headers: dict[str, str] | None = None) -> None:
+        encoded = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def send_error_json(self, status: HTTPStatus, error_code: str, message: str) -> None:
+        self.send_json({"error_code": error_code, "message": message}, status)
+
+    def send_ndjson(self, lines: list[dict[str, Any]], headers: dict[str, str]) -> None:
+        encoded = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def send_file(self, method: str, local_path: Path) -> None:
+        if not local_path.is_file():
+            raise FileNotFoundError(f"No such file: {local_path}")
+        stat = local_path.stat()
+        size = stat.st_size
+        start, end = 0, size - 1
+        status = HTTPStatus.OK
+        match = BYTE_RANGE.match(self.headers.get("Range") or "")
+        if match and size:
+            first, last = match.groups()
+            if first:
+                start, end = int(first), min(int(last), size - 1) if last else size - 1
+            else:
+                start, end = max(size - int(last), 0), size - 1
+            if start > end:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = HTTPStatus.PARTIAL_CONTENT
+        length = end - start + 1 if size else 0
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Last-Modified", formatdate(stat.st_mtime, usegmt=True))
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if method == "HEAD":
+            return
+        with local_path.open("rb") as source:
+            source.seek(start)
+            self.server.shaper.send(self.wfile, source, length)
+
+    def volume_path(self, remote_path: str) -> Path:
+        return resolve_within(self.server.root, remote_path)
+
+    def serve_files_api(self, method: str, remote_path: str, body: bytes) -> None:
+        local_path = self.volume_path(remote_path)
+        if method in ("GET", "HEAD"):
+            self.send_file(method, local_path)
+        elif method == "PUT":
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            local_path.write_bytes(body)
+            self.send_response(HTTPStatus.NO_CONTENT)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif method == "DELETE":
+            local_path.unlink()
+            self.send_json({})
+        else:
+            self.send_error_json(HTTPStatus.METHOD_NOT_ALLOWED, "BAD_REQUEST", f"{method} not supported")
+
+    def serve_directories_api(self, method: str, remote_path: str, query: dict[str, str]) -> None:
+        local_dir = self.volume_path(remote_path)
+        if not local_dir.is_dir():
+            raise FileNotFoundError(f"No such directory: {remote_path}")
+        if method == "DELETE":
+            local_dir.rmdir()
+            self.send_json({})
+            return
+        base = "/" + remote_path.strip("/")
+        contents = []
+        for entry in sorted(local_dir.iterdir()):
+            stat = entry.stat()
+            item: dict[str, Any] = {
+                "path": f"{base}/{entry.name}",
+                "name": entry.name,
+                "is_directory": entry.is_dir(),
+            }
+            if entry.is_file():
+                item["file_size"] = stat.st_size
+                item["last_modified"] = int(stat.st_mtime * 1000)
+            contents.append(item)
+        self.send_json({"contents": contents})
+
+    def presigned_url(self, kind: str, relative_path: str) -> str:
+        expires = int(time.time()) + PRESIGNED_EXPIRY_S
+        return f"{self.server.base_url}{PRESIGNED_PREFIX}/{kind}/{quote(relative_path)}?X-Expires={expires}"
+
+    def serve_create_download_url(self, remote_path: str) -> None:
+        self.volume_path(remote_path)
+        self.send_json({"url": self.presigned_url("volume", remote_path.lstrip("/")), "headers": []})
+
+    def serve_presigned(self, method: str, target: str) -> None:
+        kind, _, relative_path = target.lstrip("/").partition("/")
+        if kind == "volume":
+            self.send_file(method, self.volume_path(relative_path))
+            return
+        table = self.server.tables.get(kind)
+        if table is None:
+            raise FileNotFoundError(target)
+        self.send_file(method, resolve_within(table.path, relative_path))
+
+    def serve_sharing(self, method: str, route: str, body: bytes) -> None:
+        tables = self.server.tables.values()
+        if route == "/shares":
+            shares = sorted({table.share for table in tables})
+            self.send_json({"items": [{"name": share} for share in shares]})
+            return
+        match = re.match(r"^/shares/([^/]+)/(schemas|all-tables)$", route)
+        if match:
+            share, listing = match.groups()
+            if listing == "schemas":
+                schemas = sorted({table.schema for table in tables if table.share == share})
+                self.send_json({"items": [{"name": schema, "share": share} for schema in schemas]})
+            else:
+                items = [{"name": t.name, "schema": t.schema, "share": t.share} for t in tables if t.share == share]
+                self.send_json({"items": items})
+            return
+        match = re.match(r"^/shares/([^/]+)/schemas/([^/]+)/tables$", route)
+        if match:
+            share, schema = match.groups()
+            items = [{"name": t.name, "schema": t.schema, "share": t.share} for t in tables if (t.share, t.schema) == (share, schema)]
+            self.send_json({"items": items})
+            return
+
+        match = SHARING_TABLE_ROUTE.match(route)
+        table = self.server.tables.get(".".join(match.groups()[:3])) if match else None
+        if table is None:
+            self.send_error_json(HTTPStatus.NOT_FOUND, "RESOURCE_DOES_NOT_EXIST", f"No shared table for {route}")
+            return
+        action = match.group(4)
+        fmt = response_format(self.headers.get("delta-sharing-capabilities"))
+        headers = {"delta-table-version": str(table.version), "delta-sharing-capabilities": f"responseformat={fmt}"}
+        if action == "version":
+            self.send_response(HTTPStatus.OK)
+            self.send_header("delta-table-version", str(table.version))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        request = json.loads(body) if body else {}
+        add_files = table.add_files if action == "query" else []
+        limit_hint = request.get("limitHint")
+        if limit_hint is not None:
+            # Like the real server, return just enough files to cover limitHint when stats allow it.
+            selected, rows = [], 0
+            for add in add_files:
+                selected.append(add)
+                rows += num_records(add) or 0
+                if rows >= limit_hint:
+                    break
+            add_files = selected
+        size = sum(add.get("size", 0) for add in table.add_files)
+        self.send_ndjson(self.sharing_lines(table, fmt, add_files, size), headers)
+
+    def sharing_lines(self, table: SharedTable, fmt: str, add_files: list[dict[str, Any]], size: int) -> list[dict[str, Any]]:
+        table_key = f"{table.share}.{table.schema}.{table.name}"
+        expiration_ms = int((time.time() + PRESIGNED_EXPIRY_S) * 1000)
+        summary = {"version": table.version, "size": size, "numFiles": len(table.add_files)}
+        if fmt == "delta":
+            lines: list[dict[str, Any]] = [
+                {"protocol": {"deltaProtocol": table.protocol}},
+                {"metaData": {"deltaMetadata": table.metadata, **summary}},
+            ]
+            for add in add_files:
+                action = {**add, "path": self.presigned_url(table_key, add["path"])}
+                lines.append(
+                    {
+                        "file": {
+                            "id": table.file_id(add["path"]),
+                            "deltaSingleAction": {"add": action},
+                            "version": table.version,
+                            "timestamp": add.get("modificationTime"),
+                            "expirationTimestamp": expiration_ms,
+                        }
+                    }
+                )
+            return lines
+
+        metadata = {
+            "id": table.metadata.get("id"),
+            "format": {"provider": "parquet"},
+            "schemaString": table.metadata.get("schemaString"),
+            "partitionColumns": table.metadata.get("partitionColumns", []),
+            "configuration": table.metadata.get("configuration", {}),
+            **summary,
+        }
+        lines = [{"protocol": {"minReaderVersion": 1}}, {"metaData": metadata}]
+        for add in add_files:
+            lines.append(
+                {
+                    "file": {
+                        "url": self.presigned_url(table_key, add["path"]),
+                        "id": table.file_id(add["path"]),
+                        "partitionValues": add.get("partitionValues", {}),
+                        "size": add.get("size"),
+                        "stats": add.get("stats"),
+                        "version": table.version,
+                        "timestamp": add.get("modificationTime"),
+                        "expirationTimestamp": expiration_ms,
+                    }
+                }
+            )
+        return lines
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        root: Path,
+        tables: list[SharedTable],
+        shaper: Shaper,
+        token: str | None = None,
+        verbose: bool = False,
+    ) -> None:
+        super().__init__(address, StandinHandler)
+        self.root = root.resolve()
+        self.tables = {f"{table.share}.{table.schema}.{table.name}": table for table in tables}
+        self.shaper = shaper
+        self.token = token
+        self.verbose = verbose
+        self.base_url = f"http://{address[0]}:{self.server_address[1]}"
+
+
+def parse_shared_table(value: str) -> SharedTable:
+    name, _, path = value.partition("=")
+    parts = name.split(".")
+    if len(parts) != 3 or not path:
+        raise argparse.ArgumentTypeError(f"Expected <share>.<schema>.<table>=<delta table dir>, got {value}")
+    return SharedTable(*parts, Path(path))
+
+
+def write_profile(path: Path, endpoint: str, token: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profile = {"shareCredentialsVersion": 1, "endpoint": endpoint, "bearerToken": token}
+    path.write_text(json.dumps(profile, indent=2) + "\n", encoding="utf-8")
+
+
+def stage_exports(
+    root: Path,
+    volume_path: str,
+    table_path: Path,
+    scenarios: dict[str, str],
+    specs: dict[str, ScenarioSpec],
+    args: argparse.Namespace,
+) -> Path:
+    # Stands in for the INSERT OVERWRITE DIRECTORY ... REPARTITION(n) exports python-volume-download runs on a warehouse.
+    import pyarrow.dataset as ds
+
+    from common.python.synthetic import constant_query_table, read_scenario_table
+
+    dataset = ds.dataset(str(table_path), format="parquet")
+    export_root = root / volume_path.strip("/") / STAGED_EXPORT_DIR
+    for scenario_id, query in scenarios.items():
+        spec = specs.get(scenario_id)
+        table = constant_query_table(query) if spec is None else read_scenario_table(dataset, spec)
+        layouts = itertools.product(args.files_per_export, args.export_format, args.compression, args.row_group_mb)
+        for files, export_format, compression, row_group_mb in layouts:
+            out_dir = export_root / f"files-{files}{export_suffix(export_format, compression, row_group_mb)}" / scenario_id
+            out_dir.mkdir(parents=True, exist_ok=True)
+            for stale in out_dir.glob(f"*.{export_format}"):
+                stale.unlink()
+            rows_per_file = -(-table.num_rows // files)
+            for index in range(files):
+                part = table.slice(index * rows_per_file, rows_per_file)
+                out_path = out_dir / f"part-{index:05d}.{compression}.{export_format}"
+                write_table(part, str(out_path), export_format, compression, row_group_mb)
+        print(f"Staged {scenario_id}: {table.num_rows:,} rows")
+    return export_root
+
+
+def serve(args: argparse.Namespace) -> None:
+    shaper = Shaper(
+        bandwidth_mbps=args.bandwidth_mbps,
+        stream_mbps=args.stream_mbps,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        max_concurrent=args.max_concurrent,
+        seed=args.seed,
+    )
+    tables = args.share or [parse_shared_table(f"{DEFAULT_SHARED_TABLE}={os.getenv('LOCAL_CATALOG_SALES_PATH', 'data/catalog_sales')}")]
+    server = StandinServer((args.host, args.port), args.root, tables, shaper, token=args.token, verbose=args.verbose)
+    write_profile(args.profile_out, f"{server.base_url}{SHARING_PREFIX}", args.token or "standin")
+    print(f"Serving stand-in at {server.base_url} (root {server.root}); sharing profile {args.profile_out}")
+    print(f"Shaping: {json.dumps(shaper.parameters())}, max_concurrent={args.max_concurrent}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Local Files API / Delta Sharing stand-in with bandwidth and latency shaping.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Serve the Files API, Delta Sharing and pre-signed file URLs.")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--root", type=Path, default=DEFAULT_ROOT, help="Local directory served as the volume root.")
+    serve_parser.add_argument(
+        "--share",
+        action="append",
+        type=parse_shared_table,
+        help=f"<share>.<schema>.<table>=<delta dir> (repeatable; default {DEFAULT_SHARED_TABLE}=$LOCAL_CATALOG_SALES_PATH).",
+    )
+    serve_parser.add_argument("--token", help="Require this bearer token (default: accept any).")
+    serve_parser.add_argument("--profile-out", type=Path, default=DEFAULT_PROFILE_PATH)
+    serve_parser.add_argument("--bandwidth-mbps", type=float, help="Total link bandwidth shared by all responses.")
+    serve_parser.add_argument("--stream-mbps", type=float, help="Bandwidth cap per response stream.")
+    serve_parser.add_argument("--latency-ms", type=float, default=0.0, help="Added time to first byte per request.")
+    serve_parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the added latency.")
+    serve_parser.add_argument("--max-concurrent", type=int, help="Requests served at once; the rest queue.")
+    serve_parser.add_argument("--seed", type=int, default=0)
+    serve_parser.add_argument("--verbose", action="store_true")
+
+    stage_parser = commands.add_parser("stage-exports", help="Write per-scenario Parquet exports for python-volume-download.")
+    stage_parser.add_argument("--root", type=Path, default=DEFAULT_ROOT)
+    stage_parser.add_argument("--volume-path", default=os.getenv("DATABRICKS_VOLUME_PATH", "/Volumes/main/default/data"))
+    stage_parser.add_argument("--table-path", type=Path, default=Path(os.getenv("LOCAL_CATALOG_SALES_PATH", "data/catalog_sales")))
+    stage_parser.add_argument("--files-per-export", type=parse_int_list, default=[1], help="File counts to stage, e.g. 1,4,16.")
+    add_export_arguments(stage_parser)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args)
+        return
+
+    loaded = load_queries(Path("queries") / "scenarios.json")
+    export_root = stage_exports(args.root, args.volume_path, args.table_path, loaded["scenarios"], loaded["specs"], args)
+    print(f"Set DATABRICKS_VOLUME_STAGED_DIR=/{export_root.relative_to(args.root).as_posix()} for python-volume-download")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+if TYPE_CHECKING:
+    import pyarrow.dataset as ds
+
+    from common.python.helpers import ScenarioSpec
+
+DEFAULT_OUT_DIR = Path("data") / "catalog_sales"
+DEFAULT_SQLITE_PATH = Path("data") / "catalog_sales.sqlite"
+SQLITE_TABLE = "catalog_sales"
+SQLITE_INSERT_ROWS = 100_000
+SOURCE_TABLE = "samples.tpcds_sf1000.catalog_sales"
+CONSTANT_QUERY = re.compile(r"^\s*SELECT\s+(?P<value>\d+)\s+AS\s+(?P<name>\w+)\s*;?\s*$", re.IGNORECASE)
+ROWS_PER_SCALE_FACTOR = 1_441_548
+CHUNK_ROWS = 1 << 20
+LINES_PER_ORDER = 10
+NULL_FRACTION = 0.005
+FIRST_SOLD_DATE_SK = 2450815
+SOLD_DATE_DAYS = 1837
+# Surrogate key cardinalities of the sf1000 dimension tables (1-based keys).
+KEY_CARDINALITY = {
+    "customer": 12_000_000,
+    "cdemo": 1_920_800,
+    "hdemo": 7_200,
+    "addr": 6_000_000,
+    "call_center": 42,
+    "catalog_page": 30_000,
+    "ship_mode": 20,
+    "warehouse": 22,
+    "item": 300_000,
+    "promo": 1_500,
+}
+KEY_COLUMNS = [
+    ("cs_sold_date_sk", None),
+    ("cs_sold_time_sk", None),
+    ("cs_ship_date_sk", None),
+    ("cs_bill_customer_sk", "customer"),
+    ("cs_bill_cdemo_sk", "cdemo"),
+    ("cs_bill_hdemo_sk", "hdemo"),
+    ("cs_bill_addr_sk", "addr"),
+    ("cs_ship_customer_sk", "customer"),
+    ("cs_ship_cdemo_sk", "cdemo"),
+    ("cs_ship_hdemo_sk", "hdemo"),
+    ("cs_ship_addr_sk", "addr"),
+    ("cs_call_center_sk", "call_center"),
+    ("cs_catalog_page_sk", "catalog_page"),
+    ("cs_ship_mode_sk", "ship_mode"),
+    ("cs_warehouse_sk", "warehouse"),
+    ("cs_item_sk", "item"),
+    ("cs_promo_sk", "promo"),
+]
+PRICE_COLUMNS = [
+    "cs_wholesale_cost",
+    "cs_list_price",
+    "cs_sales_price",
+    "cs_ext_discount_amt",
+    "cs_ext_sales_price",
+    "cs_ext_wholesale_cost",
+    "cs_ext_list_price",
+    "cs_ext_tax",
+    "cs_coupon_amt",
+    "cs_ext_ship_cost",
+    "cs_net_paid",
+    "cs_net_paid_inc_tax",
+    "cs_net_paid_inc_ship",
+    "cs_net_paid_inc_ship_tax",
+    "cs_net_profit",
+]
+PRICE_TYPE = pa.decimal128(7, 2)
+# cs_item_sk and cs_order_number form the primary key and are never null.
+NOT_NULL_COLUMNS = {"cs_item_sk", "cs_order_number"}
+SPARK_TYPES = {pa.int32(): "integer", pa.int64(): "long", PRICE_TYPE: "decimal(7,2)"}
+
+
+def catalog_sales_schema() -> pa.Schema:
+    fields = [pa.field(name, pa.int32(), nullable=name not in NOT_NULL_COLUMNS) for name, _ in KEY_COLUMNS]
+    fields.append(pa.field("cs_order_number", pa.int64(), nullable=False))
+    fields.append(pa.field("cs_quantity", pa.int32()))
+    fields.extend(pa.field(name, PRICE_TYPE) for name in PRICE_COLUMNS)
+    return pa.schema(fields)
+
+
+def validity_buffer(rng: np.random.Generator, rows: int) -> tuple[pa.Buffer, int]:
+    # Drawing only the null positions is much cheaper than one uniform per row.
+    valid = np.ones(rows, dtype=bool)
+    valid[rng.integers(0, rows, rng.binomial(rows, NULL_FRACTION))] = False
+    return pa.py_buffer(np.packbits(valid, bitorder="little")), int(rows - np.count_nonzero(valid))
+
+
+def int_array(values: np.ndarray, arrow_type: pa.DataType, rng: np.random.Generator | None) -> pa.Array:
+    if rng is None:
+        return pa.array(values, type=arrow_type)
+    validity, null_count = validity_buffer(rng, values.size)
+    data = pa.py_buffer(values.astype(arrow_type.to_pandas_dtype(), copy=False))
+    return pa.Array.from_buffers(arrow_type, values.size, [validity, data], null_count=null_count)
+
+
+def decimal_array(cents: np.ndarray, rng: np.random.Generator) -> pa.Array:
+    # decimal128 values are 16-byte little-endian two's complement integers: low word, then the sign extension.
+    words = np.empty((cents.size, 2), dtype=np.int64)
+    words[:, 0] = cents
+    words[:, 1] = cents >> 63
+    validity, null_count = validity_buffer(rng, cents.size)
+    return pa.Array.from_buffers(PRICE_TYPE, cents.size, [validity, pa.py_buffer(words)], null_count=null_count)
+
+
+def generate_chunk(start_row: int, rows: int, seed: int) -> pa.RecordBatch:
+    # Seeding on (seed, start_row) keeps output reproducible regardless of thread scheduling.
+    rng = np.random.default_rng([seed, start_row])
+    columns: dict[str, pa.Array] = {}
+    sold_date = FIRST_SOLD_DATE_SK + rng.integers(0, SOLD_DATE_DAYS, rows, dtype=np.int32)
+    key_values = {
+        "cs_sold_date_sk": sold_date,
+        "cs_sold_time_sk": rng.integers(0, 86_400, rows, dtype=np.int32),
+        "cs_ship_date_sk": sold_date + rng.integers(2, 91, rows, dtype=np.int32),
+    }
+    for name, dimension in KEY_COLUMNS:
+        values = key_values.get(name)
+        if values is None:
+            values = rng.integers(1, KEY_CARDINALITY[dimension] + 1, rows, dtype=np.int32)
+        columns[name] = int_array(values, pa.int32(), None if name in NOT_NULL_COLUMNS else rng)
+    order_number = (start_row + np.arange(rows, dtype=np.int64)) // LINES_PER_ORDER + 1
+    columns["cs_order_number"] = pa.array(order_number, type=pa.int64())
+
+    # Pricing follows the TPC-DS dsdgen rules, computed in integer cents.
+    quantity = rng.integers(1, 101, rows, dtype=np.int64)
+    wholesale = rng.integers(100, 10_001, rows, dtype=np.int64)
+    list_price = wholesale * (100 + rng.integers(0, 201, rows)) // 100
+    sales_price = list_price * (100 - rng.integers(0, 101, rows)) // 100
+    ext_sales = sales_price * quantity
+    ext_wholesale = wholesale * quantity
+    ext_list = list_price * quantity
+    ext_tax = ext_sales * rng.integers(0, 10, rows) // 100
+    coupon = np.where(rng.random(rows) < 0.2, ext_sales * rng.integers(0, 101, rows) // 100, 0)
+    ext_ship = ext_list * rng.integers(0, 101, rows) // 200
+    net_paid = ext_sales - coupon
+    cents = {
+        "cs_wholesale_cost": wholesale,
+        "cs_list_price": list_price,
+        "cs_sales_price": sales_price,
+        "cs_ext_discount_amt": ext_list - ext_sales,
+        "cs_ext_sales_price": ext_sales,
+        "cs_ext_wholesale_cost": ext_wholesale,
+        "cs_ext_list_price": ext_list,
+        "cs_ext_tax": ext_tax,
+        "cs_coupon_amt": coupon,
+        "cs_ext_ship_cost": ext_ship,
+        "cs_net_paid": net_paid,
+        "cs_net_paid_inc_tax": net_paid + ext_tax,
+        "cs_net_paid_inc_ship": net_paid + ext_ship,
+        "cs_net_paid_inc_ship_tax": net_paid + ext_ship + ext_tax,
+        "cs_net_profit": net_paid - ext_wholesale,
+    }
+    columns["cs_quantity"] = int_array(quantity.astype(np.int32), pa.int32(), rng)
+    for name in PRICE_COLUMNS:
+        columns[name] = decimal_array(cents[name], rng)
+    return pa.RecordBatch.from_arrays(list(columns.values()), schema=catalog_sales_schema())
+
+
+def iter_catalog_sales(
+    rows: int,
+    seed: int = 0,
+    start_row: int = 0,
+    chunk_rows: int = CHUNK_ROWS,
+    threads: int | None = None,
+) -> Iterator[pa.RecordBatch]:
+    starts = range(start_row, start_row + rows, chunk_rows)
+    sizes = [min(chunk_rows, start_row + rows - start) for start in starts]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        yield from pool.map(generate_chunk, starts, sizes, [seed] * len(sizes))
+
+
+def generate_catalog_sales(rows: int, seed: int = 0) -> pa.Table:
+    return pa.Table.from_batches(list(iter_catalog_sales(rows, seed)), schema=catalog_sales_schema())
+
+
+def local_table_path() -> Path:
+    path = Path(os.getenv("LOCAL_CATALOG_SALES_PATH", str(DEFAULT_OUT_DIR)))
+    if not (path / "_delta_log").exists():
+        raise RuntimeError(f"No synthetic catalog_sales table at {path}; run `python -m common.python.synthetic` first.")
+    return path
+
+
+def sqlite_type(arrow_type: pa.DataType) -> str:
+    if pa.types.is_decimal(arrow_type):
+        return f"DECIMAL({arrow_type.precision},{arrow_type.scale})"
+    return "BIGINT" if arrow_type == pa.int64() else "INTEGER"
+
+
+def build_sqlite_table(source: Path, path: Path) -> None:
+    # Written next to the target and renamed, so a failed build is never reused.
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(str(source), format="parquet")
+    schema = dataset.schema
+    # SQLite has no fixed-point storage; DECIMAL columns hold REALs, so prices are inserted as doubles.
+    float_schema = pa.schema(
+        [pa.field(field.name, pa.float64()) if pa.types.is_decimal(field.type) else field for field in schema]
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    partial.unlink(missing_ok=True)
+    con = sqlite3.connect(partial)
+    try:
+        columns = ", ".join(f"{field.name} {sqlite_type(field.type)}" for field in schema)
+        con.execute(f"CREATE TABLE {SQLITE_TABLE} ({columns})")
+        insert = f"INSERT INTO {SQLITE_TABLE} VALUES ({', '.join('?' * len(schema))})"
+        for batch in dataset.to_batches(batch_size=SQLITE_INSERT_ROWS):
+            batch = batch.cast(float_schema)
+            con.executemany(insert, zip(*(column.to_pylist() for column in batch.columns)))
+        con.commit()
+    finally:
+        con.close()
+    partial.rename(path)
+
+
+def local_sqlite_path() -> Path:
+    # SQLite copy of the synthetic table for the local ODBC/JDBC runners, built on first use.
+    path = Path(os.getenv("LOCAL_SQLITE_PATH", str(DEFAULT_SQLITE_PATH)))
+    if not path.exists():
+        print(f"Building {path} from the synthetic table")
+        build_sqlite_table(local_table_path(), path)
+    return path
+
+
+def read_scenario_table(dataset: ds.Dataset, spec: ScenarioSpec) -> pa.Table:
+    # Readers without SQL scan the synthetic table with the scenario's structured fields.
+    scanner = dataset.scanner(columns=spec.columns, filter=spec.arrow_filter())
+    return scanner.to_table() if spec.limit is None else scanner.head(spec.limit)
+
+
+def constant_query_table(query: str) -> pa.Table | None:
+    match = CONSTANT_QUERY.match(query)
+    if match is None:
+        return None
+    return pa.table({match["name"]: pa.array([int(match["value"])], type=pa.int32())})
+
+
+def spark_schema_string(schema: pa.Schema) -> str:
+    return json.dumps(
+        {
+            "type": "struct",
+            "fields": [
+                {"name": field.name, "type": SPARK_TYPES[field.type], "nullable": field.nullable, "metadata": {}}
+                for field in schema
+            ],
+        }
+    )
+
+
+def write_delta_log(out_dir: Path, files: list[tuple[str, int]], schema: pa.Schema) -> None:
+    now_ms = int(time.time() * 1000)
+    actions: list[dict[str, Any]] = [
+        {"commitInfo": {"timestamp": now_ms, "operation": "WRITE", "operationParameters": {"mode": "Overwrite"}}},
+        {"protocol": {"minReaderVersion": 1, "minWriterVersion": 2}},
+        {
+            "metaData": {
+                "id": str(uuid.uuid4()),
+                "format": {"provider": "parquet", "options": {}},
+                "schemaString": spark_schema_string(schema),
+                "partitionColumns": [],
+                "configuration": {},
+                "createdTime": now_ms,
+            }
+        },
+    ]
+    for name, rows in files:
+        actions.append(
+            {
+                "add": {
+                    "path": name,
+                    "partitionValues": {},
+                    "size": (out_dir / name).stat().st_size,
+                    "modificationTime": now_ms,
+                    "dataChange": True,
+                    "stats": json.dumps({"numRecords": rows}),
+                }
+            }
+        )
+    log_dir = out_dir / "_delta_log"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_path = log_dir / f"{0:020d}.json"
+    log_path.write_text("".join(json.dumps(action) + "\n" for action in actions), encoding="utf-8")
+
+
+def write_parquet_file(
+    path: Path,
+    rows: int,
+    start_row: int,
+    seed: int,
+    compression: str,
+    row_group_rows: int,
+    threads: int | None,
+) -> None:
+    with pq.ParquetWriter(path, catalog_sales_schema(), compression=compression) as writer:
+        for batch in iter_catalog_sales(rows, seed, start_row=start_row, chunk_rows=row_group_rows, threads=threads):
+            writer.write_batch(batch, row_group_size=row_group_rows)
+
+
+def write_catalog_sales(
+    out_dir: Path,
+    rows: int,
+    files: int = 1,
+    seed: int = 0,
+    compression: str = "zstd",
+    row_group_rows: int = CHUNK_ROWS,
+) -> list[tuple[str, int]]:
+    # Writes Parquet data files plus a single-commit _delta_log, so the directory is both a
+    # plain Parquet dataset (readers skip "_"-prefixed paths) and a Delta table.
+    if (out_dir / "_delta_log").exists():
+        raise RuntimeError(f"{out_dir} already holds a Delta table; remove it or pick another --out-dir.")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    per_file = -(-rows // files)
+    starts = list(range(0, rows, per_file))
+    written = [
+        (f"part-{index:05d}-{uuid.uuid4()}.{compression}.parquet", min(per_file, rows - start))
+        for index, start in enumerate(starts)
+    ]
+    # Files are compressed in parallel; a single file parallelizes generation across chunks instead.
+    with ThreadPoolExecutor(max_workers=min(len(starts), os.cpu_count() or 1)) as pool:
+        futures = [
+            pool.submit(
+                write_parquet_file,
+                out_dir / name,
+                file_rows,
+                start,
+                seed,
+                compression,
+                row_group_rows,
+                None if len(starts) == 1 else 1,
+            )
+            for (name, file_rows), start in zip(written, starts)
+        ]
+        for future in futures:
+            future.result()
+    write_delta_log(out_dir, written, catalog_sales_schema())
+    return written
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic TPC-DS catalog_sales table (Parquet + Delta log).")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--rows", type=int, default=10_000_000)
+    size.add_argument("--scale-factor", type=float, help=f"TPC-DS scale factor ({ROWS_PER_SCALE_FACTOR:,} rows per unit).")
+    parser.add_argument("--files", type=int, default=1)
+    parser.add_argument("--out-dir", type=Path, default=DEFAULT_OUT_DIR)
+    parser.add_argument("--compression", default="zstd")
+    parser.add_argument("--row-group-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rows = int(args.scale_factor * ROWS_PER_SCALE_FACTOR) if args.scale_factor is not None else args.rows
+
+    start = time.perf_counter()
+    written = write_catalog_sales(
+        args.out_dir,
+        rows,
+        files=args.files,
+        seed=args.seed,
+        compression=args.compression,
+        row_group_rows=args.row_group_rows,
+    )
+    seconds = time.perf_counter() - start
+    print(f"Wrote {rows:,} rows in {len(written)} file(s) to {args.out_dir} in {seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
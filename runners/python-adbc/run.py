@@ -2,56 +2,148 @@
 from __future__ import annotations
 
 # libs
-from pathlib import Path
+import argparse
+import os
+import sys
+from concurrent.futures import as_completed
 
-from adbc_driver_manager import dbapi
-from dotenv import load_dotenv
+import pyarrow as pa
 
+from common.python.adbc_partitions import POOL_KINDS, PartitionReader, connect_databricks_adbc
 from common.python.helpers import (
+    PhaseTimer,
     build_databricks_adbc_uri,
-    build_payload,
-    default_out_path,
-    load_queries,
-    require_envs,
-    run_scenarios,
-    write_payload,
+    collect_batches,
+    parse_choice_list,
+    parse_int_list,
+    variant_client_id,
 )
+from common.python.runner import Runner, register_runner, run_cli
 
 # variables
-path = Path("queries") / "scenarios.json"
 client_id = "python-adbc"
+# table: the driver builds the table (fetch_arrow_table, the unsuffixed id); reader: fetch_record_batch() batches
+# into one table; partitions: adbc_execute_partitions, partitions read in parallel and concatenated.
+modes = ("table", "reader", "partitions")
+partition_workers = 8
 
 # functions
-def run_query_factory(connection):
-    def run_query(query: str):
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            cursor.fetch_arrow_table()
+def iter_record_batches(cursor, reader):
+    try:
+        yield from reader
+    finally:
+        cursor.close()
 
-    return run_query
 
+def iter_partition_batches(cursor, reader: PartitionReader, partitions: list[bytes]):
+    # Batches in partition completion order, not partition order.
+    try:
+        futures = [reader.submit(partition) for partition in partitions]
+        for future in as_completed(futures):
+            yield from reader.table(future).to_batches()
+    finally:
+        cursor.close()
 
-# script work
-load_dotenv()
-creds = require_envs(["DATABRICKS_HOST", "DATABRICKS_TOKEN", "DATABRICKS_WAREHOUSE_ID", "BENCHMARK_REPEATS"])
-repeats = int(creds["BENCHMARK_REPEATS"])
-loaded = load_queries(path)
-
-uri = build_databricks_adbc_uri(
-    host=creds["DATABRICKS_HOST"],
-    token=creds["DATABRICKS_TOKEN"],
-    warehouse_id=creds["DATABRICKS_WAREHOUSE_ID"],
-)
-con = dbapi.connect(driver="databricks", db_kwargs={"uri": uri})
 
-run_query = run_query_factory(con)
-results = run_scenarios(loaded["scenarios"], run_query, repeats)
+@register_runner
+class AdbcRunner(Runner):
+    client_id = client_id
+    required_envs = ["DATABRICKS_HOST", "DATABRICKS_TOKEN", "DATABRICKS_WAREHOUSE_ID"]
+    sweep_arguments = ("adbc_mode", "partition_pool", "partition_workers")
+    parallel_fetch = True
 
-payload = build_payload(
-    schema_version=loaded["queries"]["schema_version"],
-    client_id=client_id,
-    repeats=repeats,
-    results=results,
-)
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--adbc-mode",
+            type=parse_choice_list(modes),
+            default=os.getenv("ADBC_MODE", "table"),
+            help=f"Result path ({', '.join(modes)}); comma-separated to sweep.",
+        )
+        parser.add_argument(
+            "--partition-pool",
+            type=parse_choice_list(POOL_KINDS),
+            default=os.getenv("ADBC_PARTITION_POOL", "thread"),
+            help="Pool reading partitions in --adbc-mode partitions; comma-separated to sweep.",
+        )
+        parser.add_argument(
+            "--partition-workers",
+            type=parse_int_list,
+            default=os.getenv("ADBC_PARTITION_WORKERS", str(partition_workers)),
+            help="Partition readers (each with its own connection); comma-separated to sweep.",
+        )
+
+    def variant(self) -> str:
+        suffix = "" if self.args.adbc_mode == "table" else f"-{self.args.adbc_mode}"
+        if self.args.adbc_mode == "partitions":
+            suffix += f"-{self.args.partition_pool}{self.args.partition_workers}"
+        return variant_client_id(f"{self.client_id}{suffix}", self.args.consume)
+
+    def parameters(self) -> dict:
+        parameters = {"adbc_mode": self.args.adbc_mode}
+        if self.args.adbc_mode == "partitions":
+            parameters.update({"partition_pool": self.args.partition_pool, "partition_workers": self.args.partition_workers})
+        return parameters
+
+    def connect(self) -> None:
+        uri = build_databricks_adbc_uri(
+            host=self.creds["DATABRICKS_HOST"],
+            token=self.creds["DATABRICKS_TOKEN"],
+            warehouse_id=self.creds["DATABRICKS_WAREHOUSE_ID"],
+        )
+        self.connection = connect_databricks_adbc(uri)
+        self.partition_reader = None
+        if self.args.adbc_mode == "partitions":
+            # Worker connections open on first use, during warmup, outside the timed runs.
+            self.partition_reader = PartitionReader(self.args.partition_pool, self.args.partition_workers, uri)
 
-write_payload(payload, default_out_path(client_id))
+    def execute(self, query: str, phases: PhaseTimer):
+        cursor = self.connection.cursor()
+        if self.args.adbc_mode != "partitions":
+            with phases("execute"):
+                cursor.execute(query)
+            return cursor
+        with phases("execute"):
+            partitions, schema = cursor.adbc_execute_partitions(query)
+        phases.count("partitions", len(partitions))
+        return cursor, partitions, schema
+
+    def iter_batches(self, handle, phases: PhaseTimer):
+        if self.args.adbc_mode == "partitions":
+            cursor, partitions, _ = handle
+            return iter_partition_batches(cursor, self.partition_reader, partitions)
+        if self.args.adbc_mode == "table":
+            # The driver builds the whole table before the first batch is available.
+            with handle:
+                return iter(handle.fetch_arrow_table().to_batches())
+        return iter_record_batches(handle, handle.fetch_record_batch())
+
+    def materialize(self, handle, phases: PhaseTimer):
+        if self.args.adbc_mode == "partitions":
+            cursor, partitions, schema = handle
+            with cursor:
+                futures = [self.partition_reader.submit(partition) for partition in partitions]
+                with phases("fetch"):
+                    tables = [self.partition_reader.table(future) for future in futures]
+                with phases("convert"):
+                    # concat_tables only collects the partitions' chunks; no buffers are copied.
+                    return pa.concat_tables(tables) if tables else schema.empty_table()
+        with handle:
+            if self.args.adbc_mode == "table":
+                with phases("fetch"):
+                    return handle.fetch_arrow_table()
+            with phases("first_batch"):
+                reader = handle.fetch_record_batch()
+            batches = collect_batches(reader, phases)
+            with phases("convert"):
+                return pa.Table.from_batches(batches, schema=reader.schema)
+
+    def close(self) -> None:
+        if self.partition_reader is not None:
+            self.partition_reader.close()
+        self.connection.close()
+
+
+# script work
+if __name__ == "__main__":
+    sys.exit(run_cli([AdbcRunner]))
@@ -2,33 +2,29 @@
 from __future__ import annotations
 
 # libs
+import argparse
 import os
+import shutil
+import sys
 from pathlib import Path
 
-import duckdb
-from databricks.sdk import WorkspaceClient
-from dotenv import load_dotenv
-
-from common.python.helpers import (
-    build_payload,
-    default_out_path,
-    load_queries,
-    require_envs,
-    run_scenarios,
-    write_payload,
-)
+from common.python.helpers import PhaseTimer, parse_choice_list, parse_int_list, variant_client_id
+from common.python.runner import Runner, register_runner, run_cli
 
 # variables
-path = Path("queries") / "scenarios.json"
 client_id = "python-external-duckdb"
 source_table = "samples.tpcds_sf1000.catalog_sales"
 shared_table_name = "catalog_sales"
 uc_name = "uc"
+# none: no disk cache; cold: disk cache emptied and connection reopened before every iteration;
+# warm: disk cache kept across iterations (warmups fill it).
+cache_modes = ("none", "cold", "warm")
+default_cache_dir = "data/duckdb-cache"
 
 
 # functions
 def attach_unity_catalog(
-    con: duckdb.DuckDBPyConnection,
+    con,
     catalog: str,
     name: str,
     token: str,
@@ -52,55 +48,142 @@ def attach_unity_catalog(
     con.execute(f"ATTACH '{catalog}' AS \"{name}\" (TYPE UC_CATALOG)")
 
 
-def run_query_factory(con: duckdb.DuckDBPyConnection, target_table_fqn: str):
-    def run_query(query: str):
-        rewritten_query = query.replace(source_table, target_table_fqn)
-        return con.execute(rewritten_query).fetch_arrow_table()
+def enable_disk_cache(con, cache_dir: Path) -> None:
+    # cache_httpfs wraps httpfs reads and keeps fetched blocks of remote files on local disk.
+    con.execute("INSTALL cache_httpfs FROM community")
+    con.execute("LOAD cache_httpfs")
+    con.execute("SET cache_httpfs_type = 'on_disk'")
+    con.execute(f"SET cache_httpfs_cache_directory = '{cache_dir}'")
+
+
+def trim_cache_dir(cache_dir: Path, max_bytes: int) -> None:
+    # Least recently written blocks go first until the directory fits under max_bytes.
+    files = sorted((path for path in cache_dir.rglob("*") if path.is_file()), key=lambda path: path.stat().st_mtime)
+    total = sum(path.stat().st_size for path in files)
+    for path in files:
+        if total <= max_bytes:
+            break
+        total -= path.stat().st_size
+        path.unlink(missing_ok=True)
+
+
+@register_runner
+class ExternalDuckdbRunner(Runner):
+    client_id = client_id
+    required_envs = ["DATABRICKS_HOST", "DATABRICKS_TOKEN", "DUCKDB_UC_CATALOG", "DUCKDB_UC_SCHEMA"]
+    prepared_attributes = ("query_sql",)
+    sweep_arguments = ("threads", "cache")
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--threads",
+            type=parse_int_list,
+            default=os.getenv("DUCKDB_THREADS") or [None],
+            help="DuckDB threads; comma-separated to sweep. Default: DuckDB's own (cores).",
+        )
+        parser.add_argument(
+            "--memory-limit",
+            default=os.getenv("DUCKDB_MEMORY_LIMIT"),
+            help="DuckDB memory_limit, e.g. 8GB. Default: DuckDB's own (80%% of RAM).",
+        )
+        parser.add_argument(
+            "--cache",
+            type=parse_choice_list(cache_modes),
+            default=os.getenv("DUCKDB_CACHE", "none"),
+            help=f"Remote file disk cache ({', '.join(cache_modes)}); comma-separated to sweep.",
+        )
+        parser.add_argument("--cache-dir", type=Path, default=Path(os.getenv("DUCKDB_CACHE_DIR", default_cache_dir)))
+        parser.add_argument("--cache-max-gb", type=float, default=float(os.getenv("DUCKDB_CACHE_MAX_GB", "20")))
+
+    def variant(self) -> str:
+        suffix = "" if self.args.cache == "none" else f"-{self.args.cache}"
+        if self.args.threads is not None:
+            suffix += f"-t{self.args.threads}"
+        return variant_client_id(f"{self.client_id}{suffix}", self.args.consume)
+
+    def parameters(self) -> dict:
+        parameters = {"threads": self.args.threads, "memory_limit": self.args.memory_limit, "cache": self.args.cache}
+        if self.args.cache != "none":
+            parameters.update({"cache_dir": str(self.args.cache_dir), "cache_max_gb": self.args.cache_max_gb})
+        return parameters
+
+    def connect(self) -> None:
+        from databricks.sdk import WorkspaceClient
+
+        workspace_client = WorkspaceClient(
+            host=self.creds["DATABRICKS_HOST"],
+            token=self.creds["DATABRICKS_TOKEN"],
+        )
+        self.region = os.getenv("DUCKDB_UC_REGION") or workspace_client.metastores.summary().region or ""
+        if not self.region:
+            raise RuntimeError("Missing metastore region. Set DUCKDB_UC_REGION.")
+
+        self.target_table_fqn = f"{uc_name}.{self.creds['DUCKDB_UC_SCHEMA']}.{shared_table_name}"
+        if self.args.cache != "none":
+            self.args.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.open_connection()
+
+    def open_connection(self) -> None:
+        import duckdb
+
+        config = {}
+        if self.args.threads is not None:
+            config["threads"] = self.args.threads
+        if self.args.memory_limit:
+            config["memory_limit"] = self.args.memory_limit
+        self.connection = duckdb.connect(config=config)
+        if self.args.cache != "none":
+            enable_disk_cache(self.connection, self.args.cache_dir.resolve())
+        attach_unity_catalog(
+            con=self.connection,
+            catalog=self.creds["DUCKDB_UC_CATALOG"],
+            name=uc_name,
+            token=self.creds["DATABRICKS_TOKEN"],
+            endpoint=self.creds["DATABRICKS_HOST"],
+            region=self.region,
+        )
 
-    return run_query
+    def prepare(self, scenarios: dict[str, str]) -> None:
+        if self.args.cache != "none":
+            # Each variant starts from an empty cache, so warm runs only reuse what their own warmups fetched.
+            self.flush_cache()
+        # Structured scenarios are rebuilt against the attached table; others (select_1) get the table name swapped.
+        self.query_sql = {
+            query: self.specs[scenario_id].sql(self.target_table_fqn)
+            if scenario_id in self.specs
+            else query.replace(source_table, self.target_table_fqn)
+            for scenario_id, query in scenarios.items()
+        }
+
+    def flush_cache(self) -> None:
+        shutil.rmtree(self.args.cache_dir, ignore_errors=True)
+        self.args.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def before_iteration(self) -> None:
+        if self.args.cache == "cold":
+            # Drop on-disk blocks and the connection's in-memory metadata so every iteration reads remote.
+            self.connection.close()
+            self.flush_cache()
+            self.open_connection()
+        elif self.args.cache == "warm":
+            trim_cache_dir(self.args.cache_dir, int(self.args.cache_max_gb * 1024**3))
+
+    def execute(self, query: str, phases: PhaseTimer):
+        with phases("execute"):
+            return self.connection.execute(self.query_sql[query])
+
+    def iter_batches(self, result, phases: PhaseTimer):
+        return result.fetch_record_batch()
+
+    def materialize(self, result, phases: PhaseTimer):
+        with phases("fetch"):
+            return result.fetch_arrow_table()
+
+    def close(self) -> None:
+        self.connection.close()
 
 
 # script work
-load_dotenv()
-creds = require_envs(
-    [
-        "DATABRICKS_HOST",
-        "DATABRICKS_TOKEN",
-        "BENCHMARK_REPEATS",
-        "DUCKDB_UC_CATALOG",
-        "DUCKDB_UC_SCHEMA",
-    ]
-)
-repeats = int(creds["BENCHMARK_REPEATS"])
-loaded = load_queries(path)
-workspace_client = WorkspaceClient(
-    host=creds["DATABRICKS_HOST"],
-    token=creds["DATABRICKS_TOKEN"],
-)
-region = os.getenv("DUCKDB_UC_REGION", workspace_client.metastores.summary().region or "")
-if not region:
-    raise RuntimeError("Missing metastore region. Set DUCKDB_UC_REGION.")
-
-target_table_fqn = f"{uc_name}.{creds['DUCKDB_UC_SCHEMA']}.{shared_table_name}"
-
-con = duckdb.connect()
-attach_unity_catalog(
-    con=con,
-    catalog=creds["DUCKDB_UC_CATALOG"],
-    name=uc_name,
-    token=creds["DATABRICKS_TOKEN"],
-    endpoint=creds["DATABRICKS_HOST"],
-    region=region,
-)
-
-run_query = run_query_factory(con, target_table_fqn)
-results = run_scenarios(loaded["scenarios"], run_query, repeats)
-
-payload = build_payload(
-    schema_version=loaded["queries"]["schema_version"],
-    client_id=client_id,
-    repeats=repeats,
-    results=results,
-)
-
-write_payload(payload, default_out_path(client_id))
+if __name__ == "__main__":
+    sys.exit(run_cli([ExternalDuckdbRunner]))
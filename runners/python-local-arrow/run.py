@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+# libs
+import sys
+
+import pyarrow.dataset as ds
+
+from common.python.helpers import PhaseTimer, limit_batches
+from common.python.runner import Runner, register_runner, run_cli
+from common.python.synthetic import constant_query_table, local_table_path
+
+# variables
+client_id = "python-local-arrow"
+
+
+# functions
+@register_runner
+class LocalArrowRunner(Runner):
+    client_id = client_id
+    prepared_attributes = ("query_specs",)
+
+    def connect(self) -> None:
+        self.dataset = ds.dataset(str(local_table_path()), format="parquet")
+
+    def prepare(self, scenarios: dict[str, str]) -> None:
+        # Scenarios without structured fields (select_1) are constant queries.
+        self.query_specs = {query: self.specs[scenario_id] for scenario_id, query in scenarios.items() if scenario_id in self.specs}
+
+    def execute(self, query: str, phases: PhaseTimer):
+        spec = self.query_specs.get(query)
+        if spec is None:
+            return ds.dataset(constant_query_table(query)).scanner(), None
+        with phases("execute"):
+            return self.dataset.scanner(columns=spec.columns, filter=spec.arrow_filter()), spec.limit
+
+    def iter_batches(self, handle, phases: PhaseTimer):
+        scanner, limit = handle
+        return limit_batches(scanner.to_batches(), limit)
+
+    def materialize(self, handle, phases: PhaseTimer):
+        scanner, limit = handle
+        with phases("fetch"):
+            return scanner.to_table() if limit is None else scanner.head(limit)
+
+
+# script work
+if __name__ == "__main__":
+    sys.exit(run_cli([LocalArrowRunner]))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+# libs
+import sys
+
+import pyarrow as pa
+
+from common.python.helpers import PhaseTimer, ScenarioSpec, collect_batches, limit_batches
+from common.python.runner import Runner, register_runner, run_cli
+from common.python.synthetic import constant_query_table, local_table_path
+
+# variables
+client_id = "python-local-delta-kernel"
+
+
+# functions
+def project_batches(batches, spec: ScenarioSpec):
+    # The wrapper's ScanBuilder takes no schema or predicate, so both apply to each batch as the scan yields it.
+    row_filter = spec.arrow_filter()
+    for batch in batches:
+        if row_filter is not None:
+            batch = batch.filter(row_filter)
+        yield batch if spec.columns is None else batch.select(spec.columns)
+
+
+@register_runner
+class LocalDeltaKernelRunner(Runner):
+    client_id = client_id
+    prepared_attributes = ("query_specs",)
+
+    def connect(self) -> None:
+        import delta_kernel_rust_sharing_wrapper
+
+        self.kernel = delta_kernel_rust_sharing_wrapper
+        self.table_uri = local_table_path().resolve().as_uri()
+
+    def prepare(self, scenarios: dict[str, str]) -> None:
+        # Scenarios without structured fields (select_1) are constant queries.
+        self.query_specs = {query: self.specs[scenario_id] for scenario_id, query in scenarios.items() if scenario_id in self.specs}
+
+    def execute(self, query: str, phases: PhaseTimer):
+        spec = self.query_specs.get(query)
+        if spec is None:
+            return constant_query_table(query).to_batches(), ScenarioSpec()
+        with phases("execute"):
+            interface = self.kernel.PythonInterface(self.table_uri)
+            snapshot = self.kernel.Table(self.table_uri).snapshot(interface)
+            scan = self.kernel.ScanBuilder(snapshot).build()
+            return scan.execute(interface), spec
+
+    def iter_batches(self, handle, phases: PhaseTimer):
+        batches, spec = handle
+        return limit_batches(project_batches(batches, spec), spec.limit)
+
+    def materialize(self, handle, phases: PhaseTimer):
+        batches = collect_batches(self.iter_batches(handle, phases), phases)
+        with phases("convert"):
+            return pa.Table.from_batches(batches)
+
+
+# script work
+if __name__ == "__main__":
+    sys.exit(run_cli([LocalDeltaKernelRunner]))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+# libs
+import sys
+
+from common.python.helpers import PhaseTimer
+from common.python.runner import Runner, register_runner, run_cli
+from common.python.synthetic import SOURCE_TABLE, local_table_path
+
+# variables
+client_id = "python-local-duckdb"
+
+
+# functions
+@register_runner
+class LocalDuckdbRunner(Runner):
+    client_id = client_id
+    parallel_fetch = True
+
+    def connect(self) -> None:
+        import duckdb
+
+        self.source = f"read_parquet('{local_table_path().resolve()}/*.parquet')"
+        self.connection = duckdb.connect()
+
+    def execute(self, query: str, phases: PhaseTimer):
+        with phases("execute"):
+            return self.connection.execute(query.replace(SOURCE_TABLE, self.source))
+
+    def iter_batches(self, result, phases: PhaseTimer):
+        return result.fetch_record_batch()
+
+    def materialize(self, result, phases: PhaseTimer):
+        with phases("fetch"):
+            return result.fetch_arrow_table()
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+# script work
+if __name__ == "__main__":
+    sys.exit(run_cli([LocalDuckdbRunner]))
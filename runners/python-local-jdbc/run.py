@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+# libs
+import sys
+
+from common.python.jdbc import JdbcRunner
+from common.python.runner import register_runner, run_cli
+from common.python.synthetic import SOURCE_TABLE, SQLITE_TABLE, local_sqlite_path
+
+# variables
+client_id = "python-local-jdbc"
+driver_class = "org.sqlite.JDBC"
+
+
+# functions
+@register_runner
+class LocalJdbcRunner(JdbcRunner):
+    client_id = client_id
+    required_envs = ["LOCAL_JDBC_JAR_PATH"]
+    driver_class = driver_class
+    jar_env = "LOCAL_JDBC_JAR_PATH"
+
+    def jdbc_url(self) -> str:
+        # Resolved before connecting: the SQLite driver would otherwise create an empty database at the path.
+        return f"jdbc:sqlite:{local_sqlite_path().resolve()}"
+
+    def rewrite_query(self, query: str) -> str:
+        return query.replace(SOURCE_TABLE, SQLITE_TABLE)
+
+
+# script work
+if __name__ == "__main__":
+    sys.exit(run_cli([LocalJdbcRunner]))
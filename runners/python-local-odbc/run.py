@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+# libs
+import os
+import sys
+
+from common.python.odbc import OdbcRunner
+from common.python.runner import register_runner, run_cli
+from common.python.synthetic import SOURCE_TABLE, SQLITE_TABLE, local_sqlite_path
+
+# variables
+client_id = "python-local-odbc"
+
+
+# functions
+@register_runner
+class LocalOdbcRunner(OdbcRunner):
+    client_id = client_id
+
+    def connect(self) -> None:
+        # Resolved before connecting: the SQLite driver would otherwise create an empty database at the path.
+        self.sqlite_path = local_sqlite_path()
+        super().connect()
+
+    def connection_string(self) -> str:
+        driver = os.getenv("LOCAL_ODBC_DRIVER", "SQLite3")
+        return f"Driver={{{driver}}};Database={self.sqlite_path.resolve()}"
+
+    def rewrite_query(self, query: str) -> str:
+        return query.replace(SOURCE_TABLE, SQLITE_TABLE)
+
+
+# script work
+if __name__ == "__main__":
+    sys.exit(run_cli([LocalOdbcRunner]))
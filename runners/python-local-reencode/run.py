@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+# libs
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from common.python import formats
+from common.python.helpers import PhaseTimer, ScenarioSpec, variant_client_id
+from common.python.runner import Runner, register_runner, run_cli
+from common.python.synthetic import constant_query_table, local_table_path, read_scenario_table
+
+# variables
+client_id = "python-local-reencode"
+
+
+# functions
+def load_scenario_table(dataset: ds.Dataset, query: str, spec: ScenarioSpec | None) -> pa.Table:
+    # Scenarios without structured fields (select_1) are constant queries.
+    return constant_query_table(query) if spec is None else read_scenario_table(dataset, spec)
+
+
+def load_exported_table(source_dir: Path, scenario_id: str) -> pa.Table:
+    # Downloaded exports laid out as <dir>/<scenario_id>/*.parquet, e.g. a staged files-1 layout.
+    return ds.dataset(str(source_dir / scenario_id), format="parquet").to_table()
+
+
+def encode_table(table: pa.Table, export_format: str, compression: str, row_group_mb: int | None) -> pa.Buffer:
+    sink = pa.BufferOutputStream()
+    formats.write_table(table, sink, export_format, compression, row_group_mb)
+    return sink.getvalue()
+
+
+@register_runner
+class LocalReencodeRunner(Runner):
+    client_id = client_id
+    prepared_attributes = ("encoded",)
+    sweep_arguments = formats.EXPORT_SWEEP_ARGUMENTS
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        source_dir = os.getenv("LOCAL_REENCODE_SOURCE_DIR")
+        parser.add_argument(
+            "--source-dir",
+            type=Path,
+            default=Path(source_dir) if source_dir else None,
+            help="Re-encode downloaded exports (<dir>/<scenario_id>/*.parquet) instead of the synthetic table.",
+        )
+        formats.add_export_arguments(parser)
+
+    def variant(self) -> str:
+        suffix = formats.export_suffix(self.args.export_format, self.args.compression, self.args.row_group_mb)
+        return variant_client_id(f"{self.client_id}{suffix}", self.args.consume)
+
+    def parameters(self) -> dict:
+        source = str(self.args.source_dir) if self.args.source_dir else "synthetic"
+        return {**formats.export_parameters(self.args), "source": source}
+
+    def prepare(self, scenarios: dict[str, str]) -> None:
+        # Encoding happens once, outside the timed region; iterations only decode from memory.
+        dataset = None if self.args.source_dir else ds.dataset(str(local_table_path()), format="parquet")
+        self.encoded: dict[str, pa.Buffer] = {}
+        for scenario_id, query in scenarios.items():
+            if self.args.source_dir:
+                table = load_exported_table(self.args.source_dir, scenario_id)
+            else:
+                table = load_scenario_table(dataset, query, self.specs.get(scenario_id))
+            self.encoded[query] = encode_table(table, self.args.export_format, self.args.compression, self.args.row_group_mb)
+
+    def iter_batches(self, query: str, phases: PhaseTimer):
+        phases.count("file_bytes", self.encoded[query].size)
+        return formats.iter_batches(pa.BufferReader(self.encoded[query]), self.args.export_format)
+
+    def materialize(self, query: str, phases: PhaseTimer):
+        phases.count("file_bytes", self.encoded[query].size)
+        with phases("convert"):
+            return formats.read_table(pa.BufferReader(self.encoded[query]), self.args.export_format)
+
+
+# script work
+if __name__ == "__main__":
+    sys.exit(run_cli([LocalReencodeRunner]))
@@ -2,34 +2,43 @@
 from __future__ import annotations
 
 # libs
+import argparse
 import os
+import re
+import sys
 import tempfile
-from json import dump, loads
-from pathlib import Path
-from typing import List, Optional
+import time
+from contextlib import ExitStack
+from json import dump, dumps, loads
+from typing import TYPE_CHECKING, Iterator, List, Optional
 
-import delta_kernel_rust_sharing_wrapper
 import pyarrow as pa
-from delta_sharing.protocol import DeltaSharingProfile, Table
-from delta_sharing.rest_client import DataSharingRestClient
-from dotenv import load_dotenv
 
 from common.python.helpers import (
-    build_payload,
-    default_out_path,
-    load_queries,
-    require_envs,
-    run_scenarios,
-    write_payload,
+    PhaseTimer,
+    ScenarioSpec,
+    collect_batches,
+    filter_batches,
+    limit_batches,
+    parse_choice_list,
+    variant_client_id,
 )
+from common.python.runner import Runner, register_runner, run_cli
+
+if TYPE_CHECKING:
+    from delta_sharing.protocol import Table
+    from delta_sharing.rest_client import DataSharingRestClient
 
 # variables
-path = Path("queries") / "scenarios.json"
 client_id = "python-sharing-client-hack"
 shared_table_name = "catalog_sales"
 default_sharing_schema = "dbx_fetch_benchmark_sharing"
 default_sharing_share = "dbx_fetch_benchmark_share"
 default_sharing_profile_path = "secrets/dbx-fetch-benchmark.share"
+# json: decode and re-encode every response line; slice: cut deltaSingleAction out of the raw line.
+log_build_modes = ("json", "slice")
+delta_single_action_marker = '"deltaSingleAction":'
+num_records_pattern = re.compile(r'numRecords\\?"\s*:\s*(\d+)')
 
 
 # functions
@@ -64,7 +73,23 @@ def _extract_num_records(delta_single_action: dict) -> Optional[int]:
     return None
 
 
-def _write_temp_delta_log_snapshot(temp_dir: str, lines: List[str], limit_hint: Optional[int]) -> str:
+def _project_metadata(metadata: dict, columns: Optional[List[str]]) -> dict:
+    # delta-kernel reads the table schema from metaData, so a projected schemaString makes the scan
+    # read only those Parquet columns.
+    if columns is None:
+        return metadata
+    fields = {field["name"]: field for field in loads(metadata["schemaString"])["fields"]}
+    schema = {"type": "struct", "fields": [fields[column] for column in columns]}
+    partition_columns = [column for column in metadata.get("partitionColumns", []) if column in columns]
+    return {**metadata, "schemaString": dumps(schema), "partitionColumns": partition_columns}
+
+
+def _write_temp_delta_log_snapshot(
+    temp_dir: str,
+    lines: List[str],
+    limit_hint: Optional[int],
+    columns: Optional[List[str]] = None,
+) -> str:
     table_path = f"file:///{temp_dir}"
     log_dir = os.path.join(temp_dir, "_delta_log")
     os.makedirs(log_dir, exist_ok=True)
@@ -72,7 +97,7 @@ def _write_temp_delta_log_snapshot(temp_dir: str, lines: List[str], limit_hint:
     with open(os.path.join(log_dir, "0".zfill(20) + ".json"), "w", encoding="utf-8") as file:
         dump({"protocol": loads(lines[0])["protocol"]["deltaProtocol"]}, file)
         file.write("\n")
-        dump({"metaData": loads(lines[1])["metaData"]["deltaMetadata"]}, file)
+        dump({"metaData": _project_metadata(loads(lines[1])["metaData"]["deltaMetadata"], columns)}, file)
         file.write("\n")
         remaining_rows = limit_hint
         for line in lines[2:]:
@@ -89,95 +114,179 @@ def _write_temp_delta_log_snapshot(temp_dir: str, lines: List[str], limit_hint:
     return table_path
 
 
+def _slice_delta_single_action(line: str) -> Optional[str]:
+    # The file object's siblings after deltaSingleAction (version, timestamps) are scalars, so the
+    # action ends at the last "}" before the closing braces of "file" and the line.
+    start = line.find(delta_single_action_marker)
+    if start < 0:
+        return None
+    start += len(delta_single_action_marker)
+    line = line.rstrip()
+    end = line.rfind("}", start, len(line) - 2) + 1
+    action = line[start:end].strip()
+    return action if action.startswith("{") else None
+
+
+def _write_sliced_delta_log_snapshot(
+    temp_dir: str,
+    lines: List[str],
+    limit_hint: Optional[int],
+    columns: Optional[List[str]] = None,
+) -> str:
+    table_path = f"file:///{temp_dir}"
+    log_dir = os.path.join(temp_dir, "_delta_log")
+    os.makedirs(log_dir, exist_ok=True)
+
+    actions = [
+        dumps({"protocol": loads(lines[0])["protocol"]["deltaProtocol"]}),
+        dumps({"metaData": _project_metadata(loads(lines[1])["metaData"]["deltaMetadata"], columns)}),
+    ]
+    remaining_rows = limit_hint
+    for line in lines[2:]:
+        action = _slice_delta_single_action(line)
+        if action is None:
+            action = dumps(loads(line)["file"]["deltaSingleAction"])
+        actions.append(action)
+        if remaining_rows is not None:
+            match = num_records_pattern.search(action)
+            if match is not None:
+                remaining_rows -= int(match.group(1))
+                if remaining_rows <= 0:
+                    break
+
+    with open(os.path.join(log_dir, "0".zfill(20) + ".json"), "w", encoding="utf-8") as file:
+        file.write("\n".join(actions))
+        file.write("\n")
+
+    return table_path
+
+
 def build_sharing_context(profile_file: str, share: str, schema: str, table: str):
+    from delta_sharing.protocol import DeltaSharingProfile, Table
+    from delta_sharing.rest_client import DataSharingRestClient
+
     profile = DeltaSharingProfile.read_from_file(profile_file)
     rest_client = DataSharingRestClient(profile)
     remote_table = Table(name=table, share=share, schema=schema)
     return rest_client, remote_table
 
 
-def table_to_arrow(rest_client: DataSharingRestClient, remote_table: Table, limit_hint: Optional[int] = None) -> pa.Table:
+def iter_table_batches(
+    rest_client: DataSharingRestClient,
+    remote_table: Table,
+    spec: Optional[ScenarioSpec] = None,
+    phases: Optional[PhaseTimer] = None,
+    log_build: str = "json",
+) -> Iterator[pa.RecordBatch]:
+    import delta_kernel_rust_sharing_wrapper
+
+    spec = spec or ScenarioSpec()
+    phases = phases or PhaseTimer()
+    # Undone when the batches are exhausted or closed, or right away if the build below fails.
+    cleanup = ExitStack()
     rest_client.set_delta_format_header()
-    if limit_hint is None:
-        response = rest_client.list_files_in_table(remote_table)
-    else:
-        response = rest_client.list_files_in_table(remote_table, limitHint=limit_hint)
-
-    with tempfile.TemporaryDirectory(prefix="dbx-fetch-benchmark-sharing-hack-") as temp_dir:
-        table_uri = _write_temp_delta_log_snapshot(temp_dir, response.lines, limit_hint)
-        interface = delta_kernel_rust_sharing_wrapper.PythonInterface(table_uri)
-        snapshot = delta_kernel_rust_sharing_wrapper.Table(table_uri).snapshot(interface)
-        scan = delta_kernel_rust_sharing_wrapper.ScanBuilder(snapshot).build()
-        batch_iterator = iter(scan.execute(interface))
-
-        selected_batches = []
-        rows_selected = 0
-
-        while True:
-            try:
-                batch = next(batch_iterator)
-            except StopIteration:
-                break
-            if limit_hint is None:
-                selected_batches.append(batch)
-                rows_selected += batch.num_rows
-                continue
-
-            remaining = limit_hint - rows_selected
-            if remaining <= 0:
-                break
-
-            if batch.num_rows <= remaining:
-                selected_batches.append(batch)
-                rows_selected += batch.num_rows
-            else:
-                selected_batches.append(batch.slice(0, remaining))
-                rows_selected += remaining
-                break
+    cleanup.callback(rest_client.remove_delta_format_header)
+    try:
+        with phases("execute"):
+            response = rest_client.list_files_in_table(
+                remote_table,
+                limitHint=spec.limit_hint,
+                jsonPredicateHints=spec.json_predicate_hints(),
+            )
+
+        temp_dir = cleanup.enter_context(tempfile.TemporaryDirectory(prefix="dbx-fetch-benchmark-sharing-hack-"))
+        with phases("execute"):
+            write_snapshot = _write_sliced_delta_log_snapshot if log_build == "slice" else _write_temp_delta_log_snapshot
+            start = time.perf_counter()
+            table_uri = write_snapshot(temp_dir, response.lines, spec.limit_hint, spec.read_columns)
+            phases.count("log_build_s", time.perf_counter() - start)
+            phases.count("log_lines", len(response.lines))
+            interface = delta_kernel_rust_sharing_wrapper.PythonInterface(table_uri)
+            snapshot = delta_kernel_rust_sharing_wrapper.Table(table_uri).snapshot(interface)
+            scan = delta_kernel_rust_sharing_wrapper.ScanBuilder(snapshot).build()
+    except BaseException:
+        cleanup.close()
+        raise
+
+    def batches() -> Iterator[pa.RecordBatch]:
+        with cleanup:
+            yield from limit_batches(filter_batches(scan.execute(interface), spec), spec.limit)
+
+    return batches()
+
+
+def table_to_arrow(
+    rest_client: DataSharingRestClient,
+    remote_table: Table,
+    spec: Optional[ScenarioSpec] = None,
+    phases: Optional[PhaseTimer] = None,
+    log_build: str = "json",
+) -> pa.Table:
+    phases = phases or PhaseTimer()
+    batch_iterator = iter_table_batches(rest_client, remote_table, spec, phases, log_build)
+    selected_batches = collect_batches(batch_iterator, phases)
+    with phases("convert"):
         if selected_batches:
-            table_result = pa.Table.from_batches(selected_batches)
-        else:
-            table_result = pa.table({})
+            return pa.Table.from_batches(selected_batches)
+        return pa.table({})
+
+
+@register_runner
+class SharingClientHackRunner(Runner):
+    client_id = client_id
+    prepared_attributes = ("query_specs",)
+    sweep_arguments = ("log_build",)
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--log-build",
+            type=parse_choice_list(log_build_modes),
+            default=os.getenv("SHARING_HACK_LOG_BUILD", "json"),
+            help=f"How the temp Delta log is built from the sharing response ({', '.join(log_build_modes)}); comma-separated to sweep.",
+        )
 
-    rest_client.remove_delta_format_header()
-    return table_result
+    def variant(self) -> str:
+        suffix = "" if self.args.log_build == "json" else f"-{self.args.log_build}"
+        return variant_client_id(f"{self.client_id}{suffix}", self.args.consume)
 
+    def parameters(self) -> dict:
+        return {"log_build": self.args.log_build}
 
-def run_query_factory(profile_file: str, share: str, schema: str, query_limits: dict[str, int]):
-    rest_client, remote_table = build_sharing_context(profile_file, share, schema, shared_table_name)
+    def connect(self) -> None:
+        self.rest_client, self.remote_table = build_sharing_context(
+            os.getenv("SHARING_PROFILE_PATH", default_sharing_profile_path),
+            os.getenv("SHARING_SHARE", default_sharing_share),
+            os.getenv("SHARING_SCHEMA", default_sharing_schema),
+            shared_table_name,
+        )
 
-    def run_query(query: str):
-        return table_to_arrow(
-            rest_client=rest_client,
-            remote_table=remote_table,
-            limit_hint=query_limits[query],
+    def prepare(self, scenarios: dict[str, str]) -> None:
+        # Scenarios without structured fields (select_1) fall back to a limit parsed from the id.
+        self.query_specs = {
+            query: self.specs.get(scenario_id) or ScenarioSpec(limit=extract_limit_from_scenario_id(scenario_id))
+            for scenario_id, query in scenarios.items()
+        }
+
+    def iter_batches(self, query: str, phases: PhaseTimer):
+        return iter_table_batches(
+            rest_client=self.rest_client,
+            remote_table=self.remote_table,
+            spec=self.query_specs[query],
+            phases=phases,
+            log_build=self.args.log_build,
         )
 
-    return run_query
+    def materialize(self, query: str, phases: PhaseTimer):
+        return table_to_arrow(
+            rest_client=self.rest_client,
+            remote_table=self.remote_table,
+            spec=self.query_specs[query],
+            phases=phases,
+            log_build=self.args.log_build,
+        )
 
 
 # script work
-load_dotenv()
-creds = require_envs(["BENCHMARK_REPEATS"])
-repeats = int(creds["BENCHMARK_REPEATS"])
-loaded = load_queries(path)
-sharing_profile_path = os.getenv("SHARING_PROFILE_PATH", default_sharing_profile_path)
-sharing_share = os.getenv("SHARING_SHARE", default_sharing_share)
-sharing_schema = os.getenv("SHARING_SCHEMA", default_sharing_schema)
-
-query_limits = {
-    query: extract_limit_from_scenario_id(scenario_id)
-    for scenario_id, query in loaded["scenarios"].items()
-}
-
-run_query = run_query_factory(sharing_profile_path, sharing_share, sharing_schema, query_limits)
-results = run_scenarios(loaded["scenarios"], run_query, repeats)
-
-payload = build_payload(
-    schema_version=loaded["queries"]["schema_version"],
-    client_id=client_id,
-    repeats=repeats,
-    results=results,
-)
-
-write_payload(payload, default_out_path(client_id))
+if __name__ == "__main__":
+    sys.exit(run_cli([SharingClientHackRunner]))
@@ -2,28 +2,28 @@
 from __future__ import annotations
 
 # libs
+import argparse
+import operator
 import os
-from pathlib import Path
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from json import loads
 
-import delta_sharing
-from dotenv import load_dotenv
-
-from common.python.helpers import (
-    build_payload,
-    default_out_path,
-    load_queries,
-    require_envs,
-    run_scenarios,
-    write_payload,
-)
+from common.python.helpers import PhaseTimer, ScenarioSpec, parse_choice_list, parse_int_list, variant_client_id
+from common.python.runner import Runner, register_runner, run_cli
 
 # variables
-path = Path("queries") / "scenarios.json"
 client_id = "python-sharing-client"
 shared_table_name = "catalog_sales"
 default_sharing_schema = "dbx_fetch_benchmark_sharing"
 default_sharing_share = "dbx_fetch_benchmark_share"
 default_sharing_profile_path = "secrets/dbx-fetch-benchmark.share"
+# library: delta_sharing.load_as_pandas, columns/predicate applied after load; projected: read only the
+# needed columns of each listed Parquet file; prefetch: download listed files concurrently, decode as they land.
+loaders = ("library", "projected", "prefetch")
+prefetch_concurrency = 8
+frame_ops = {"=": operator.eq, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
 
 
 # functions
@@ -40,41 +40,216 @@ def build_table_url(profile_path: str, share_name: str, schema_name: str, table_
     return f"{profile_path}#{share_name}.{schema_name}.{table_name}"
 
 
-def run_query_factory(table_url: str, query_limits: dict[str, int]):
-    def run_query(query: str):
-        return delta_sharing.load_as_pandas(table_url, limit=query_limits[query])
-
-    return run_query
+def select_frame(frame, spec: ScenarioSpec):
+    if spec.predicate is not None:
+        frame = frame[frame_ops[spec.predicate["op"]](frame[spec.predicate["column"]], spec.predicate["value"])]
+    if spec.columns is not None:
+        frame = frame[spec.columns]
+    return frame if spec.limit is None else frame.head(spec.limit)
+
+
+def load_projected(rest_client, remote_table, spec: ScenarioSpec, phases: PhaseTimer):
+    from urllib.parse import urlparse
+
+    import fsspec
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    with phases("execute"):
+        response = rest_client.list_files_in_table(
+            remote_table,
+            limitHint=spec.limit_hint,
+            jsonPredicateHints=spec.json_predicate_hints(),
+        )
+    tables = []
+    remaining = spec.limit
+    with phases("fetch"):
+        for add_file in response.add_files:
+            if remaining is not None and remaining <= 0:
+                break
+            filesystem = fsspec.filesystem(urlparse(add_file.url).scheme)
+            dataset = ds.dataset(add_file.url, format="parquet", filesystem=filesystem)
+            scanner = dataset.scanner(columns=spec.read_columns, filter=spec.arrow_filter())
+            table = scanner.to_table() if remaining is None else scanner.head(remaining)
+            tables.append(table)
+            if remaining is not None:
+                remaining -= table.num_rows
+    if not tables:
+        return pd.DataFrame(columns=spec.columns)
+    with phases("convert"):
+        table = pa.concat_tables(tables)
+        if spec.columns is not None:
+            table = table.select(spec.columns)
+        # Same conversion options as delta_sharing's reader.
+        return table.to_pandas(date_as_object=True, use_threads=False, split_blocks=False, self_destruct=True)
+
+
+def file_num_records(add_file) -> int | None:
+    if not add_file.stats:
+        return None
+    try:
+        return loads(add_file.stats).get("numRecords")
+    except ValueError:
+        return None
+
+
+def fetch_file(session, add_file, spec: ScenarioSpec):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    response = session.get(add_file.url, timeout=300)
+    response.raise_for_status()
+    content = response.content
+    table = pq.read_table(pa.BufferReader(content), columns=spec.read_columns, filters=spec.arrow_filter())
+    return table, len(content)
+
+
+def load_prefetched(rest_client, remote_table, spec: ScenarioSpec, session, concurrency: int, phases: PhaseTimer):
+    import pandas as pd
+    import pyarrow as pa
+
+    with phases("execute"):
+        response = rest_client.list_files_in_table(
+            remote_table,
+            limitHint=spec.limit_hint,
+            jsonPredicateHints=spec.json_predicate_hints(),
+        )
+    pending_files = list(response.add_files)
+    tables = []
+    rows = 0
+    file_bytes = 0
+    start = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        with phases("fetch"):
+            # Future -> rows its file stats promise; without a predicate, files stop being requested once
+            # delivered plus in-flight rows cover the limit.
+            in_flight = {}
+            while pending_files or in_flight:
+                while pending_files and len(in_flight) < concurrency:
+                    expected = sum(in_flight.values()) if spec.predicate is None else 0
+                    if spec.limit is not None and rows + expected >= spec.limit:
+                        break
+                    add_file = pending_files.pop(0)
+                    in_flight[pool.submit(fetch_file, session, add_file, spec)] = file_num_records(add_file) or 0
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del in_flight[future]
+                    table, nbytes = future.result()
+                    tables.append(table)
+                    rows += table.num_rows
+                    file_bytes += nbytes
+                if spec.limit is not None and rows >= spec.limit:
+                    break
+        seconds = time.perf_counter() - start
+    finally:
+        # Not a with block: its exit would wait for downloads still running once the limit is met. Those
+        # finish in the background and their results are dropped; queued ones are cancelled.
+        pool.shutdown(wait=False, cancel_futures=True)
+    phases.count("files", len(tables))
+    phases.count("file_bytes", file_bytes)
+    phases.count("download_bytes_per_s", file_bytes / seconds if seconds > 0 else 0)
+    if not tables:
+        return pd.DataFrame(columns=spec.columns)
+    with phases("convert"):
+        table = pa.concat_tables(tables)
+        if spec.columns is not None:
+            table = table.select(spec.columns)
+        if spec.limit is not None:
+            table = table.slice(0, spec.limit)
+        return table.to_pandas(date_as_object=True, use_threads=False, split_blocks=False, self_destruct=True)
+
+
+@register_runner
+class SharingClientRunner(Runner):
+    client_id = client_id
+    prepared_attributes = ("query_specs",)
+    sweep_arguments = ("loader", "prefetch_concurrency")
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--loader",
+            type=parse_choice_list(loaders),
+            default=os.getenv("SHARING_CLIENT_LOADER", "library"),
+            help=f"How shared files are read ({', '.join(loaders)}); comma-separated to sweep.",
+        )
+        parser.add_argument(
+            "--prefetch-concurrency",
+            type=parse_int_list,
+            default=os.getenv("SHARING_PREFETCH_CONCURRENCY", str(prefetch_concurrency)),
+            help="Concurrent file downloads for --loader prefetch; comma-separated to sweep.",
+        )
+
+    def variant(self) -> str:
+        suffix = "" if self.args.loader == "library" else f"-{self.args.loader}"
+        if self.args.loader == "prefetch":
+            suffix += str(self.args.prefetch_concurrency)
+        return variant_client_id(f"{self.client_id}{suffix}", self.args.consume)
+
+    def parameters(self) -> dict:
+        parameters = {"loader": self.args.loader}
+        if self.args.loader == "prefetch":
+            parameters["prefetch_concurrency"] = self.args.prefetch_concurrency
+        return parameters
+
+    def connect(self) -> None:
+        import delta_sharing
+        from delta_sharing.protocol import DeltaSharingProfile, Table
+        from delta_sharing.rest_client import DataSharingRestClient
+
+        profile_path = os.getenv("SHARING_PROFILE_PATH", default_sharing_profile_path)
+        share = os.getenv("SHARING_SHARE", default_sharing_share)
+        schema = os.getenv("SHARING_SCHEMA", default_sharing_schema)
+        self.delta_sharing = delta_sharing
+        self.table_url = build_table_url(profile_path, share, schema, shared_table_name)
+        self.rest_client = DataSharingRestClient(DeltaSharingProfile.read_from_file(profile_path))
+        self.remote_table = Table(name=shared_table_name, share=share, schema=schema)
+        if self.args.loader == "prefetch":
+            import requests
+
+            self.session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.args.prefetch_concurrency)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+
+    def close(self) -> None:
+        if self.args.loader == "prefetch":
+            self.session.close()
+
+    def prepare(self, scenarios: dict[str, str]) -> None:
+        # Scenarios without structured fields (select_1) fall back to a limit parsed from the id.
+        self.query_specs = {
+            query: self.specs.get(scenario_id) or ScenarioSpec(limit=extract_limit_from_scenario_id(scenario_id))
+            for scenario_id, query in scenarios.items()
+        }
+
+    def materialize(self, query: str, phases: PhaseTimer):
+        spec = self.query_specs[query]
+        if self.args.loader == "projected":
+            return load_projected(self.rest_client, self.remote_table, spec, phases)
+        if self.args.loader == "prefetch":
+            return load_prefetched(
+                self.rest_client,
+                self.remote_table,
+                spec,
+                self.session,
+                self.args.prefetch_concurrency,
+                phases,
+            )
+        with phases("fetch"):
+            frame = self.delta_sharing.load_as_pandas(
+                self.table_url,
+                limit=spec.limit_hint,
+                jsonPredicateHints=spec.json_predicate_hints(),
+            )
+        with phases("convert"):
+            return select_frame(frame, spec)
 
 
 # script work
-load_dotenv()
-creds = require_envs(["BENCHMARK_REPEATS"])
-repeats = int(creds["BENCHMARK_REPEATS"])
-loaded = load_queries(path)
-sharing_profile_path = os.getenv("SHARING_PROFILE_PATH", default_sharing_profile_path)
-sharing_share = os.getenv("SHARING_SHARE", default_sharing_share)
-sharing_schema = os.getenv("SHARING_SCHEMA", default_sharing_schema)
-
-table_url = build_table_url(
-    sharing_profile_path,
-    sharing_share,
-    sharing_schema,
-    shared_table_name,
-)
-query_limits = {
-    query: extract_limit_from_scenario_id(scenario_id)
-    for scenario_id, query in loaded["scenarios"].items()
-}
-
-run_query = run_query_factory(table_url, query_limits)
-results = run_scenarios(loaded["scenarios"], run_query, repeats)
-
-payload = build_payload(
-    schema_version=loaded["queries"]["schema_version"],
-    client_id=client_id,
-    repeats=repeats,
-    results=results,
-)
-
-write_payload(payload, default_out_path(client_id))
+if __name__ == "__main__":
+    sys.exit(run_cli([SharingClientRunner]))
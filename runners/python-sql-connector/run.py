@@ -2,55 +2,135 @@
 from __future__ import annotations
 
 # libs
+import argparse
+import itertools
+import json
+import os
+import sys
 from pathlib import Path
 
-import databricks.sql as sql
-from dotenv import load_dotenv
+import pyarrow as pa
 
-from common.python.helpers import (
-    build_payload,
-    default_out_path,
-    load_queries,
-    require_envs,
-    run_scenarios,
-    strip_scheme,
-    write_payload,
-)
+from common.python.helpers import PhaseTimer, connect_databricks_sql, parse_choice_list, variant_client_id
+from common.python.runner import Runner, register_runner, run_cli
 
 # variables
-path = Path("queries") / "scenarios.json"
 client_id = "python-sql-connector"
+grid_sections = ("connect", "cursor")
+# Short variant-id names for the usual connector knobs; other kwargs appear under their own name.
+grid_abbreviations = {
+    "use_cloud_fetch": "cf",
+    "max_download_threads": "dl",
+    "enable_query_result_lz4_compression": "lz4",
+    "use_sea": "sea",
+    "arraysize": "as",
+    "buffer_size_bytes": "buf",
+}
+default_grid = {"connect": {}, "cursor": {}}
+# all: one fetchall_arrow() (the unsuffixed id); split: fetchmany_arrow(arraysize) then fetchall_arrow(), to time the first batch.
+fetch_modes = ("all", "split")
 
 # functions
-def run_query_factory(connection):
-    def run_query(query: str):
-        with connection.cursor() as cursor:
+def load_grid(path: str) -> list[dict[str, dict]]:
+    # {"connect": {kwarg: [values]}, "cursor": {kwarg: [values]}} -> one kwargs combination per variant.
+    grid = json.loads(Path(path).read_text(encoding="utf-8"))
+    keys = [(section, key) for section in grid_sections for key in grid.get(section, {})]
+    combinations = []
+    for values in itertools.product(*(grid[section][key] for section, key in keys)):
+        combination = {section: {} for section in grid_sections}
+        for (section, key), value in zip(keys, values):
+            combination[section][key] = value
+        if combination["connect"].get("use_cloud_fetch") is False:
+            # Download threads only apply to cloud fetch.
+            combination["connect"].pop("max_download_threads", None)
+        if combination not in combinations:
+            combinations.append(combination)
+    return combinations
+
+
+def grid_suffix(combination: dict[str, dict]) -> str:
+    parts = []
+    for section in grid_sections:
+        for key, value in combination[section].items():
+            text = ("on" if value else "off") if isinstance(value, bool) else str(value)
+            parts.append(f"-{grid_abbreviations.get(key, key)}{text}")
+    return "".join(parts)
+
+
+def iter_fetchmany_arrow(cursor):
+    try:
+        while True:
+            batch = cursor.fetchmany_arrow(cursor.arraysize)
+            if batch.num_rows == 0:
+                return
+            yield batch
+    finally:
+        cursor.close()
+
+
+@register_runner
+class SqlConnectorRunner(Runner):
+    client_id = client_id
+    required_envs = ["DATABRICKS_HOST", "DATABRICKS_TOKEN", "DATABRICKS_WAREHOUSE_ID"]
+    sweep_arguments = ("grid", "sql_fetch")
+    parallel_fetch = True
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        grid_path = os.getenv("SQL_CONNECTOR_GRID")
+        parser.add_argument(
+            "--grid",
+            type=load_grid,
+            default=grid_path or [default_grid],
+            help="JSON grid of sql.connect / cursor kwargs; every combination runs as its own variant.",
+        )
+        parser.add_argument(
+            "--sql-fetch",
+            type=parse_choice_list(fetch_modes),
+            default=os.getenv("SQL_CONNECTOR_FETCH", "all"),
+            help=f"Materialize path ({', '.join(fetch_modes)}); comma-separated to sweep.",
+        )
+
+    def variant(self) -> str:
+        suffix = "" if self.args.sql_fetch == "all" else f"-{self.args.sql_fetch}"
+        return variant_client_id(f"{self.client_id}{suffix}{grid_suffix(self.args.grid)}", self.args.consume)
+
+    def parameters(self) -> dict:
+        return {
+            "connect_kwargs": self.args.grid["connect"],
+            "cursor_kwargs": self.args.grid["cursor"],
+            "sql_fetch": self.args.sql_fetch,
+        }
+
+    def connect(self) -> None:
+        self.connection = connect_databricks_sql(self.creds, **self.args.grid["connect"])
+
+    def execute(self, query: str, phases: PhaseTimer):
+        cursor = self.connection.cursor(**self.args.grid["cursor"])
+        with phases("execute"):
             cursor.execute(query)
-            cursor.fetchall_arrow()
+        return cursor
+
+    def iter_batches(self, cursor, phases: PhaseTimer):
+        return iter_fetchmany_arrow(cursor)
+
+    def materialize(self, cursor, phases: PhaseTimer):
+        with cursor:
+            if self.args.sql_fetch == "all":
+                # Same call as before phase timing, so the unsuffixed id stays comparable; first_batch stays null.
+                with phases("fetch"):
+                    return cursor.fetchall_arrow()
+            with phases("first_batch"):
+                first = cursor.fetchmany_arrow(cursor.arraysize)
+            with phases("fetch"):
+                rest = cursor.fetchall_arrow()
+            with phases("convert"):
+                return pa.concat_tables([first, rest])
 
-    return run_query
+    def close(self) -> None:
+        self.connection.close()
 
 
 # script work
-load_dotenv()
-creds = require_envs(["DATABRICKS_HOST", "DATABRICKS_TOKEN", "DATABRICKS_WAREHOUSE_ID", "BENCHMARK_REPEATS"])
-repeats = int(creds["BENCHMARK_REPEATS"])
-loaded = load_queries(path)
-
-con = sql.connect(
-    server_hostname=strip_scheme(creds["DATABRICKS_HOST"]),
-    http_path=f"/sql/1.0/warehouses/{creds['DATABRICKS_WAREHOUSE_ID']}",
-    access_token=creds["DATABRICKS_TOKEN"],
-)
-
-run_query = run_query_factory(con)
-results = run_scenarios(loaded["scenarios"], run_query, repeats)
-
-payload = build_payload(
-    schema_version=loaded["queries"]["schema_version"],
-    client_id=client_id,
-    repeats=repeats,
-    results=results,
-)
-
-write_payload(payload, default_out_path(client_id))
+if __name__ == "__main__":
+    sys.exit(run_cli([SqlConnectorRunner]))
@@ -2,40 +2,49 @@
 from __future__ import annotations
 
 # libs
+import argparse
+import mmap
+import os
+import re
+import sys
 import tempfile
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
+from urllib.parse import quote
 
-import databricks.sql as sql
-from databricks.sdk import WorkspaceClient
-from dotenv import load_dotenv
-import pyarrow.dataset as ds
-
-from common.python.helpers import (
-    build_payload,
-    default_out_path,
-    load_queries,
-    require_envs,
-    run_scenarios,
-    strip_scheme,
-    write_payload,
-)
+import pyarrow as pa
+
+from common.python import formats
+from common.python.export_cache import ExportCache, LocalStore, VolumeStore, export_cache_key, normalize_sql
+from common.python.helpers import PhaseTimer, connect_databricks_sql, parse_int_list, variant_client_id
+from common.python.runner import Runner, register_runner, run_cli
 
 # variables
-path = Path("queries") / "scenarios.json"
 client_id = "python-volume-download"
 files_per_export = 1
 download_parallelism = 10
+decode_threads = os.cpu_count() or 4
+decode_modes = ("disk", "memory", "local")
+source_table_pattern = re.compile(r"\b(?:FROM|JOIN)\s+([\w`]+\.[\w`]+\.[\w`]+)", re.IGNORECASE)
+invalidated_caches: set[str] = set()
+download_part_bytes = 16 * 1024 * 1024
+download_chunk_bytes = 1024 * 1024
+mmap_threshold_bytes = 256 * 1024 * 1024
 
 
 # functions
-def build_export_sql(query: str, remote_dir: str) -> str:
+def build_export_sql(query: str, remote_dir: str, files: int, export_format: str, compression: str, row_group_mb: int | None) -> str:
     query_text = query.strip().rstrip(";")
+    options = ", ".join(
+        f"'{key}' = '{value}'" for key, value in formats.spark_export_options(export_format, compression, row_group_mb).items()
+    )
     return (
         f"INSERT OVERWRITE DIRECTORY '{remote_dir}' "
-        "USING PARQUET "
-        "OPTIONS ('compression' = 'zstd') "
-        f"SELECT /*+ REPARTITION({files_per_export}) */ * "
+        f"USING {export_format.upper()} "
+        f"OPTIONS ({options}) "
+        f"SELECT /*+ REPARTITION({files}) */ * "
         f"FROM ({query_text}) AS benchmark_query"
     )
 
@@ -46,95 +55,417 @@ def clean_remote_dir(files_client, remote_dir: str) -> None:
     files_client.delete_directory(remote_dir)
 
 
-def read_local_arrow_table(local_dir: Path):
-    dataset = ds.dataset(str(local_dir), format="parquet")
-    return dataset.to_table()
+def describe_table_version(connection, table: str) -> str | None:
+    # Tables without Delta history (views, restricted shares) only invalidate when the SQL or options change.
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DESCRIBE HISTORY {table} LIMIT 1")
+            row = cursor.fetchone()
+    except Exception:
+        return None
+    return str(row[0]) if row else None
+
+
+def source_table_versions(connection, query: str, known: dict[str, str | None]) -> dict[str, str | None]:
+    versions = {}
+    for table in sorted(set(source_table_pattern.findall(query))):
+        if table not in known:
+            known[table] = describe_table_version(connection, table)
+        versions[table] = known[table]
+    return versions
+
+
+def export_options(args: argparse.Namespace) -> dict:
+    return {"files_per_export": args.files_per_export, **formats.export_parameters(args)}
 
 
-def prepare_remote_exports(connection, files_client, scenarios: dict[str, str], volume_path: str):
+def prepare_remote_exports(
+    connection,
+    files_client,
+    scenarios: dict[str, str],
+    volume_path: str,
+    args: argparse.Namespace,
+    cache: ExportCache | None,
+    caching: bool,
+    local_cache: ExportCache | None = None,
+):
     run_id = str(time.time_ns())
     run_root = f"{volume_path.rstrip('/')}/dbx-fetch-benchmark/{run_id}"
     scenario_dirs: dict[str, str] = {}
     query_files: dict[str, list[str]] = {}
+    file_sizes: dict[str, int] = {}
+    query_keys: dict[str, str] = {}
+    versions: dict[str, str | None] = {}
 
     for scenario_id, query in scenarios.items():
-        remote_dir = f"{run_root}/{scenario_id}"
-        print(f"Materializing scenario: {scenario_id}")
-        export_sql = build_export_sql(query, remote_dir)
-        with connection.cursor() as cursor:
-            cursor.execute(export_sql)
-        scenario_dirs[scenario_id] = remote_dir
-        entries = list(files_client.list_directory_contents(remote_dir))
-        query_files[query] = [
-            str(entry.path) for entry in entries if str(entry.path).endswith(".parquet")
-        ]
+        source_version = source_table_versions(connection, query, versions) if caching else None
+        key = export_cache_key(query, export_options(args), source_version)
+        query_keys[query] = key
+        if local_cache is not None and local_cache.lookup(key):
+            # Already downloaded under the same key; --decode=local never reads the remote files.
+            print(f"Reusing local export: {scenario_id} ({key})")
+            query_files[query] = []
+            continue
+        if cache is not None and cache.lookup(key):
+            print(f"Reusing cached export: {scenario_id} ({key})")
+            remote_dir = cache.store.path(key)
+        else:
+            remote_dir = cache.store.path(key) if cache is not None else f"{run_root}/{scenario_id}"
+            print(f"Materializing scenario: {scenario_id}")
+            export_sql = build_export_sql(
+                query, remote_dir, args.files_per_export, args.export_format, args.compression, args.row_group_mb
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(export_sql)
+            if cache is None:
+                scenario_dirs[scenario_id] = remote_dir
+        listed = list_export_files(files_client, remote_dir, args.export_format)
+        if cache is not None and key not in cache.index:
+            cache.add(key, sum(listed.values()), {"scenario_id": scenario_id, "sql": normalize_sql(query), **export_options(args)})
+        query_files[query] = list(listed)
+        file_sizes.update(listed)
+
+    if cache is not None:
+        cache.evict(keep=set(query_keys.values()))
+    return run_root, scenario_dirs, query_files, file_sizes, query_keys
+
+
+def list_export_files(files_client, remote_dir: str, export_format: str) -> dict[str, int]:
+    entries = list(files_client.list_directory_contents(remote_dir))
+    return {
+        str(entry.path): entry.file_size or 0 for entry in entries if str(entry.path).endswith(f".{export_format}")
+    }
 
-    return run_root, scenario_dirs, query_files
 
-def run_query_factory(files_client, query_files: dict[str, list[str]]):
-    def run_query(query: str):
-        remote_files = query_files[query]
-        with tempfile.TemporaryDirectory(prefix="dbx-fetch-benchmark-") as temp_dir:
-            local_dir = Path(temp_dir)
+def list_staged_exports(files_client, scenarios: dict[str, str], staged_dir: str, args: argparse.Namespace):
+    # Exports written ahead of time (e.g. by `python -m common.python.standin stage-exports`) are reused as-is.
+    layout = f"files-{args.files_per_export}{formats.export_suffix(args.export_format, args.compression, args.row_group_mb)}"
+    query_files: dict[str, list[str]] = {}
+    file_sizes: dict[str, int] = {}
+    query_keys: dict[str, str] = {}
+    for scenario_id, query in scenarios.items():
+        remote_dir = f"{staged_dir.rstrip('/')}/{layout}/{scenario_id}"
+        listed = list_export_files(files_client, remote_dir, args.export_format)
+        query_files[query] = list(listed)
+        file_sizes.update(listed)
+        query_keys[query] = export_cache_key(query, export_options(args), f"staged:{remote_dir}")
+    return query_files, file_sizes, query_keys
+
+
+def populate_local_cache(
+    files_client,
+    cache: ExportCache,
+    query_files: dict[str, list[str]],
+    file_sizes: dict[str, int],
+    query_keys: dict[str, str],
+    export_format: str,
+):
+    # Each export is downloaded once; later iterations (and runs) read the local copies.
+    # Exported part files get new names on every export, so hits list the cached directory.
+    local_files: dict[str, list[str]] = {}
+    local_sizes: dict[str, int] = {}
+    for query, remote_files in query_files.items():
+        key = query_keys[query]
+        local_dir = Path(cache.store.path(key))
+        if not cache.lookup(key):
+            local_dir.mkdir(parents=True, exist_ok=True)
             for remote_path in remote_files:
-                local_path = local_dir / Path(remote_path).name
-                files_client.download_to(
-                    remote_path,
-                    str(local_path),
-                    overwrite=True,
-                    use_parallel=True,
-                    parallelism=download_parallelism,
+                files_client.download_to(remote_path, str(local_dir / Path(remote_path).name), overwrite=True, use_parallel=True)
+            cache.add(key, sum(file_sizes[remote_path] for remote_path in remote_files), {"sql": normalize_sql(query)})
+        local_paths = sorted(local_dir.glob(f"*.{export_format}"))
+        local_files[query] = [str(local_path) for local_path in local_paths]
+        local_sizes.update({str(local_path): local_path.stat().st_size for local_path in local_paths})
+    cache.evict(keep=set(query_keys.values()))
+    return local_files, local_sizes
+
+
+def open_cache(store, max_gb: float, invalidate: bool) -> ExportCache:
+    cache = ExportCache(store, int(max_gb * 1024**3))
+    # Invalidate once per process, not once per sweep combination.
+    if invalidate and str(store.root) not in invalidated_caches:
+        print(f"Invalidating export cache: {store.root}")
+        cache.clear()
+        invalidated_caches.add(str(store.root))
+    return cache
+
+
+def start_disk_downloads(pool: ThreadPoolExecutor, files_client, remote_files: list[str], local_dir: Path, parallelism: int):
+    # Files download concurrently; download_to splits the remaining budget into ranges within each file.
+    per_file = max(1, parallelism // max(len(remote_files), 1))
+    downloads = []
+    for remote_path in remote_files:
+        local_path = local_dir / Path(remote_path).name
+        future = pool.submit(
+            files_client.download_to,
+            remote_path,
+            str(local_path),
+            overwrite=True,
+            use_parallel=True,
+            parallelism=per_file,
+        )
+        downloads.append(([future], local_path))
+    return downloads
+
+
+def open_buffer(size: int):
+    # Large results go to an anonymous mapping, so they never touch disk but can still be paged out.
+    return mmap.mmap(-1, size) if size >= mmap_threshold_bytes else bytearray(size)
+
+
+def download_range(api_client, remote_path: str, view: memoryview, start: int, end: int) -> None:
+    response = api_client.do(
+        "GET",
+        f"/api/2.0/fs/files{quote(remote_path)}",
+        headers={"Accept": "application/octet-stream", "Range": f"bytes={start}-{end}"},
+        raw=True,
+    )
+    stream = response["contents"]
+    try:
+        offset = start
+        while offset <= end:
+            chunk = stream.read(min(download_chunk_bytes, end + 1 - offset))
+            if not chunk:
+                raise RuntimeError(f"Short read for {remote_path} at byte {offset}")
+            view[offset : offset + len(chunk)] = chunk
+            offset += len(chunk)
+    finally:
+        stream.close()
+
+
+def start_memory_downloads(pool: ThreadPoolExecutor, api_client, remote_files: list[str], file_sizes: dict[str, int]):
+    # Every byte range of every file is queued up front on the shared pool.
+    downloads = []
+    for remote_path in remote_files:
+        size = file_sizes[remote_path]
+        buffer = open_buffer(size)
+        view = memoryview(buffer)
+        futures = [
+            pool.submit(download_range, api_client, remote_path, view, start, min(start + download_part_bytes, size) - 1)
+            for start in range(0, size, download_part_bytes)
+        ]
+        downloads.append((futures, buffer))
+    return downloads
+
+
+def open_source(source):
+    return str(source) if isinstance(source, Path) else pa.BufferReader(pa.py_buffer(source))
+
+
+def wait_downloaded(futures: list[Future]) -> None:
+    for future in futures:
+        future.result()
+
+
+def decode_downloaded_files(downloads, export_format: str, phases: PhaseTimer) -> list[pa.Table]:
+    # Each file is decoded on the pool as soon as it lands, so decode overlaps the remaining downloads.
+    # fetch is the time to the last byte; convert is the decode tail after it; decode_s sums the per-file decodes.
+    def decode(futures: list[Future], source):
+        wait_downloaded(futures)
+        start = time.perf_counter()
+        table = formats.read_table(open_source(source), export_format)
+        return table, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=decode_threads) as decoders:
+        decoded = [decoders.submit(decode, futures, source) for futures, source in downloads]
+        with phases("fetch"):
+            for futures, _ in downloads:
+                wait_downloaded(futures)
+        with phases("convert"):
+            results = [future.result() for future in decoded]
+    phases.count("decode_s", sum(seconds for _, seconds in results))
+    return [table for table, _ in results]
+
+
+def iter_downloaded_batches(
+    pool: ThreadPoolExecutor,
+    temp_dir: tempfile.TemporaryDirectory | None,
+    downloads,
+    export_format: str,
+    phases: PhaseTimer,
+):
+    # Batches come out in file order as soon as each file has landed; waits and decodes are counted separately.
+    try:
+        for futures, source in downloads:
+            start = time.perf_counter()
+            wait_downloaded(futures)
+            phases.count("download_wait_s", time.perf_counter() - start)
+            batches = formats.iter_batches(open_source(source), export_format)
+            while True:
+                start = time.perf_counter()
+                batch = next(batches, None)
+                phases.count("decode_s", time.perf_counter() - start)
+                if batch is None:
+                    break
+                yield batch
+    finally:
+        pool.shutdown(cancel_futures=True)
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+
+@register_runner
+class VolumeDownloadRunner(Runner):
+    client_id = client_id
+    required_envs = ["DATABRICKS_HOST", "DATABRICKS_TOKEN", "DATABRICKS_WAREHOUSE_ID", "DATABRICKS_VOLUME_PATH"]
+    prepared_attributes = ("query_files", "file_sizes", "local_files")
+    sweep_arguments = ("files_per_export", "download_parallelism", *formats.EXPORT_SWEEP_ARGUMENTS)
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--decode",
+            choices=decode_modes,
+            default=os.getenv("VOLUME_DOWNLOAD_DECODE", "disk"),
+            help=(
+                "disk: download_to a temp dir and read it back; memory: range-download into buffers and decode in place; "
+                "local: read the --local-cache-dir copies without downloading."
+            ),
+        )
+        parser.add_argument(
+            "--files-per-export",
+            type=parse_int_list,
+            default=[files_per_export],
+            help="REPARTITION(n) file counts to sweep, e.g. 1,4,16.",
+        )
+        parser.add_argument(
+            "--download-parallelism",
+            type=parse_int_list,
+            default=[download_parallelism],
+            help="Concurrent downloads to sweep, e.g. 4,10,32.",
+        )
+        formats.add_export_arguments(parser)
+        parser.add_argument(
+            "--export-cache",
+            action="store_true",
+            default=os.getenv("VOLUME_EXPORT_CACHE", "") not in ("", "0", "false"),
+            help="Keep exports in the volume keyed by SQL, export options and source table version, and reuse them.",
+        )
+        parser.add_argument(
+            "--export-cache-max-gb",
+            type=float,
+            default=float(os.getenv("VOLUME_EXPORT_CACHE_MAX_GB", "100")),
+        )
+        local_cache_dir = os.getenv("VOLUME_LOCAL_CACHE_DIR")
+        parser.add_argument(
+            "--local-cache-dir",
+            type=Path,
+            default=Path(local_cache_dir) if local_cache_dir else None,
+            help="Also keep downloaded copies of each export here (required for --decode=local).",
+        )
+        parser.add_argument(
+            "--local-cache-max-gb",
+            type=float,
+            default=float(os.getenv("VOLUME_LOCAL_CACHE_MAX_GB", "20")),
+        )
+        parser.add_argument(
+            "--invalidate-export-cache",
+            action="store_true",
+            help="Drop every cached export (volume and local) before preparing.",
+        )
+
+    def variant(self) -> str:
+        name = self.client_id if self.args.decode == "disk" else f"{self.client_id}-{self.args.decode}"
+        if (self.args.files_per_export, self.args.download_parallelism) != (files_per_export, download_parallelism):
+            name = f"{name}-files{self.args.files_per_export}-par{self.args.download_parallelism}"
+        name += formats.export_suffix(self.args.export_format, self.args.compression, self.args.row_group_mb)
+        return variant_client_id(name, self.args.consume)
+
+    def connect(self) -> None:
+        from databricks.sdk import WorkspaceClient
+
+        self.staged_dir = os.getenv("DATABRICKS_VOLUME_STAGED_DIR")
+        self.connection = None if self.staged_dir else connect_databricks_sql(self.creds)
+        workspace_client = WorkspaceClient(
+            host=self.creds["DATABRICKS_HOST"],
+            token=self.creds["DATABRICKS_TOKEN"],
+        )
+        self.files_client = workspace_client.files
+        self.api_client = workspace_client.api_client
+        self.run_root = ""
+        self.scenario_dirs: dict[str, str] = {}
+        self.local_files: dict[str, list[str]] = {}
+
+    def parameters(self) -> dict:
+        staged_dir = os.getenv("DATABRICKS_VOLUME_STAGED_DIR")
+        return {
+            "decode": self.args.decode,
+            "files_per_export": self.args.files_per_export,
+            "download_parallelism": self.args.download_parallelism,
+            **formats.export_parameters(self.args),
+            "export_cache": self.args.export_cache,
+            "local_cache_dir": str(self.args.local_cache_dir) if self.args.local_cache_dir else None,
+            **({"staged_dir": staged_dir} if staged_dir else {}),
+        }
+
+    def prepare(self, scenarios: dict[str, str]) -> None:
+        if self.args.decode == "local" and self.args.local_cache_dir is None:
+            raise RuntimeError("--decode=local reads the local export cache; set --local-cache-dir or VOLUME_LOCAL_CACHE_DIR.")
+        local_cache = None
+        if self.args.local_cache_dir is not None:
+            local_cache = open_cache(
+                LocalStore(self.args.local_cache_dir), self.args.local_cache_max_gb, self.args.invalidate_export_cache
+            )
+        if self.staged_dir:
+            self.query_files, self.file_sizes, query_keys = list_staged_exports(
+                self.files_client, scenarios, self.staged_dir, self.args
+            )
+        else:
+            volume_cache = None
+            if self.args.export_cache:
+                cache_root = f"{self.creds['DATABRICKS_VOLUME_PATH'].rstrip('/')}/dbx-fetch-benchmark/cache"
+                volume_cache = open_cache(
+                    VolumeStore(self.files_client, cache_root), self.args.export_cache_max_gb, self.args.invalidate_export_cache
                 )
-            return read_local_arrow_table(local_dir)
+            self.run_root, self.scenario_dirs, self.query_files, self.file_sizes, query_keys = prepare_remote_exports(
+                self.connection,
+                self.files_client,
+                scenarios,
+                self.creds["DATABRICKS_VOLUME_PATH"],
+                self.args,
+                volume_cache,
+                caching=self.args.export_cache or local_cache is not None,
+                local_cache=local_cache if self.args.decode == "local" else None,
+            )
+        if local_cache is not None:
+            self.local_files, local_sizes = populate_local_cache(
+                self.files_client, local_cache, self.query_files, self.file_sizes, query_keys, self.args.export_format
+            )
+            self.file_sizes.update(local_sizes)
+
+    def start_downloads(self, pool: ThreadPoolExecutor, query: str, local_dir: Path | None, phases: PhaseTimer):
+        if self.args.decode == "local":
+            phases.count("file_bytes", sum(self.file_sizes[local_path] for local_path in self.local_files[query]))
+            return [([], Path(local_path)) for local_path in self.local_files[query]]
+        phases.count("file_bytes", sum(self.file_sizes[remote_path] for remote_path in self.query_files[query]))
+        if self.args.decode == "memory":
+            return start_memory_downloads(pool, self.api_client, self.query_files[query], self.file_sizes)
+        return start_disk_downloads(pool, self.files_client, self.query_files[query], local_dir, self.args.download_parallelism)
 
-    return run_query
+    def iter_batches(self, query: str, phases: PhaseTimer):
+        temp_dir = tempfile.TemporaryDirectory(prefix="dbx-fetch-benchmark-") if self.args.decode == "disk" else None
+        pool = ThreadPoolExecutor(max_workers=self.args.download_parallelism)
+        downloads = self.start_downloads(pool, query, Path(temp_dir.name) if temp_dir else None, phases)
+        return iter_downloaded_batches(pool, temp_dir, downloads, self.args.export_format, phases)
+
+    def materialize(self, query: str, phases: PhaseTimer):
+        temp_dir = tempfile.TemporaryDirectory(prefix="dbx-fetch-benchmark-") if self.args.decode == "disk" else nullcontext()
+        with temp_dir as local_dir, ThreadPoolExecutor(max_workers=self.args.download_parallelism) as pool:
+            downloads = self.start_downloads(pool, query, Path(local_dir) if local_dir else None, phases)
+            tables = decode_downloaded_files(downloads, self.args.export_format, phases)
+        with phases("convert"):
+            return pa.concat_tables(tables) if tables else pa.table({})
+
+    def close(self) -> None:
+        try:
+            for remote_dir in self.scenario_dirs.values():
+                clean_remote_dir(self.files_client, remote_dir)
+            if self.scenario_dirs:
+                self.files_client.delete_directory(self.run_root)
+        finally:
+            if self.connection is not None:
+                self.connection.close()
 
 
 # script work
-load_dotenv()
-creds = require_envs(
-    [
-        "DATABRICKS_HOST",
-        "DATABRICKS_TOKEN",
-        "DATABRICKS_WAREHOUSE_ID",
-        "DATABRICKS_VOLUME_PATH",
-        "BENCHMARK_REPEATS",
-    ]
-)
-repeats = int(creds["BENCHMARK_REPEATS"])
-loaded = load_queries(path)
-
-con = sql.connect(
-    server_hostname=strip_scheme(creds["DATABRICKS_HOST"]),
-    http_path=f"/sql/1.0/warehouses/{creds['DATABRICKS_WAREHOUSE_ID']}",
-    access_token=creds["DATABRICKS_TOKEN"],
-)
-workspace_client = WorkspaceClient(
-    host=creds["DATABRICKS_HOST"],
-    token=creds["DATABRICKS_TOKEN"],
-)
-files_client = workspace_client.files
-
-run_root = ""
-scenario_dirs: dict[str, str] = {}
-results = []
-try:
-    run_root, scenario_dirs, query_files = prepare_remote_exports(
-        con, files_client, loaded["scenarios"], creds["DATABRICKS_VOLUME_PATH"]
-    )
-    run_query = run_query_factory(files_client, query_files)
-    results = run_scenarios(loaded["scenarios"], run_query, repeats)
-finally:
-    for remote_dir in scenario_dirs.values():
-        clean_remote_dir(files_client, remote_dir)
-    if run_root:
-        files_client.delete_directory(run_root)
-
-payload = build_payload(
-    schema_version=loaded["queries"]["schema_version"],
-    client_id=client_id,
-    repeats=repeats,
-    results=results,
-)
-
-write_payload(payload, default_out_path(client_id))
+if __name__ == "__main__":
+    sys.exit(run_cli([VolumeDownloadRunner]))
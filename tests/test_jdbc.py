@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+from decimal import Decimal
+
+import numpy as np
+import pyarrow as pa
+
+from common.python.helpers import PhaseTimer
+from common.python.jdbc import BOOLEAN, DATE, DECIMAL, DOUBLE, INT, LONG, STRING, TIMESTAMP, JdbcRunner, arrow_type
+
+# One column per kind; scale only matters for DECIMAL.
+COLUMNS = [
+    ("cs_item_sk", INT, 0),
+    ("cs_order_number", LONG, 0),
+    ("cs_ext_tax", DOUBLE, 0),
+    ("cs_sales_price", DECIMAL, 2),
+    ("cs_flag", BOOLEAN, 0),
+    ("cs_sold_date", DATE, 0),
+    ("cs_sold_at", TIMESTAMP, 0),
+    ("cs_note", STRING, 0),
+]
+SCHEMA = pa.schema([pa.field(name, arrow_type(kind, 7, scale)) for name, kind, scale in COLUMNS])
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def make_row(i: int) -> tuple:
+    # Every column is null on some rows, and each column on different rows.
+    values = (
+        i,
+        i * 10_000_000_000,
+        i / 8,
+        Decimal(-i * 125) / 100,
+        i % 2 == 0,
+        datetime.date(2001, 1, 1) + datetime.timedelta(days=i),
+        datetime.datetime(2001, 1, 1, 12) + datetime.timedelta(seconds=i, microseconds=i),
+        f"héllo {i}" if i % 3 else "",
+    )
+    return tuple(None if (i + column) % 4 == 0 else value for column, value in enumerate(values))
+
+
+class FakeColumnarResultSet:
+    # Python stand-in for dbxfetch.ColumnarResultSet: the same accessors, fed from row tuples.
+    def __init__(self, rows: list[tuple]) -> None:
+        self.pending = list(rows)
+        self.chunk: list[tuple] = []
+
+    def fetch(self, max_rows: int) -> int:
+        self.chunk, self.pending = self.pending[:max_rows], self.pending[max_rows:]
+        return len(self.chunk)
+
+    def column(self, i: int) -> list:
+        return [row[i] for row in self.chunk]
+
+    def nulls(self, i: int) -> list[bool] | None:
+        flags = [value is None for value in self.column(i)]
+        return flags if any(flags) else None
+
+    def ints(self, i: int) -> list[int]:
+        if COLUMNS[i][1] == DATE:
+            return [0 if value is None else (value - EPOCH.date()).days for value in self.column(i)]
+        return [0 if value is None else value for value in self.column(i)]
+
+    def longs(self, i: int) -> list[int]:
+        kind, scale = COLUMNS[i][1], COLUMNS[i][2]
+        if kind == DECIMAL:
+            return [0 if value is None else int(value.scaleb(scale)) for value in self.column(i)]
+        if kind == TIMESTAMP:
+            return [0 if value is None else (value - EPOCH) // datetime.timedelta(microseconds=1) for value in self.column(i)]
+        return [0 if value is None else value for value in self.column(i)]
+
+    def doubles(self, i: int) -> list[float]:
+        return [0.0 if value is None else value for value in self.column(i)]
+
+    def booleans(self, i: int) -> list[bool]:
+        return [False if value is None else value for value in self.column(i)]
+
+    def stringOffsets(self, i: int) -> list[int]:
+        offsets = [0]
+        for value in self.column(i):
+            offsets.append(offsets[-1] + len((value or "").encode("utf-8")))
+        return offsets
+
+    def stringData(self, i: int) -> np.ndarray:
+        # A Java byte[] reaches numpy as signed bytes.
+        return np.frombuffer("".join(value or "" for value in self.column(i)).encode("utf-8"), dtype=np.int8)
+
+
+class FakeStatement:
+    closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def columnar_runner(fetch_rows: int) -> JdbcRunner:
+    return JdbcRunner({}, argparse.Namespace(jdbc_fetch="columnar", fetch_rows=fetch_rows, consume="materialize"))
+
+
+def test_columnar_materialize_covers_every_kind():
+    # 10 rows in chunks of 4: two full chunks and a short final one.
+    rows = [make_row(i) for i in range(10)]
+    statement = FakeStatement()
+    handle = (statement, FakeColumnarResultSet(rows), SCHEMA, [kind for _, kind, _ in COLUMNS])
+
+    table = columnar_runner(fetch_rows=4).materialize(handle, PhaseTimer())
+
+    table.validate(full=True)
+    assert table.schema == SCHEMA
+    assert [batch.num_rows for batch in table.to_batches()] == [4, 4, 2]
+    assert table.to_pylist() == [dict(zip(SCHEMA.names, row)) for row in rows]
+    assert statement.closed
+
+
+def test_columnar_empty_result_keeps_schema():
+    statement = FakeStatement()
+    handle = (statement, FakeColumnarResultSet([]), SCHEMA, [kind for _, kind, _ in COLUMNS])
+
+    table = columnar_runner(fetch_rows=4).materialize(handle, PhaseTimer())
+
+    assert table.num_rows == 0
+    assert table.schema == SCHEMA
+    assert statement.closed
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+from decimal import Decimal
+
+import pyarrow as pa
+
+from common.python.helpers import PhaseTimer
+from common.python.odbc import DEFAULT_BATCH_SIZE, OdbcRunner, odbc_parameters, odbc_suffix
+
+SCHEMA = pa.schema([("cs_item_sk", pa.int32()), ("cs_sales_price", pa.decimal128(7, 2)), ("cs_note", pa.string())])
+
+
+class StubBatchReader:
+    # The parts of arrow_odbc.BatchReader the runner uses: an iterable of batches with a schema.
+    def __init__(self, batches: list[pa.RecordBatch], schema: pa.Schema) -> None:
+        self.batches = batches
+        self.schema = schema
+
+    def __iter__(self):
+        return iter(self.batches)
+
+
+def arrow_args(batch_size: int = DEFAULT_BATCH_SIZE) -> argparse.Namespace:
+    return argparse.Namespace(odbc_fetch="arrow", batch_size=batch_size, max_text_size=None, consume="materialize")
+
+
+def make_batch(start: int, rows: int) -> pa.RecordBatch:
+    return pa.record_batch(
+        [
+            pa.array(range(start, start + rows), pa.int32()),
+            pa.array([None if i % 3 == 0 else Decimal(i) / 4 for i in range(start, start + rows)], pa.decimal128(7, 2)),
+            pa.array([None if i % 2 else f"row {i}" for i in range(start, start + rows)]),
+        ],
+        schema=SCHEMA,
+    )
+
+
+def test_materialize_arrow_builds_table_from_batches():
+    # Two full buffers and a short final one, as arrow-odbc returns for a result that is not a multiple of batch_size.
+    batches = [make_batch(0, 4), make_batch(4, 4), make_batch(8, 2)]
+    runner = OdbcRunner({}, arrow_args(batch_size=4))
+    phases = PhaseTimer()
+
+    table = runner.materialize(StubBatchReader(batches, SCHEMA), phases)
+
+    assert table.schema == SCHEMA
+    assert table.num_rows == 10
+    assert table.equals(pa.Table.from_batches(batches))
+    assert {"first_batch", "fetch", "convert"} <= phases.seconds.keys()
+
+
+def test_materialize_arrow_empty_result_keeps_schema():
+    table = OdbcRunner({}, arrow_args()).materialize(StubBatchReader([], SCHEMA), PhaseTimer())
+
+    assert table.num_rows == 0
+    assert table.schema == SCHEMA
+
+
+def test_arrow_variant_suffix_and_parameters():
+    assert odbc_suffix(arrow_args()) == "-arrow"
+    assert odbc_suffix(arrow_args(batch_size=1024)) == "-arrow-b1024"
+    assert odbc_parameters(arrow_args(batch_size=1024)) == {"fetch": "arrow", "batch_size": 1024, "max_text_size": None}
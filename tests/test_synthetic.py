@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import sqlite3
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from common.python.synthetic import SQLITE_TABLE, build_sqlite_table, catalog_sales_schema, write_catalog_sales
+
+
+def test_catalog_sales_schema_and_row_count(tmp_path):
+    # Two files with row groups smaller than a file, so chunk and file boundaries are both crossed.
+    write_catalog_sales(tmp_path, rows=2_500, files=2, row_group_rows=1_000)
+
+    dataset = ds.dataset(str(tmp_path), format="parquet")
+    assert len(dataset.schema) == 34
+    assert dataset.schema == catalog_sales_schema()
+    assert dataset.count_rows() == 2_500
+    assert (tmp_path / "_delta_log" / "00000000000000000000.json").exists()
+
+
+def test_decimal_prices_round_trip_through_sqlite(tmp_path):
+    source = tmp_path / "catalog_sales"
+    write_catalog_sales(source, rows=1_000)
+    sqlite_path = tmp_path / "catalog_sales.sqlite"
+    build_sqlite_table(source, sqlite_path)
+
+    table = ds.dataset(str(source), format="parquet").to_table()
+    decimals = [field.name for field in table.schema if pa.types.is_decimal(field.type)]
+    assert decimals and all(table.schema.field(name).type == pa.decimal128(7, 2) for name in decimals)
+
+    con = sqlite3.connect(sqlite_path)
+    try:
+        rows = con.execute(f"SELECT {', '.join(decimals)} FROM {SQLITE_TABLE}").fetchall()
+    finally:
+        con.close()
+    assert len(rows) == table.num_rows
+    # SQLite stores the prices as doubles; rounding to the column scale recovers the exact decimals.
+    fetched = [[None if value is None else Decimal(f"{value:.2f}") for value in column] for column in zip(*rows)]
+    assert fetched == [table.column(name).to_pylist() for name in decimals]